@@ -1,14 +1,44 @@
-import pandas as pd
 import streamlit as st
 
+from components import TIME_SERIES_CHARTS, YEAR_CHARTS
+from components.country_drilldown import render_country_drilldown
 from components.data_exploration import render_data_exploration
 from components.development_time_series import render_development_time_series
 from components.gdp_distribution import render_gdp_distribution_plot
 from components.sidebar import render_sidebar
 from components.stastistical_analysis import render_statistical_analysis
+from constants.constants import CACHE_WARM_UP
+from utils.cache_lifecycle import start_warm_up
+from utils.dataset import Dataset
+from utils.ingestion import get_data_store
+from utils.instrumentation import finish_session_rerun, span, start_session_rerun
+from utils.prefetch import prefetch_adjacent_years
 
-# Load data
-df = pd.read_csv("data/gapminder_data_graphs.csv")
+
+def load_current_dataset() -> Dataset:
+    """
+    Return the dataset this session shows, picking up newly ingested extracts.
+
+    Called on every rerun, including reruns of a fragment alone, so a session
+    stepping through the years switches to a new data version as soon as it lands.
+
+    Returns:
+        Dataset: The raw or gap-filled metrics, as chosen in the sidebar.
+    """
+    with span("load_data"):
+        current = get_data_store().refresh()
+        # Both variants are computed once per data version
+        if st.session_state.get("fill_gaps"):
+            current = current.filled
+        if CACHE_WARM_UP:
+            start_warm_up(current, TIME_SERIES_CHARTS, YEAR_CHARTS)
+    return current
+
+
+# Time this rerun when profiling is enabled
+rerun_timer = start_session_rerun("app")
+
+dataset = load_current_dataset()
 
 # Page configuration
 st.set_page_config(
@@ -19,40 +49,93 @@ st.set_page_config(
 )
 
 # Load the CSS file
-with open("styles/style.css") as f:
+with span("inject_css"), open("styles/style.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 
+# Sections of every page and the inputs they rerun on besides navigation. Sections
+# that take the year are rendered inside one fragment together with the year
+# selector, so changing the year reruns only them.
+SECTIONS = {
+    "Data Exploration": (render_data_exploration, ("year",)),
+    "Stats Analysis": (render_statistical_analysis, ("year",)),
+    "GDP Distribution": (render_gdp_distribution_plot, ("year",)),
+    "Time Analysis": (render_development_time_series, ()),
+    "Country Drill-down": (render_country_drilldown, ()),
+}
+
+# Home shows the overview sections, with the year-independent ones below the fold
+HOME_SECTIONS = [
+    "Data Exploration",
+    "Stats Analysis",
+    "GDP Distribution",
+    "Time Analysis",
+]
+
+
+@st.fragment
+def render_year_sections(sections: list[str]):
+    """
+    Render the year selector and every section that depends on the year.
+
+    Runs as a fragment: a year change reruns this function alone instead of the
+    whole app, leaving the sidebar and year-independent sections untouched.
+
+    Args:
+        sections (list[str]): Names of the year-dependent sections to render.
+    """
+    # Profiled separately when the fragment reruns on its own
+    timer = start_session_rerun("year_sections")
+    try:
+        # The module's dataset is only reloaded by full reruns
+        dataset = load_current_dataset()
+        year = st.selectbox(
+            label="Year",
+            options=dataset.years,
+            index=0,  # Selects first option by default,
+            key="year",
+            label_visibility="visible",
+            help="select the year to display",
+        )
+
+        for name in sections:
+            render, _ = SECTIONS[name]
+            render(dataset, year)
+
+        # Sequential year changes are the most common interaction, so the next
+        # years' figures are built in the background while this one is viewed. A
+        # section's charts are built in the module that renders it.
+        modules = {SECTIONS[name][0].__module__ for name in sections}
+        prefetch_adjacent_years(
+            dataset,
+            year,
+            [build for build in YEAR_CHARTS.values() if build.__module__ in modules],
+        )
+    finally:
+        finish_session_rerun(timer)
+
+
 def main():
     st.title("Life Expectancy, GDP & Human Development Analysis")
     # Render sidebar
     render_sidebar()
 
-    year = st.selectbox(
-        label="Year",
-        options=df["year"].unique(),
-        index=0,  # Selects first option by default,
-        label_visibility="visible",
-        help="select the year to display",
-    )
-
     # Main content based on navigation
     nav_state = st.session_state.get("nav")
+    sections = [nav_state] if nav_state in SECTIONS else HOME_SECTIONS
+
+    render_year_sections([name for name in sections if "year" in SECTIONS[name][1]])
 
-    if nav_state == "Data Exploration":
-        render_data_exploration(df, year)
-    elif nav_state == "Stats Analysis":
-        render_statistical_analysis(df, year)
-    elif nav_state == "Time Analysis":
-        render_development_time_series(df)
-    elif nav_state == "GDP Distribution":
-        render_gdp_distribution_plot(df, year)
-    else:
-        render_data_exploration(df, year)
-        render_statistical_analysis(df, year)
-        render_gdp_distribution_plot(df, year)
-        render_development_time_series(df)
+    # Year-independent sections only rerun on navigation changes. They come last,
+    # so the sections above the fold reach the browser before they are rendered.
+    for name in sections:
+        render, inputs = SECTIONS[name]
+        if "year" not in inputs:
+            render(dataset)
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        finish_session_rerun(rerun_timer)
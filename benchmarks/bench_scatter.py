@@ -0,0 +1,53 @@
+"""
+Benchmark the GDP vs. life expectancy scatter across its rendering modes.
+
+Generates a single synthetic year at sizes on both sides of SCATTER_WEBGL_THRESHOLD
+and SCATTER_DENSITY_THRESHOLD, then reports the chosen mode, figure build time and
+serialized payload size for each size.
+
+Usage:
+    python -m benchmarks.bench_scatter [--year 2010] [--sizes 1000 50000 ...]
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_gapminder
+from components.data_exploration import build_gdp_life_exp_scatter
+from utils.dataset import Dataset
+from utils.scatter_density import scatter_render_mode
+
+DEFAULT_SIZES = [175, 2_000, 20_000, 150_000, 500_000, 2_000_000]
+
+
+def run(year: int, sizes: list[int]) -> list[dict]:
+    results = []
+    for n_rows in sizes:
+        dataset = Dataset(generate_gapminder(n_rows, years=[year]), f"bench-{n_rows}")
+        start = time.perf_counter()
+        fig = build_gdp_life_exp_scatter(dataset, year)
+        build_seconds = time.perf_counter() - start
+        results.append(
+            {
+                "rows": n_rows,
+                "mode": scatter_render_mode(n_rows),
+                "build_ms": round(build_seconds * 1000, 1),
+                "payload_bytes": len(fig.to_json()),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--year", type=int, default=2010)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    print(pd.DataFrame(run(args.year, args.sizes)).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compare two benchmark result files produced by benchmarks/run_benchmarks.py.
+
+Prints the median time of every case in both runs and their ratio, and exits with
+status 1 if any case got slower than the threshold allows.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 1.2]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_medians(path: str) -> dict[tuple[str, int], float]:
+    with open(path) as f:
+        report = json.load(f)
+    return {
+        (result["case"], result["rows"]): result["median_ms"]
+        for result in report["results"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="slowdown ratio above which a case counts as a regression",
+    )
+    args = parser.parse_args()
+
+    baseline, candidate = load_medians(args.baseline), load_medians(args.candidate)
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        case, rows = key
+        ratio = candidate[key] / baseline[key] if baseline[key] else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            f"{rows:>10,}  {baseline[key]:>10.2f} ms  {candidate[key]:>10.2f} ms  "
+            f"{ratio:>6.2f}x  {case}{flag}"
+        )
+
+    for case, rows in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{rows:>10,}  only in one run: {case}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Time end-to-end reruns of app.py with Streamlit's headless AppTest.
+
+Meant to be run in a fresh process (see run_benchmarks.py) so that caches start
+cold; set GAPMINDER_DATA_PATH to benchmark against another dataset. Prints one JSON
+list of results to stdout.
+
+Usage:
+    GAPMINDER_DATA_PATH=... python -m benchmarks.e2e [--repeat 3]
+"""
+
+import argparse
+import json
+import time
+
+from streamlit.testing.v1 import AppTest
+
+PAGES = [
+    "Home",
+    "Data Exploration",
+    "Stats Analysis",
+    "GDP Distribution",
+    "Time Analysis",
+    "Country Drill-down",
+]
+
+
+def _timed(run) -> float:
+    start = time.perf_counter()
+    run()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_scenario(repeat: int) -> list[dict]:
+    """
+    Run a cold start, then every page and a walk through the years.
+
+    Args:
+        repeat (int): Number of passes over the pages and years.
+
+    Returns:
+        list[dict]: One result per step with its 'case' name and 'samples_ms'.
+    """
+    at = AppTest.from_file("app.py", default_timeout=600)
+    results = [{"case": "e2e.cold_start", "samples_ms": [_timed(at.run)]}]
+    years = list(at.selectbox(key="year").options)
+
+    samples: dict[str, list[float]] = {}
+    for _ in range(repeat):
+        for page in PAGES:
+            at.session_state["nav"] = page
+            samples.setdefault(f"e2e.page.{page}", []).append(_timed(at.run))
+
+        at.session_state["nav"] = "Home"
+        for year in years:
+            select = at.selectbox(key="year").select(int(year))
+            samples.setdefault("e2e.year_change", []).append(_timed(select.run))
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    results += [{"case": case, "samples_ms": ms} for case, ms in samples.items()]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(run_scenario(args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
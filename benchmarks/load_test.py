@@ -0,0 +1,315 @@
+"""
+Load-test the dashboard with concurrent simulated sessions.
+
+Every session is a headless AppTest of app.py running in its own thread of this
+process, so all sessions share the process-wide caches like the sessions of one
+Streamlit server do. Each session clicks through the sidebar navigation and the
+year selector like an analyst would: mostly stepping through consecutive years,
+sometimes jumping, now and then switching pages. The rerun latency of every action
+is recorded, and the run reports its percentiles, the throughput and the peak
+memory. With the --max-* / --min-* limits it exits with status 1 when they are
+exceeded, so it can serve as a regression gate; its JSON output can also be
+compared between commits with benchmarks/compare.py.
+
+Usage:
+    python -m benchmarks.load_test [--sessions 8] [--actions 30] [--think-ms 0]
+        [--max-p95-ms 500] [--min-throughput 5] [--output load.json]
+"""
+
+import argparse
+import json
+import platform
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from unittest import mock
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import (
+    MemoryCacheStorageManager,
+)
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.run_benchmarks import git_commit, summarize
+from constants.constants import DATA_PATH
+from utils.data_loader import load_dataset
+
+# Sidebar button of every page
+NAV_BUTTONS = {
+    "Home": "home_button",
+    "Data Exploration": "date_explorationbutton",
+    "Stats Analysis": "stats_analysis_button",
+    "GDP Distribution": "sunburst_plot_button",
+    "Time Analysis": "time_analysis_button",
+    "Country Drill-down": "country_drilldown_button",
+}
+
+# Pages showing the year selector
+YEAR_PAGES = {"Home", "Data Exploration", "Stats Analysis", "GDP Distribution"}
+
+# Probabilities of the next action: step to the next year, jump to a random year,
+# otherwise switch pages
+STEP_PROBABILITY = 0.65
+JUMP_PROBABILITY = 0.15
+
+
+def percentile(samples: list[float], q: int) -> float:
+    """
+    Return a percentile of some samples, interpolating between the closest ranks.
+
+    Args:
+        samples (list[float]): The samples.
+        q (int): The percentile, between 1 and 99.
+
+    Returns:
+        float: The percentile.
+    """
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+@contextmanager
+def shared_runtime() -> Iterator[None]:
+    """
+    Let AppTests run concurrently in threads of this process.
+
+    Every AppTest run installs a mock runtime as the global Streamlit runtime and
+    removes it when done, which pulls the runtime from under any other session
+    running at the time. Within this context every run sees one mock runtime that
+    lives until the context exits, like the sessions of a server share its runtime.
+    """
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    try:
+        # AppTest installs and removes its own mock on a stand-in class instead
+        stand_in = type("Runtime", (Runtime,), {"_instance": None})
+        with mock.patch("streamlit.testing.v1.app_test.Runtime", stand_in):
+            yield
+    finally:
+        Runtime._instance = None
+
+
+def run_session(
+    seed: int, actions: int, think_ms: float, start: threading.Barrier
+) -> dict:
+    """
+    Simulate one analyst session.
+
+    Args:
+        seed (int): Seed of the session's random click pattern.
+        actions (int): Number of interactions after the initial page load.
+        think_ms (float): Pause between interactions, in milliseconds.
+        start (threading.Barrier): Released once every session is ready, so that
+            all sessions start together.
+
+    Returns:
+        dict: 'samples' maps each kind of action to its latencies in milliseconds,
+        and 'errors' counts reruns that raised.
+    """
+    rng = random.Random(seed)
+    at = AppTest.from_file("app.py", default_timeout=600)
+    samples: dict[str, list[float]] = {}
+    errors = 0
+
+    def timed(kind: str, element):
+        nonlocal errors
+        begin = time.perf_counter()
+        element.run()
+        samples.setdefault(kind, []).append((time.perf_counter() - begin) * 1000)
+        if at.exception:
+            errors += 1
+
+    start.wait()
+    timed("initial_load", at)
+    page = "Home"
+    for _ in range(actions):
+        if think_ms:
+            time.sleep(think_ms / 1000)
+        action = rng.random()
+        if page in YEAR_PAGES and action < STEP_PROBABILITY + JUMP_PROBABILITY:
+            selectbox = at.selectbox(key="year")
+            years = list(selectbox.options)
+            position = years.index(str(selectbox.value))
+            if action < STEP_PROBABILITY:
+                position = (position + 1) % len(years)
+            else:
+                position = rng.randrange(len(years))
+            timed("year_change", selectbox.select(int(years[position])))
+        else:
+            page = rng.choice([name for name in NAV_BUTTONS if name != page])
+            timed("navigation", at.button(key=NAV_BUTTONS[page]).click())
+
+    return {"samples": samples, "errors": errors}
+
+
+def run_load_test(
+    sessions: int, actions: int, think_ms: float = 0, seed: int = 0, warm: bool = True
+) -> dict:
+    """
+    Run concurrent sessions against app.py and summarize their rerun latencies.
+
+    Args:
+        sessions (int): Number of concurrent sessions.
+        actions (int): Interactions per session after the initial load.
+        think_ms (float): Pause between interactions, in milliseconds.
+        seed (int): Seed of the click patterns.
+        warm (bool): Run one session alone first, so the measured sessions find
+            the process-wide caches filled as on a server that is already up.
+
+    Returns:
+        dict: 'latency' with the p50/p95/p99 per kind of action and overall, plus
+        the wall time, throughput in reruns per second, peak RSS and error count.
+    """
+    if warm:
+        run_session(seed - 1, actions, 0, threading.Barrier(1))
+
+    barrier = threading.Barrier(sessions)
+    began = time.perf_counter()
+    with shared_runtime(), ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [
+            pool.submit(run_session, seed + i, actions, think_ms, barrier)
+            for i in range(sessions)
+        ]
+        outcomes = [future.result() for future in futures]
+    wall_s = time.perf_counter() - began
+
+    samples: dict[str, list[float]] = {}
+    for outcome in outcomes:
+        for kind, latencies in outcome["samples"].items():
+            samples.setdefault(kind, []).extend(latencies)
+    samples["all"] = [ms for latencies in samples.values() for ms in latencies]
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (2**20 if sys.platform == "darwin" else 2**10)
+
+    return {
+        "sessions": sessions,
+        "actions": actions,
+        "think_ms": think_ms,
+        "latency": {
+            kind: {
+                "count": len(latencies),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+            }
+            for kind, latencies in samples.items()
+        },
+        "samples_ms": samples,
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(len(samples["all"]) / wall_s, 3),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "errors": sum(outcome["errors"] for outcome in outcomes),
+    }
+
+
+def check_limits(summary: dict, args: argparse.Namespace) -> list[str]:
+    """
+    Return the limits a load test run violated.
+
+    Args:
+        summary (dict): The result of ``run_load_test``.
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        list[str]: One message per violated limit.
+    """
+    overall = summary["latency"]["all"]
+    upper_limits = [
+        ("p95 latency", overall["p95_ms"], args.max_p95_ms, "ms"),
+        ("p99 latency", overall["p99_ms"], args.max_p99_ms, "ms"),
+        ("peak RSS", summary["peak_rss_mb"], args.max_rss_mb, "MB"),
+    ]
+    violations = [
+        f"{name} of {value:,.1f} {unit} exceeds the limit of {limit:,.1f} {unit}"
+        for name, value, limit, unit in upper_limits
+        if limit is not None and value > limit
+    ]
+    throughput = summary["throughput_rps"]
+    if args.min_throughput is not None and throughput < args.min_throughput:
+        violations.append(
+            f"throughput of {throughput:,.1f} reruns/s is below the limit of "
+            f"{args.min_throughput:,.1f} reruns/s"
+        )
+    if summary["errors"]:
+        violations.append(f"{summary['errors']} reruns raised an exception")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--actions", type=int, default=30)
+    parser.add_argument("--think-ms", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cold", action="store_true", help="do not warm the caches up first"
+    )
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    parser.add_argument("--min-throughput", type=float, default=None)
+    parser.add_argument("--max-rss-mb", type=float, default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    summary = run_load_test(
+        args.sessions, args.actions, args.think_ms, args.seed, warm=not args.cold
+    )
+    rows = len(load_dataset(DATA_PATH).df)
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "load": {
+                key: value for key, value in summary.items() if key != "samples_ms"
+            },
+            # Same layout as run_benchmarks.py, so runs can be compared
+            "results": [
+                {
+                    **summarize(f"load.{args.sessions}.{kind}", rows, latencies),
+                    **{
+                        key: value
+                        for key, value in summary["latency"][kind].items()
+                        if key != "count"
+                    },
+                }
+                for kind, latencies in summary["samples_ms"].items()
+            ],
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    for kind, latency in summary["latency"].items():
+        print(
+            f"{kind:>14}  n={latency['count']:<5} p50 {latency['p50_ms']:>9.1f} ms  "
+            f"p95 {latency['p95_ms']:>9.1f} ms  p99 {latency['p99_ms']:>9.1f} ms"
+        )
+    print(
+        f"{summary['sessions']} sessions, {summary['throughput_rps']:.1f} reruns/s, "
+        f"peak RSS {summary['peak_rss_mb']:,.0f} MB, {summary['errors']} errors"
+    )
+
+    violations = check_limits(summary, args)
+    for violation in violations:
+        print(f"FAIL: {violation}", file=sys.stderr)
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Benchmark the dashboard's data-preparation paths on synthetic data of growing size.
+
+Times loading, the per-component data preparation and figure construction without
+any UI, and optionally end-to-end reruns of app.py through AppTest. Results are
+written as JSON so runs on different commits can be compared with
+benchmarks/compare.py.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--sizes 3675 100000 1000000 10000000]
+        [--repeat 5] [--e2e] [--skip-csv] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import generate_gapminder
+from components.data_exploration import build_gdp_life_exp_scatter
+from components.development_time_series import (
+    build_co2_time_series,
+    build_gdp_time_series,
+    build_hdi_time_series,
+)
+from components.gdp_distribution import build_gdp_sunburst
+from components.stastistical_analysis import (
+    build_co2_bar,
+    build_gdp_box,
+    build_hdi_bar,
+    build_life_exp_box,
+)
+from utils.aggregates import build_aggregate_cube
+from utils.aggregation_backends import AGGREGATION_BACKENDS
+from utils.box_stats import box_statistics
+from utils.continent_utils import apply_continent_order, create_continent_time_series_df
+from utils.data_loader import read_gapminder_csv
+from utils.dataset import Dataset
+from utils.hierarchy import aggregate_hierarchy
+from utils.trends import TrendScan
+
+DEFAULT_SIZES = [3_675, 100_000, 1_000_000]
+TIME_SERIES_METRICS = ["gdp", "hdi_index", "co2_consump"]
+FIGURE_BUILDERS = [
+    build_gdp_life_exp_scatter,
+    build_life_exp_box,
+    build_co2_bar,
+    build_gdp_box,
+    build_hdi_bar,
+    build_gdp_sunburst,
+]
+TIME_SERIES_BUILDERS = [
+    build_gdp_time_series,
+    build_hdi_time_series,
+    build_co2_time_series,
+]
+
+
+def measure(run: Callable, repeat: int) -> list[float]:
+    """
+    Call ``run`` ``repeat`` times and return the duration of each call.
+
+    Args:
+        run (Callable): The code to time.
+        repeat (int): Number of calls.
+
+    Returns:
+        list[float]: Durations in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def data_prep_cases(df, year: int) -> dict[str, Callable]:
+    """
+    Return the data-preparation and figure-construction cases for one dataset.
+
+    Args:
+        df (pd.DataFrame): Synthetic data in the loader's schema.
+        year (int): The year used by year-dependent cases.
+
+    Returns:
+        dict[str, Callable]: Callables keyed by case name.
+    """
+    dataset = Dataset(df, "benchmark")
+    cube = dataset.aggregates  # built once here, timed separately below
+    year_df = dataset.year_slice(year)
+    shuffled_year_df = year_df.sample(frac=1, random_state=0)
+
+    cases = {
+        "load.dataset": lambda: Dataset(df, "benchmark"),
+        "prep.aggregate_cube": lambda: build_aggregate_cube(df, years=dataset.years),
+        **{
+            f"prep.aggregate_cube.{backend}": (
+                lambda backend=backend: build_aggregate_cube(
+                    df, years=dataset.years, backend=backend
+                )
+            )
+            for backend in AGGREGATION_BACKENDS
+        },
+        "prep.time_series.legacy": lambda: [
+            create_continent_time_series_df(df, metric)
+            for metric in TIME_SERIES_METRICS
+        ],
+        "prep.time_series.cube": lambda: [
+            cube.time_series_frame(metric) for metric in TIME_SERIES_METRICS
+        ],
+        "prep.year_slice.mask": lambda: df[df["year"] == year],
+        "prep.year_slice.index": lambda: dataset.year_slice(year),
+        "prep.continent_order.sorted": lambda: apply_continent_order(year_df),
+        "prep.continent_order.shuffled": lambda: apply_continent_order(
+            shuffled_year_df
+        ),
+        "prep.hierarchy": lambda: aggregate_hierarchy(
+            year_df, ["continent", "country"], "gdp"
+        ),
+        "prep.trend_scan": lambda: TrendScan(df),
+        "prep.box_statistics": lambda: [
+            box_statistics(year_df, metric) for metric in ["life_exp", "gdp"]
+        ],
+    }
+    for build in FIGURE_BUILDERS:
+        cases[f"figure.{build.__name__}"] = lambda build=build: build(dataset, year)
+    for build in TIME_SERIES_BUILDERS:
+        cases[f"figure.{build.__name__}"] = lambda build=build: build(dataset)
+    return cases
+
+
+def run_e2e(data_path: str | None, repeat: int) -> list[dict]:
+    """
+    Run the AppTest scenario of benchmarks/e2e.py in a fresh process.
+
+    Args:
+        data_path (str | None): CSV the app should load, or None for the bundled
+            dataset.
+        repeat (int): Number of passes of the scenario.
+
+    Returns:
+        list[dict]: The scenario's results.
+    """
+    env = dict(os.environ)
+    if data_path is not None:
+        env["GAPMINDER_DATA_PATH"] = data_path
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.e2e", "--repeat", str(repeat)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(case: str, rows: int, samples: list[float]) -> dict:
+    return {
+        "case": case,
+        "rows": rows,
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "samples_ms": [round(sample, 3) for sample in samples],
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--year", type=int, default=2008)
+    parser.add_argument("--e2e", action="store_true", help="also time AppTest reruns")
+    parser.add_argument(
+        "--skip-csv", action="store_true", help="do not time CSV parsing"
+    )
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            print(f"Benchmarking {rows:,} rows", file=sys.stderr)
+            df = generate_gapminder(rows)
+            csv_path = os.path.join(tmp, f"gapminder_{rows}.csv")
+            if not args.skip_csv or args.e2e:
+                df.to_csv(csv_path, index=False)
+            if not args.skip_csv:
+                samples = measure(
+                    lambda path=csv_path: read_gapminder_csv(path), args.repeat
+                )
+                results.append(summarize("load.parse_csv", len(df), samples))
+
+            for case, run in data_prep_cases(df, args.year).items():
+                results.append(summarize(case, len(df), measure(run, args.repeat)))
+
+            if args.e2e:
+                for result in run_e2e(csv_path, args.repeat):
+                    results.append(
+                        summarize(result["case"], len(df), result["samples_ms"])
+                    )
+
+    report = {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for result in results:
+        print(
+            f"{result['rows']:>10,}  {result['median_ms']:>10.2f} ms  {result['case']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Generate synthetic data shaped like data/gapminder_data_graphs.csv.
+
+Countries are spread over continents in the proportions of the bundled data and
+each gets a persistent development level, so GDP, life expectancy, HDI, CO₂ and
+services stay correlated and trend upwards over the years. Missing values are
+injected at the rates of the bundled data.
+
+Usage:
+    python -m benchmarks.synthetic ROWS OUTPUT.csv [--seed 0]
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from constants.constants import CONTINENT_ORDER, DATA_DTYPES
+
+YEARS = np.arange(1998, 2019)
+
+# Share of countries per continent in the bundled data, in CONTINENT_ORDER
+CONTINENT_WEIGHTS = np.array([47, 51, 39, 19, 8, 11]) / 175
+
+# Fraction of missing values per metric in the bundled data
+NAN_RATES = {"hdi_index": 0.0305, "co2_consump": 0.0011, "gdp": 0.0114}
+
+
+def generate_gapminder(
+    n_rows: int, years: np.ndarray = YEARS, seed: int = 0
+) -> pd.DataFrame:
+    """
+    Generate about ``n_rows`` rows of Gapminder-shaped data in the loader's schema.
+
+    Args:
+        n_rows (int): Target number of rows; rounded up to whole countries.
+        years (np.ndarray): Years every country has a row for.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        pd.DataFrame: Typed data sorted by year, then continent, like the loader's.
+    """
+    rng = np.random.default_rng(seed)
+    years = np.asarray(years)
+    n_countries = max(1, -(-n_rows // len(years)))
+
+    continents = rng.choice(len(CONTINENT_ORDER), n_countries, p=CONTINENT_WEIGHTS)
+    level = rng.normal(0.0, 1.0, n_countries) - 0.6 * (continents == 1)
+    growth = rng.normal(0.02, 0.015, n_countries)
+
+    country = np.repeat(np.arange(n_countries), len(years))
+    year = np.tile(years, n_countries)
+    elapsed = year - years[0]
+    development = level[country] + growth[country] * elapsed
+
+    log_gdp = 8.6 + 1.2 * development + rng.normal(0, 0.1, country.size)
+    gdp = np.exp(log_gdp).clip(200, 120_000)
+    life_exp = (70 + 6 * development + rng.normal(0, 1.5, country.size)).clip(30, 86)
+    hdi_index = (0.68 + 0.15 * development + rng.normal(0, 0.02, country.size)).clip(
+        0.25, 0.96
+    )
+    co2_consump = np.exp(
+        1.0 + 1.1 * development + rng.normal(0, 0.3, country.size)
+    ).clip(0.01, 70)
+    services = (51 + 15 * development + rng.normal(0, 3, country.size)).clip(5, 90)
+
+    df = pd.DataFrame(
+        {
+            "country": pd.Categorical.from_codes(
+                country, [f"Country {i:07d}" for i in range(n_countries)]
+            ),
+            "continent": pd.Categorical.from_codes(
+                continents[country], CONTINENT_ORDER, ordered=True
+            ),
+            "year": year,
+            "life_exp": life_exp.round(1),
+            "hdi_index": hdi_index.round(3),
+            "co2_consump": co2_consump.round(4),
+            "gdp": gdp.round(-1),
+            "services": services.round(1),
+        }
+    )
+    for col, rate in NAN_RATES.items():
+        df.loc[rng.random(len(df)) < rate, col] = np.nan
+
+    df = df.astype({col: DATA_DTYPES[col] for col in df if col != "continent"})
+    return df.sort_values(["year", "continent"], kind="stable", ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_gapminder(args.rows, seed=args.seed).to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
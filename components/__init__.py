@@ -0,0 +1,30 @@
+from components.data_exploration import build_gdp_life_exp_scatter
+from components.development_time_series import (
+    build_co2_time_series,
+    build_gdp_time_series,
+    build_hdi_time_series,
+)
+from components.gdp_distribution import build_gdp_sunburst
+from components.stastistical_analysis import (
+    build_co2_bar,
+    build_gdp_box,
+    build_hdi_bar,
+    build_life_exp_box,
+)
+
+# Charts of a single year, by file name, in the order of the app's sections
+YEAR_CHARTS = {
+    "gdp_life_exp_scatter": build_gdp_life_exp_scatter,
+    "life_exp_box": build_life_exp_box,
+    "co2_bar": build_co2_bar,
+    "gdp_box": build_gdp_box,
+    "hdi_bar": build_hdi_bar,
+    "gdp_sunburst": build_gdp_sunburst,
+}
+
+# Charts spanning every year
+TIME_SERIES_CHARTS = {
+    "gdp_time_series": build_gdp_time_series,
+    "hdi_time_series": build_hdi_time_series,
+    "co2_time_series": build_co2_time_series,
+}
@@ -0,0 +1,163 @@
+import plotly.graph_objects as go
+import streamlit as st
+
+from constants.constants import CONTINENT_COLOR_MAP, COUNTRY_SEARCH_RESULTS
+from utils.charts import dashboard_figure
+from utils.dataset import Dataset
+from utils.figure_cache import cached_figure
+from utils.instrumentation import finish_session_rerun, start_session_rerun, timed
+from utils.rendering import render_chart
+
+# Indicators offered in the drill-down, with their axis titles
+COUNTRY_METRICS = {
+    "life_exp": "Life Expectancy",
+    "gdp": "GDP per Capita",
+    "hdi_index": "HDI Index",
+    "co2_consump": "CO2 Consumption",
+    "services": "Services Employment (%)",
+}
+
+
+@timed("section.country_drilldown")
+def render_country_drilldown(dataset: Dataset):
+    """
+    Render the history of a single country next to its continent's average.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators with at least the
+        columns 'country', 'continent', 'year' and the metrics of
+        ``COUNTRY_METRICS``.
+
+    Returns:
+        None: The function directly renders the page in the Streamlit app.
+    """
+    st.subheader("Country Drill-down")
+    st.caption(
+        "Search for a country to compare its development with the average of its "
+        "continent and the range of its middle half of countries."
+    )
+    render_country_view(dataset)
+
+
+@st.fragment
+def render_country_view(dataset: Dataset):
+    """
+    Render the country search, the indicator selector and the country's chart.
+
+    Runs as a fragment, so searching and selecting rerun this function alone.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators.
+    """
+    # Profiled separately when the fragment reruns on its own
+    timer = start_session_rerun("country_view")
+    try:
+        col_query, col_country, col_metric = st.columns([4, 4, 3], gap="small")
+        with col_query:
+            query = st.text_input(
+                "Search",
+                key="country_query",
+                placeholder="Country name, e.g. Ghana",
+                help="Matches the start of any word of a name, and tolerates typos",
+            )
+
+        matches = dataset.country_search.search(query, limit=COUNTRY_SEARCH_RESULTS)
+        if not matches:
+            st.warning(f"No country matches '{query}'.")
+            return
+
+        with col_country:
+            country = st.selectbox("Country", matches, key="country")
+        with col_metric:
+            metric = st.selectbox(
+                "Indicator",
+                list(COUNTRY_METRICS),
+                format_func=COUNTRY_METRICS.get,
+                key="country_metric",
+            )
+
+        history = dataset.country_history(country)
+        years = history["year"]
+        st.caption(
+            f"{country} ({history['continent'].iloc[0]}): {len(history)} years of "
+            f"data between {years.iloc[0]} and {years.iloc[-1]}."
+        )
+        render_chart(
+            cached_figure(build_country_figure, dataset, country, metric),
+            use_container_width=True,
+        )
+    finally:
+        finish_session_rerun(timer)
+
+
+def build_country_figure(dataset: Dataset, country: str, metric: str) -> go.Figure:
+    """
+    Build a line chart of one country's metric against its continent over the years.
+
+    The continent's average and interquartile range are read from the shared
+    aggregate cube, so only the country's own rows are fetched.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators.
+        country (str): The country to chart.
+        metric (str): The metric to chart, a key of ``COUNTRY_METRICS``.
+
+    Returns:
+        go.Figure: The line chart.
+    """
+    history = dataset.country_history(country)
+    continent = str(history["continent"].iloc[0])
+    title = COUNTRY_METRICS[metric]
+    color = CONTINENT_COLOR_MAP.get(continent, "black")
+
+    traces = []
+    cube = dataset.aggregates
+    if continent in cube.continents:
+        position = cube.continents.index(continent)
+        traces += [
+            go.Scatter(
+                x=cube.years,
+                y=cube.get(metric, "q3")[position],
+                mode="lines",
+                line_width=0,
+                showlegend=False,
+                hoverinfo="skip",
+            ),
+            go.Scatter(
+                x=cube.years,
+                y=cube.get(metric, "q1")[position],
+                mode="lines",
+                line_width=0,
+                fill="tonexty",
+                fillcolor="rgba(128, 128, 128, 0.2)",
+                name=f"{continent} middle 50%",
+                hoverinfo="skip",
+            ),
+            go.Scatter(
+                x=cube.years,
+                y=cube.get(metric)[position],
+                mode="lines",
+                line=dict(color=color, dash="dash"),
+                name=f"{continent} average",
+                hovertemplate=f"%{{x}}<br>{continent} average: %{{y:,.2f}}"
+                "<extra></extra>",
+            ),
+        ]
+    traces.append(
+        go.Scatter(
+            x=history["year"].to_numpy(),
+            y=history[metric].to_numpy(),
+            mode="lines+markers",
+            line_color=color,
+            name=country,
+            hovertemplate=f"%{{x}}<br>{country}: %{{y:,.2f}}<extra></extra>",
+        )
+    )
+
+    return dashboard_figure(
+        traces,
+        f"{title} of {country} compared with {continent}",
+        x_title="Year",
+        y_title=title,
+        legend_title_text=None,
+    )
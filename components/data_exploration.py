@@ -1,12 +1,49 @@
-import pandas as pd
-import plotly.express as px
+import numpy as np
+import plotly.graph_objects as go
 import streamlit as st
 
-from constants.constants import CONTINENT_COLOR_MAP
-from utils.continent_utils import apply_continent_order
+from constants.constants import (
+    CONTINENT_COLOR_MAP,
+    CONTINENT_ORDER,
+    HIGH_HDI_THRESHOLD,
+    SCATTER_ANIMATION_FRAME_MS,
+    SCATTER_ANIMATION_MAX_POINTS,
+)
+from utils.charts import (
+    continent_scatter_traces,
+    dashboard_figure,
+    year_animation_controls,
+)
+from utils.continent_utils import continent_codes
+from utils.dataset import Dataset
+from utils.figure_cache import cached_figure, cached_year_figure
+from utils.instrumentation import timed
+from utils.rendering import render_chart
+from utils.scatter_density import density_scatter_traces, scatter_render_mode
 
+# Hover details of the GDP vs. life expectancy scatter (customdata order matters)
+SCATTER_HOVER_COLUMNS = ["continent", "country", "hdi_index", "gdp", "life_exp"]
+SCATTER_HOVER_TEMPLATE = (
+    "<b>%{customdata[1]}</b><br>"
+    + "Continent: %{customdata[0]}<br>"
+    + "GDP: $%{x:,.0f}<br>"
+    + "Life Expectancy: %{y:.1f} years<br>"
+    + "HDI: %{customdata[2]:.3f}<br>"
+    + "<extra></extra>"
+)
 
-def render_data_exploration(df: pd.DataFrame, year: int):
+# Hover details of the animated scatter, whose frames only update x and y
+ANIMATION_HOVER_TEMPLATE = (
+    "<b>%{customdata}</b><br>"
+    + "Continent: %{fullData.name}<br>"
+    + "GDP: $%{x:,.0f}<br>"
+    + "Life Expectancy: %{y:.1f} years<br>"
+    + "<extra></extra>"
+)
+
+
+@timed("section.data_exploration")
+def render_data_exploration(dataset: Dataset, year: int):
     """
     Render key development metrics and a GDP vs. life expectancy scatter plot for a
     given year.
@@ -17,9 +54,8 @@ def render_data_exploration(df: pd.DataFrame, year: int):
     countries having very high HDI (≥ 0.8).
 
     Args:
-        df (pd.DataFrame): DataFrame containing development indicators with
-        columns such as 'year', 'continent', 'country', 'gdp', 'life_exp', and
-        'hdi_index'.
+        dataset (Dataset): Loaded development indicators with columns such as
+        'year', 'continent', 'country', 'gdp', 'life_exp', and 'hdi_index'.
 
         year (int): The selected year for exploration and visualization.
 
@@ -30,12 +66,12 @@ def render_data_exploration(df: pd.DataFrame, year: int):
     st.subheader(f"Data Exploration for the year {year}")
 
     # Add a year selector
-    selected_year_df = df[df["year"] == year]
+    selected_year_df = dataset.year_slice(year)
 
     # Calculate the average GDP, life expectancy, and HDI for the selected year
-    avg_gdp = round(selected_year_df["gdp"].mean(), 2)
-    avg_life_exp = round(selected_year_df["life_exp"].mean(), 2)
-    avg_hdi = round(selected_year_df["hdi_index"].mean(), 2)
+    avg_gdp = round(float(selected_year_df["gdp"].mean()), 2)
+    avg_life_exp = round(float(selected_year_df["life_exp"].mean()), 2)
+    avg_hdi = round(float(selected_year_df["hdi_index"].mean()), 2)
 
     # Display the average GDP, life expectancy, and HDI for the selected year
     col_avg_gdp, col_avg_life_exp, col_avg_hdi = st.columns([4, 4, 4], gap="small")
@@ -58,78 +94,84 @@ def render_data_exploration(df: pd.DataFrame, year: int):
             label="Avg HDI", value=f"{avg_hdi}", help=f"Average HDI for the year {year}"
         )
 
-    # Use consistent continent order from constants
-    scatter_data = apply_continent_order(selected_year_df)
+    if dataset.is_filled:
+        start, stop = dataset.year_index.offsets(year)
+        imputed = np.count_nonzero(dataset.gaps.imputed_bits[start:stop])
+        st.caption(
+            f"Gaps filled: {imputed} of the {stop - start} countries have imputed "
+            f"values in {year}."
+        )
+
+    # Insight about the continent with the most very high HDI countries
+    insight = dataset.insights.high_hdi(year)
+    if insight is not None:
+        st.info(insight)
 
-    # Calculate insight about high HDI countries by continent
-    high_hdi_threshold = 0.8  # Very high human development
-    high_hdi_data = scatter_data.dropna(subset=["hdi_index"])
-    high_hdi_by_continent = (
-        high_hdi_data[high_hdi_data["hdi_index"] >= high_hdi_threshold]
-        .groupby("continent", observed=True)
-        .size()
+    play = st.toggle(
+        "Play all years",
+        key="play_years",
+        help="Animate the scatter through every year in the browser",
     )
+    if play and len(dataset.df) <= SCATTER_ANIMATION_MAX_POINTS:
+        render_chart(cached_figure(build_gdp_life_exp_animation, dataset))
+    else:
+        if play:
+            st.caption(
+                "There are too many countries to animate every year at once; "
+                "showing the selected year."
+            )
+        render_chart(cached_year_figure(build_gdp_life_exp_scatter, dataset, year))
 
-    if not high_hdi_by_continent.empty:
-        max_continent = high_hdi_by_continent.idxmax()
-        max_count = high_hdi_by_continent.max()
-        st.info(
-            f"🔍 **Key Insight**: {max_continent} has the most countries with very "
-            f"hight human development (HDI ≥ 0.8) with {max_count} countries, "
-            f"indicating superior social and economic development."
-        )
 
-    # Create the scatter plot
-    fig = px.scatter(
-        data_frame=scatter_data,
-        title=f"Life Expectancy by GDP per Capita for countries across continents "
-        f"({year})",
-        x="gdp",
-        y="life_exp",
-        color="continent",
-        template="plotly_white",
-        color_discrete_map=CONTINENT_COLOR_MAP,
-        opacity=0.7,
-        hover_data=["continent", "country", "hdi_index", "gdp", "life_exp"],
-    )
+def build_gdp_life_exp_scatter(dataset: Dataset, year: int) -> go.Figure:
+    """
+    Build the GDP per capita vs. life expectancy scatter plot for a year.
 
-    # Force white background and black text
-    fig.update_layout(
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        font_color="black",
-        title_font_color="black",
-        xaxis=dict(
-            color="black",
-            gridcolor="lightgray",
-            tickfont=dict(color="black"),
-            title=dict(text="GDP", font=dict(color="black")),
-        ),
-        yaxis=dict(
-            title="Life Expectancy",
-            color="black",
-            gridcolor="lightgray",
-            tickfont=dict(color="black"),
-            title_font_color="black",
-        ),
-        legend=dict(
-            title_text="Continent", font_color="black", title_font_color="black"
-        ),
+    Args:
+        dataset (Dataset): Loaded development indicators.
+        year (int): The year to chart.
+
+    Returns:
+        go.Figure: The scatter plot, with a marker at the average GDP of countries
+        with very high HDI.
+    """
+    # Rows are already in continent order, so the year slice is used as is
+    scatter_data = dataset.year_slice(year)
+    title = (
+        f"Life Expectancy by GDP per Capita for countries across continents ({year})"
     )
 
-    # Update traces to ensure text is black and format hover data
-    fig.update_traces(
-        textfont_color="black",
-        hovertemplate="<b>%{customdata[1]}</b><br>"
-        + "Continent: %{customdata[0]}<br>"
-        + "GDP: $%{x:,.0f}<br>"
-        + "Life Expectancy: %{y:.1f} years<br>"
-        + "HDI: %{customdata[2]:.3f}<br>"
-        + "<extra></extra>",
+    # Pick SVG, WebGL or server-side binning depending on the number of points
+    render_mode = scatter_render_mode(len(scatter_data))
+
+    if render_mode == "density":
+        traces = density_scatter_traces(
+            scatter_data,
+            x="gdp",
+            y="life_exp",
+            hover_columns=SCATTER_HOVER_COLUMNS,
+            hovertemplate=SCATTER_HOVER_TEMPLATE,
+        )
+    else:
+        traces = continent_scatter_traces(
+            scatter_data,
+            x="gdp",
+            y="life_exp",
+            hover_columns=SCATTER_HOVER_COLUMNS,
+            hovertemplate=SCATTER_HOVER_TEMPLATE,
+            webgl=render_mode == "webgl",
+        )
+
+    fig = dashboard_figure(
+        traces,
+        title,
+        x_title="GDP",
+        y_title="Life Expectancy",
+        legend_title_text="Continent",
     )
 
-    # Add horizontal line for HDI >= 0.9
-    high_hdi_countries = selected_year_df[selected_year_df["hdi_index"] >= 0.8]
+    # Countries with very high human development
+    high_hdi_countries = scatter_data[scatter_data["hdi_index"] >= HIGH_HDI_THRESHOLD]
     if not high_hdi_countries.empty:
         # Add vertical line at average GDP of high HDI countries
         avg_gdp_high_hdi = high_hdi_countries["gdp"].mean()
@@ -137,9 +179,83 @@ def render_data_exploration(df: pd.DataFrame, year: int):
             x=avg_gdp_high_hdi,
             line_dash="dash",
             line_color="red",
-            annotation_text=f"HDI ≥ 0.8 indicates very high human development "
-            f"(Avg GDP: ${avg_gdp_high_hdi:.0f})",
+            annotation_text=f"HDI ≥ {HIGH_HDI_THRESHOLD} indicates very high "
+            f"human development (Avg GDP: ${avg_gdp_high_hdi:.0f})",
             annotation_position="top",
         )
 
-    st.plotly_chart(fig)
+    return fig
+
+
+def build_gdp_life_exp_animation(dataset: Dataset) -> go.Figure:
+    """
+    Build the GDP per capita vs. life expectancy scatter animated over every year.
+
+    Every country keeps its position within its continent's trace in all frames, so
+    the frames only carry x and y arrays; names, colors and hover templates are
+    sent once with the first year's traces. Values are rounded to the precision the
+    hover shows and sent as float32.
+
+    Args:
+        dataset (Dataset): Loaded development indicators.
+
+    Returns:
+        go.Figure: The scatter of the first year with one frame per year, a play
+        button and a year slider.
+    """
+    df = dataset.df
+    years = dataset.years.tolist()
+    countries = df["country"].cat.categories
+    country_codes = df["country"].cat.codes.to_numpy()
+    year_codes = np.searchsorted(dataset.years, df["year"].to_numpy())
+
+    # Dense country × year grid of both axes, NaN where a country has no row
+    grid = np.full((2, len(countries), len(years)), np.nan, dtype=np.float32)
+    grid[0, country_codes, year_codes] = df["gdp"].to_numpy().round(0)
+    grid[1, country_codes, year_codes] = df["life_exp"].to_numpy().round(1)
+    country_continents = np.full(len(countries), -1)
+    country_continents[country_codes] = continent_codes(df)
+
+    members = [
+        (continent, np.flatnonzero(country_continents == code))
+        for code, continent in enumerate(CONTINENT_ORDER)
+    ]
+    members = [(continent, rows) for continent, rows in members if rows.size]
+    traces = [
+        go.Scatter(
+            x=grid[0, rows, 0],
+            y=grid[1, rows, 0],
+            mode="markers",
+            name=continent,
+            marker=dict(color=CONTINENT_COLOR_MAP[continent], opacity=0.7),
+            customdata=countries[rows].to_numpy(dtype=object),
+            hovertemplate=ANIMATION_HOVER_TEMPLATE,
+        )
+        for continent, rows in members
+    ]
+    frames = [
+        go.Frame(
+            name=str(year),
+            data=[
+                go.Scatter(x=grid[0, rows, position], y=grid[1, rows, position])
+                for _, rows in members
+            ],
+        )
+        for position, year in enumerate(years)
+    ]
+
+    # Fixed axes, so that the points move instead of the axes
+    gdp, life_exp = grid[0], grid[1]
+    fig = dashboard_figure(
+        traces,
+        "Life Expectancy by GDP per Capita for countries across continents "
+        f"({years[0]}-{years[-1]})",
+        x_title="GDP",
+        y_title="Life Expectancy",
+        legend_title_text="Continent",
+        xaxis_range=[0, float(np.nanmax(gdp)) * 1.05],
+        yaxis_range=[float(np.nanmin(life_exp)) - 2, float(np.nanmax(life_exp)) + 2],
+        **year_animation_controls(years, SCATTER_ANIMATION_FRAME_MS),
+    )
+    fig.frames = frames
+    return fig
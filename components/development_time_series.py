@@ -1,31 +1,44 @@
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
 
-from constants.constants import CONTINENT_COLOR_MAP
-from utils.continent_utils import create_continent_time_series_df
+from constants.constants import (
+    METRIC_LABELS,
+    TREND_SHIFT_RESULTS,
+    TREND_SHOCK_RESULTS,
+)
+from utils.charts import continent_line_traces, dashboard_figure
+from utils.dataset import Dataset
+from utils.figure_cache import cached_figure
+from utils.instrumentation import timed
+from utils.rendering import render_chart
 
 
-def render_development_time_series(df: pd.DataFrame):
+@timed("section.time_analysis")
+def render_development_time_series(dataset: Dataset):
     """
     Render interactive time series charts for GDP, HDI, and CO₂ consumption by
     continent.
 
     Displays three Plotly line charts in Streamlit showing the development of GDP per
     capita, HDI index, and CO₂ consumption across continents over time. Highlights key
-    trends such as the 2008 financial crisis impact on CO₂ consumption.
+    trends detected in the data, such as the broadest year-over-year drop in CO₂
+    consumption, marks the years of widespread shocks on the charts and lists the
+    countries whose changes broke most with their trend, and those whose growth
+    shifted most.
 
     Args:
-        df (pd.DataFrame): DataFrame containing yearly development indicators with at
-        least the following columns: 'year', 'continent', 'gdp', 'hdi_index', and
+        dataset (Dataset): Loaded yearly development indicators with at least the
+        following columns: 'year', 'continent', 'gdp', 'hdi_index', and
         'co2_consump'.
 
     Returns:
         None: The function directly renders charts in the Streamlit app.
     """
+    first_year, last_year = dataset.years[0], dataset.years[-1]
+
     st.subheader(
-        f"Development Time Series from {df['year'].min()} to {df['year'].max()} by "
-        f"continent."
+        f"Development Time Series from {first_year} to {last_year} by continent."
     )
     st.caption(
         "**Note: Time series charts are not filtered by year, so the data is displayed "
@@ -33,136 +46,184 @@ def render_development_time_series(df: pd.DataFrame):
     )
 
     st.info(
-        "🔍 **Key Insight**: The development of life expectancy, GDP, and HDI has been "
-        "relatively consistent across continents, with most regions showing a gradual "
-        " increase over the years. After the 2008 financial crisis, there was a "
-        "significant decrease in CO2 consumption for most continents except for South "
-        "American and African countries."
+        dataset.insights.development_trend(
+            ["life_exp", "gdp", "hdi_index"], shock_metric="co2_consump"
+        )
     )
 
-    melted_df = create_continent_time_series_df(df, "gdp")
-
-    # Create line chart using Plotly
-    fig = px.line(
-        melted_df,
-        x="year",
-        y="gdp",
-        color="continent",
-        title=f"GDP Development Time Series ({df['year'].min()}-{df['year'].max()})",
-        color_discrete_map=CONTINENT_COLOR_MAP,
+    # The charts do not depend on the selected year, so they are served from the
+    # shared figure cache until the data changes
+    render_chart(
+        cached_figure(build_gdp_time_series, dataset), use_container_width=True
     )
-
-    fig.update_layout(
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        font_color="black",
-        title_font_color="black",
-        xaxis=dict(
-            tickfont=dict(color="black"),
-            title=dict(text="Year", font=dict(color="black")),
-        ),
-        yaxis=dict(
-            tickfont=dict(color="black"),
-            title=dict(text="GDP per Capita", font=dict(color="black")),
-            gridcolor="lightgray",
-        ),
-        legend=dict(
-            title_text="Continent", font_color="black", title_font_color="black"
-        ),
+    render_chart(
+        cached_figure(build_hdi_time_series, dataset), use_container_width=True
     )
-
-    # Add vertical line at year 2008
-    fig.add_vline(
-        x=2008,
-        line_dash="dash",
-        line_color="red",
-        annotation_text="2008: Financial Crisis. 2009: GDP slump, recovery starts with "
-        "stimulus",
-        annotation_position="top",
+    render_chart(
+        cached_figure(build_co2_time_series, dataset), use_container_width=True
     )
 
-    fig.add_vline(
-        x=2009,
-        line_dash="dash",
-        line_color="red",
-        annotation_text="",
-        annotation_position="top",
+    render_trend_shocks(dataset)
+    render_trend_shifts(dataset)
+
+
+def render_trend_shocks(dataset: Dataset):
+    """
+    Render the strongest shocks: the countries whose year-over-year change broke
+    most with their trend.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators.
+    """
+    shocks = dataset.trends.strongest_shocks(TREND_SHOCK_RESULTS)
+    st.markdown("**Countries breaking with their trend**")
+    if shocks.empty:
+        st.caption("No country's change broke with its recent trend.")
+        return
+    st.caption(
+        f"The strongest year-over-year changes relative to each country's changes "
+        f"over the previous {dataset.trends.window} years, in standard deviations "
+        "(z-score), with the country's mean over those years (rolling mean)."
     )
+    _render_flags(shocks, {"value": 3, "change": 3, "rolling_mean": 3, "z_score": 1})
 
-    st.plotly_chart(fig, use_container_width=True)
 
-    hdi_melted_df = create_continent_time_series_df(df, "hdi_index")
-    fig = px.line(
-        hdi_melted_df,
-        x="year",
-        y="hdi_index",
-        color="continent",
-        title=f"HDI Development Time Series ({df['year'].min()}-{df['year'].max()})",
-        color_discrete_map=CONTINENT_COLOR_MAP,
+def render_trend_shifts(dataset: Dataset):
+    """
+    Render the strongest trend shifts: the countries whose growth changed most
+    from one year on.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators.
+    """
+    shifts = dataset.trends.strongest_shifts(TREND_SHIFT_RESULTS)
+    st.markdown("**Countries shifting their trend**")
+    if shifts.empty:
+        st.caption("No country's growth shifted.")
+        return
+    window = dataset.trends.window
+    st.caption(
+        f"The years in which a country's mean yearly change over the next {window} "
+        f"years differed most from its mean over the previous {window} years, as a "
+        "t statistic (t-score)."
     )
+    _render_flags(shifts, {"change_before": 3, "change_after": 3, "t_score": 1})
 
-    fig.update_layout(
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        font_color="black",
-        title_font_color="black",
-        xaxis=dict(
-            tickfont=dict(color="black"),
-            title=dict(text="Year", font=dict(color="black")),
-        ),
-        yaxis=dict(
-            tickfont=dict(color="black"),
-            title=dict(text="HDI Index", font=dict(color="black")),
-        ),
-        legend=dict(
-            title_text="Continent", font_color="black", title_font_color="black"
+
+def _render_flags(flags: pd.DataFrame, decimals: dict[str, int]):
+    flags["metric"] = flags["metric"].map(METRIC_LABELS)
+    # Rounded in float64, so float32 values do not show spurious digits
+    flags[list(decimals)] = flags[list(decimals)].astype(float).round(decimals)
+    st.dataframe(flags, hide_index=True, width="stretch")
+
+
+def continent_time_series_figure(
+    dataset: Dataset, metric: str, title: str, y_title: str
+) -> go.Figure:
+    """
+    Build a line chart of a metric's continent means over the years.
+
+    Years in which unusually many countries had a shock in the metric, in the same
+    direction, are marked with a dashed line.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators.
+        metric (str): The metric to chart.
+        title (str): The chart title.
+        y_title (str): Title of the y axis.
+
+    Returns:
+        go.Figure: The line chart, one line per continent.
+    """
+    cube = dataset.aggregates
+    fig = dashboard_figure(
+        continent_line_traces(
+            cube.years,
+            cube.get(metric),
+            cube.continents,
+            hovertemplate=f"%{{x}}<br>{y_title}: %{{y:,.2f}}",
         ),
+        title,
+        x_title="Year",
+        y_title=y_title,
+        legend_title_text="Continent",
     )
-    st.plotly_chart(fig, use_container_width=True)
-
-    co2_melted_df = create_continent_time_series_df(df, "co2_consump")
-    fig = px.line(
-        co2_melted_df,
-        x="year",
-        y="co2_consump",
-        color="continent",
-        title=f"CO2 Consumption Development Time Series ("
-        f"{df['year'].min()}-{df['year'].max()})",
-        color_discrete_map=CONTINENT_COLOR_MAP,
-    )
-    fig.update_layout(
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        font_color="black",
-        title_font_color="black",
-        xaxis=dict(
-            tickfont=dict(color="black"),
-            title=dict(text="Year", font=dict(color="black")),
-        ),
-        yaxis=dict(
-            tickfont=dict(color="black"),
-            title=dict(text="CO2 Consumption", font=dict(color="black")),
-        ),
-        legend=dict(
-            title_text="Continent", font_color="black", title_font_color="black"
-        ),
+
+    label = METRIC_LABELS[metric]
+    for shock in dataset.trends.shock_years(metric):
+        verb = "fell" if shock["direction"] < 0 else "rose"
+        fig.add_vline(
+            x=shock["year"],
+            line_dash="dash",
+            line_color="red",
+            annotation_text=f"{shock['year']}: {label} {verb} against the trend in "
+            f"{shock['countries']} countries ({shock['share']:.0%})",
+            annotation_position="top",
+        )
+    return fig
+
+
+def build_gdp_time_series(dataset: Dataset) -> go.Figure:
+    """
+    Build the GDP per capita line chart by continent.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators.
+
+    Returns:
+        go.Figure: The line chart.
+    """
+    first_year, last_year = dataset.years[0], dataset.years[-1]
+
+    fig = continent_time_series_figure(
+        dataset,
+        "gdp",
+        f"GDP Development Time Series ({first_year}-{last_year})",
+        y_title="GDP per Capita",
     )
 
-    # Add vertical line at year 2008
-    fig.add_vline(
-        x=2008,
-        line_dash="dash",
-        line_color="red",
-        annotation_text="2008–2009: CO₂ fell with the GDP slump, then rose as recovery "
-        "began.",
-        annotation_position="top",
+    return fig
+
+
+def build_hdi_time_series(dataset: Dataset) -> go.Figure:
+    """
+    Build the HDI line chart by continent.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators.
+
+    Returns:
+        go.Figure: The line chart.
+    """
+    first_year, last_year = dataset.years[0], dataset.years[-1]
+
+    fig = continent_time_series_figure(
+        dataset,
+        "hdi_index",
+        f"HDI Development Time Series ({first_year}-{last_year})",
+        y_title="HDI Index",
     )
 
-    fig.add_vline(
-        x=2009,
-        line_dash="dash",
-        line_color="red",
-        annotation_text="",
-        annotation_position="top",
+    return fig
+
+
+def build_co2_time_series(dataset: Dataset) -> go.Figure:
+    """
+    Build the CO₂ consumption line chart by continent.
+
+    Args:
+        dataset (Dataset): Loaded yearly development indicators.
+
+    Returns:
+        go.Figure: The line chart.
+    """
+    first_year, last_year = dataset.years[0], dataset.years[-1]
+
+    fig = continent_time_series_figure(
+        dataset,
+        "co2_consump",
+        f"CO2 Consumption Development Time Series ({first_year}-{last_year})",
+        y_title="CO2 Consumption",
     )
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
@@ -1,11 +1,17 @@
-import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
 
 from constants.constants import CONTINENT_COLOR_MAP
+from utils.charts import DASHBOARD_TEMPLATE
+from utils.dataset import Dataset
+from utils.figure_cache import cached_year_figure
+from utils.hierarchy import aggregate_hierarchy, top_nodes
+from utils.instrumentation import timed
+from utils.rendering import render_chart
 
 
-def render_gdp_distribution_plot(df: pd.DataFrame, year: int):
+@timed("section.gdp_distribution")
+def render_gdp_distribution_plot(dataset: Dataset, year: int):
     """
     Render a sunburst chart showing global GDP distribution by continent and country.
 
@@ -13,47 +19,65 @@ def render_gdp_distribution_plot(df: pd.DataFrame, year: int):
     highest-GDP country in every continent for the selected year.
 
     Args:
-        df (pd.DataFrame): DataFrame containing GDP data with columns such as
-            'year', 'continent', 'country', and 'gdp'.
+        dataset (Dataset): Loaded GDP data with columns such as 'year',
+            'continent', 'country', and 'gdp'.
         year (int): The selected year for which GDP distribution is visualized.
 
     Returns:
         None: The function directly renders the chart and summary in the Streamlit app.
     """
     st.subheader(f"Global GDP Distribution by Region and Country for the year {year}")
-    selected_year_df = df[df["year"] == year]
+    selected_year_df = dataset.year_slice(year)
+
+    # Totals, continent shares and sibling ranks for every node of the sunburst
+    nodes = aggregate_hierarchy(selected_year_df, ["continent", "country"], "gdp")
 
     # Get highest GDP country for each continent
-    highest_gdp_by_continent = selected_year_df.loc[
-        selected_year_df.groupby("continent", observed=True)["gdp"].idxmax()
-    ]
+    highest_gdp_by_continent = top_nodes(nodes, depth=1)
 
     # Create info text with highest GDP countries
-    continent_info = []
-    for _, row in highest_gdp_by_continent.iterrows():
-        continent_info.append(
-            f"- **{row['continent']}**: {row['country']} (${row['gdp']:,.0f})"
-        )
+    continent_info = (
+        "- **"
+        + highest_gdp_by_continent["root"]
+        + "**: "
+        + highest_gdp_by_continent["label"]
+        + highest_gdp_by_continent["value"].map(" (${:,.0f})".format)
+    )
 
     info_text = "🏆 **Highest GDP by Continent**:\n\n" + "\n".join(continent_info)
     st.info(info_text)
 
-    # Calculate percentage of country GDP within each continent
-    continent_totals = selected_year_df.groupby("continent", observed=True)["gdp"].sum()
-    selected_year_df = selected_year_df.copy()
-    selected_year_df["continent_percentage"] = selected_year_df.apply(
-        lambda row: (row["gdp"] / continent_totals[row["continent"]]) * 100, axis=1
+    render_chart(
+        cached_year_figure(build_gdp_sunburst, dataset, year), use_container_width=True
+    )
+
+
+def build_gdp_sunburst(dataset: Dataset, year: int) -> go.Figure:
+    """
+    Build the sunburst of GDP by continent and country for a year.
+
+    Args:
+        dataset (Dataset): Loaded GDP data.
+        year (int): The year to chart.
+
+    Returns:
+        go.Figure: The sunburst, with each node's share of its parent on hover.
+    """
+    nodes = aggregate_hierarchy(
+        dataset.year_slice(year), ["continent", "country"], "gdp"
     )
 
     # Create sunburst plot with custom hover data
-    fig = px.sunburst(
-        selected_year_df,
-        path=["continent", "country"],
-        values="gdp",
-        title=f"GDP Distribution by Continent and Country ({year})",
-        custom_data=["continent_percentage"],
-        color="continent",
-        color_discrete_map=CONTINENT_COLOR_MAP,
+    fig = go.Figure(
+        go.Sunburst(
+            ids=nodes["id"],
+            labels=nodes["label"],
+            parents=nodes["parent"],
+            values=nodes["value"],
+            branchvalues="total",
+            customdata=nodes[["share"]],
+            marker=dict(colors=nodes["root"].map(CONTINENT_COLOR_MAP)),
+        )
     )
 
     # Update hover template to show percentage
@@ -66,14 +90,12 @@ def render_gdp_distribution_plot(df: pd.DataFrame, year: int):
 
     # Update layout for consistent styling and size
     fig.update_layout(
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        font_color="black",
-        title_font_color="black",
+        template=DASHBOARD_TEMPLATE,
+        title=f"GDP Distribution by Continent and Country ({year})",
         width=1000,  # Set specific width
         height=600,  # Set specific height
         margin=dict(b=0),  # Remove all margins
         autosize=False,
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
@@ -1,6 +1,12 @@
+import pandas as pd
 import streamlit as st
 
-st.cache_resource.clear()
+from constants.constants import CACHE_ADMIN_ENABLED
+from utils.cache_lifecycle import get_cache_lifecycle
+from utils.figure_cache import get_figure_cache
+from utils.ingestion import reload_data_source
+from utils.instrumentation import profiling_enabled
+from utils.prefetch import get_prefetcher
 
 
 def render_sidebar():
@@ -8,7 +14,8 @@ def render_sidebar():
     Render the Streamlit sidebar navigation and manage the selected page state.
 
     Creates sidebar buttons for navigating between app sections and updates the
-    session state with the current page selection.
+    session state with the current page selection. The 'Fill gaps' toggle below
+    them switches the whole app between raw and gap-filled metrics.
 
     Returns:
         str: The name of the selected navigation page.
@@ -36,5 +43,83 @@ def render_sidebar():
         "Time Analysis", key="time_analysis_button", use_container_width=True
     ):
         st.session_state.nav = "Time Analysis"
+    if st.sidebar.button(
+        "Country Drill-down", key="country_drilldown_button", use_container_width=True
+    ):
+        st.session_state.nav = "Country Drill-down"
+
+    st.sidebar.toggle(
+        "Fill gaps",
+        key="fill_gaps",
+        help="Interpolate missing values within each country's series and repeat "
+        "its first and last observed values beyond them",
+    )
+
+    if profiling_enabled():
+        render_performance_panel()
+    if CACHE_ADMIN_ENABLED:
+        render_cache_panel()
 
     return st.session_state.nav
+
+
+def render_performance_panel():
+    """
+    Render the timings of the last profiled rerun and the figure cache counters.
+
+    The panel is rendered before the rest of the page, so it shows the rerun before
+    the current one. Fragment reruns (e.g. a year change) show up on the next full
+    rerun.
+    """
+    with st.sidebar.expander("Performance"):
+        record = st.session_state.get("last_rerun_timings")
+        if record is None:
+            st.caption("Timings appear after the first profiled rerun.")
+        else:
+            st.caption(f"Last {record['label']} rerun: {record['total_ms']:,.1f} ms")
+            spans = pd.DataFrame(record["spans"])
+            spans["name"] = spans["depth"].map("· ".__mul__) + spans["name"]
+            columns = [
+                column
+                for column in ("name", "duration_ms", "cache", "chart", "bytes")
+                if column in spans
+            ]
+            st.dataframe(spans[columns], hide_index=True, width="stretch")
+
+        stats = get_figure_cache().stats()
+        st.caption(
+            f"Figure cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['entries']} figures ({stats['bytes'] / 2**20:,.1f} MiB)"
+        )
+        prefetch = get_prefetcher().stats()
+        st.caption(
+            f"Prefetch: {prefetch['built']} built, {prefetch['cancelled']} "
+            f"cancelled, {prefetch['pending']} pending"
+        )
+
+
+def render_cache_panel():
+    """
+    Render the cached data versions and controls to purge them, for operators.
+
+    Only shown when ``GAPMINDER_CACHE_ADMIN`` is set, as purging affects every
+    session of the server.
+    """
+    lifecycle = get_cache_lifecycle()
+    with st.sidebar.expander("Caches"):
+        state = lifecycle.describe()
+        for path, version in state["sources"].items():
+            st.caption(f"{path}: version {version}")
+        if state["figures"]:
+            figures = pd.DataFrame.from_dict(state["figures"], orient="index")
+            figures["MiB"] = (figures.pop("bytes") / 2**20).round(2)
+            st.dataframe(figures.rename_axis("version"), width="stretch")
+
+        if st.button("Drop stale figures", key="purge_stale_figures_button"):
+            st.toast(f"Dropped {lifecycle.purge_stale_figures()} figures")
+        if st.button("Reload data", key="reload_data_button"):
+            reload_data_source()
+            st.rerun()
+
+        if state["events"]:
+            st.dataframe(pd.DataFrame(state["events"]), hide_index=True)
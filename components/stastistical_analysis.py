@@ -1,12 +1,27 @@
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
 
 from constants.constants import CONTINENT_COLOR_MAP
-from utils.continent_utils import apply_continent_order
-
-
-def render_statistical_analysis(df: pd.DataFrame, year: int):
+from utils.box_stats import box_statistics
+from utils.charts import continent_bar_traces, dashboard_figure
+from utils.dataset import Dataset
+from utils.figure_cache import cached_year_figure
+from utils.instrumentation import timed
+from utils.rendering import render_chart
+
+# Layout shared by the per-continent charts of this section, on top of the template
+CONTINENT_CHART_LAYOUT = dict(
+    showlegend=False,
+    title_font_size=15,
+    xaxis_tickangle=45,
+    margin=dict(l=0, r=0, t=40, b=0),
+)
+BAR_HOVER_TEMPLATE = "<b>%{x}</b><br>%{y:,.2f}<extra></extra>"
+
+
+@timed("section.statistical_analysis")
+def render_statistical_analysis(dataset: Dataset, year: int):
     """
     Render statistical charts analyzing GDP, life expectancy, CO₂, and HDI by continent.
 
@@ -15,8 +30,8 @@ def render_statistical_analysis(df: pd.DataFrame, year: int):
     rends.
 
     Args:
-        df (pd.DataFrame): DataFrame containing development indicators with columns such
-        as: 'year', 'continent', 'gdp', 'life_exp', 'hdi_index', and 'co2_consump'.
+        dataset (Dataset): Loaded development indicators with columns such as:
+        'year', 'continent', 'gdp', 'life_exp', 'hdi_index', and 'co2_consump'.
         year (int): The selected year for statistical visualization.
 
     Returns:
@@ -24,182 +39,151 @@ def render_statistical_analysis(df: pd.DataFrame, year: int):
     """
     st.subheader(f"Statistical Analysis for the year {year}")
 
-    st.info(
-        "🔍 **Key Insight**: There is a strong positive correlation between average "
-        "life expectancy and average CO2 consumption across continents, with most "
-        "regions following a similar ranking pattern."
-    )
-
-    selected_year_df = df[df["year"] == year]
+    insight = dataset.insights.life_exp_co2_correlation(year)
+    if insight is not None:
+        st.info(insight)
 
     col1, col2 = st.columns(2, gap="medium")
 
     with col1:
-        # Ensure consistent continent order for box plot
-        life_exp_data = apply_continent_order(selected_year_df)
-
-        fig = px.box(
-            life_exp_data,
-            x="continent",
-            y="life_exp",
-            color="continent",
-            title=f"Life Expectancy by Continent ({year})",
-            color_discrete_map=CONTINENT_COLOR_MAP,
-        )
-        fig.update_layout(
-            showlegend=False,
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            title=dict(
-                text=f"Life Expectancy by Continent ({year})",
-                font=dict(color="black"),
-                font_size=15,
-            ),
-            xaxis=dict(
-                tickfont=dict(color="black"),
-                title=None,
-                tickangle=45,
-            ),
-            yaxis=dict(
-                tickfont=dict(color="black"),
-                gridcolor="lightgray",
-                title=dict(text="Life Expectancy", font=dict(color="black")),
-            ),
-            margin=dict(l=0, r=0, t=40, b=0),
-        )
-        st.plotly_chart(fig)
+        render_chart(cached_year_figure(build_life_exp_box, dataset, year))
 
     with col2:
-        # CO2 Consumption bar chart by continent
-        co2_data = selected_year_df.dropna(subset=["co2_consump"])
-        continent_co2 = (
-            co2_data.groupby("continent", observed=True)["co2_consump"]
-            .mean()
-            .reset_index()
-        )
-
-        # Use consistent continent order from constants
-        continent_co2 = apply_continent_order(continent_co2)
-
-        title_text = f"Average CO2 Consumption by Continent ({year})"
-
-        fig = px.bar(
-            continent_co2,
-            x="continent",
-            y="co2_consump",
-            color="continent",
-            title=title_text,
-            color_discrete_map=CONTINENT_COLOR_MAP,
-        )
-        fig.update_layout(
-            showlegend=False,
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            title=dict(text=title_text, font=dict(color="black"), font_size=15),
-            xaxis=dict(
-                tickfont=dict(color="black"),
-                title=None,
-                tickangle=45,
-                zeroline=False,
-                showline=False,
-            ),
-            yaxis=dict(
-                tickfont=dict(color="black"),
-                gridcolor="lightgray",
-                title=dict(
-                    text="CO2 Consumption (per capita)", font=dict(color="black")
-                ),
-                zeroline=False,
-                showline=False,
-            ),
-            margin=dict(l=0, r=0, t=40, b=0),
-        )
-        st.plotly_chart(fig)
+        render_chart(cached_year_figure(build_co2_bar, dataset, year))
 
     # Second box plot
     col3, col4 = st.columns(2, gap="medium")
 
     with col3:
-        # Ensure consistent continent order for GDP box plot
-        gdp_data = apply_continent_order(selected_year_df)
-
-        fig = px.box(
-            gdp_data,
-            x="continent",
-            y="gdp",
-            color="continent",
-            title=f"GDP by Continent ({year})",
-            color_discrete_map=CONTINENT_COLOR_MAP,
-        )
-        fig.update_layout(
-            showlegend=False,
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            title=dict(
-                text=f"GDP by Continent ({year})",
-                font=dict(color="black"),
-                font_size=15,
-            ),
-            xaxis=dict(
-                tickfont=dict(color="black"),
-                title=None,
-                zeroline=False,
-                showline=False,
-                tickangle=45,
-            ),
-            yaxis=dict(
-                tickfont=dict(color="black"),
-                gridcolor="lightgray",
-                title=dict(text="GDP", font=dict(color="black")),
-                zeroline=False,
-                showline=False,
-            ),
-            margin=dict(l=0, r=0, t=40, b=0),
-        )
-        st.plotly_chart(fig)
+        render_chart(cached_year_figure(build_gdp_box, dataset, year))
 
     with col4:
-        hdi_data = selected_year_df.dropna(subset=["hdi_index"])
-        continent_hdi = (
-            hdi_data.groupby("continent", observed=True)["hdi_index"]
-            .mean()
-            .reset_index()
-        )
+        render_chart(cached_year_figure(build_hdi_bar, dataset, year))
 
-        # Use consistent continent order from constants
-        continent_hdi = apply_continent_order(continent_hdi)
 
-        fig = px.bar(
-            continent_hdi,
-            x="continent",
-            y="hdi_index",
-            color="continent",
-            title=f"Average HDI Index by Continent ({year})",
-            color_discrete_map=CONTINENT_COLOR_MAP,
-        )
+def box_traces(df: pd.DataFrame, metric: str) -> list:
+    """
+    Build precomputed box traces of a metric per continent, plus their outliers.
 
-        fig.update_layout(
-            showlegend=False,
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            title=dict(
-                text=f"Average HDI Index by Continent ({year})",
-                font=dict(color="black"),
-                font_size=15,
-            ),
-            xaxis=dict(
-                tickfont=dict(color="black"),
-                title=None,
-                tickangle=45,
-                zeroline=False,
-                showline=False,
-            ),
-            yaxis=dict(
-                tickfont=dict(color="black"),
-                gridcolor="lightgray",
-                title=dict(text="HDI Index", font=dict(color="black")),
-                zeroline=False,
-                showline=False,
-            ),
+    Args:
+        df (pd.DataFrame): Rows to summarise, with 'continent' and ``metric``.
+        metric (str): The metric to summarise.
+
+    Returns:
+        list: One go.Box per continent followed by one go.Scatter per continent
+        with outliers.
+    """
+    stats = box_statistics(df, metric)
+    boxes, outliers = [], []
+    for row in stats.itertuples(index=False):
+        color = CONTINENT_COLOR_MAP[row.continent]
+        boxes.append(
+            go.Box(
+                name=row.continent,
+                x=[row.continent],
+                q1=[row.q1],
+                median=[row.median],
+                q3=[row.q3],
+                lowerfence=[row.lowerfence],
+                upperfence=[row.upperfence],
+                marker_color=color,
+            )
         )
-        st.plotly_chart(fig)
+        if len(row.outliers):
+            outliers.append(
+                go.Scatter(
+                    name=row.continent,
+                    x=[row.continent] * len(row.outliers),
+                    y=row.outliers,
+                    mode="markers",
+                    marker=dict(color=color, size=5),
+                )
+            )
+    return boxes + outliers
+
+
+def build_life_exp_box(dataset: Dataset, year: int) -> go.Figure:
+    """
+    Build the box plot of life expectancy by continent for a year.
+
+    Args:
+        dataset (Dataset): Loaded development indicators.
+        year (int): The year to chart.
+
+    Returns:
+        go.Figure: The box plot.
+    """
+    # Quartiles, fences and capped outliers are computed here, not in the browser
+    return dashboard_figure(
+        box_traces(dataset.year_slice(year), "life_exp"),
+        f"Life Expectancy by Continent ({year})",
+        y_title="Life Expectancy",
+        **CONTINENT_CHART_LAYOUT,
+    )
+
+
+def build_co2_bar(dataset: Dataset, year: int) -> go.Figure:
+    """
+    Build the bar chart of average CO₂ consumption by continent for a year.
+
+    Args:
+        dataset (Dataset): Loaded development indicators.
+        year (int): The year to chart.
+
+    Returns:
+        go.Figure: The bar chart.
+    """
+    # Continent means come pre-aggregated, already in continent order
+    continent_co2 = dataset.aggregates.year_frame("co2_consump", year)
+
+    return dashboard_figure(
+        continent_bar_traces(
+            continent_co2["continent"], continent_co2["co2_consump"], BAR_HOVER_TEMPLATE
+        ),
+        f"Average CO2 Consumption by Continent ({year})",
+        y_title="CO2 Consumption (per capita)",
+        **CONTINENT_CHART_LAYOUT,
+    )
+
+
+def build_gdp_box(dataset: Dataset, year: int) -> go.Figure:
+    """
+    Build the box plot of GDP per capita by continent for a year.
+
+    Args:
+        dataset (Dataset): Loaded development indicators.
+        year (int): The year to chart.
+
+    Returns:
+        go.Figure: The box plot.
+    """
+    # Quartiles, fences and capped outliers are computed here, not in the browser
+    return dashboard_figure(
+        box_traces(dataset.year_slice(year), "gdp"),
+        f"GDP by Continent ({year})",
+        y_title="GDP",
+        **CONTINENT_CHART_LAYOUT,
+    )
+
+
+def build_hdi_bar(dataset: Dataset, year: int) -> go.Figure:
+    """
+    Build the bar chart of average HDI by continent for a year.
+
+    Args:
+        dataset (Dataset): Loaded development indicators.
+        year (int): The year to chart.
+
+    Returns:
+        go.Figure: The bar chart.
+    """
+    continent_hdi = dataset.aggregates.year_frame("hdi_index", year)
+
+    return dashboard_figure(
+        continent_bar_traces(
+            continent_hdi["continent"], continent_hdi["hdi_index"], BAR_HOVER_TEMPLATE
+        ),
+        f"Average HDI Index by Continent ({year})",
+        y_title="HDI Index",
+        **CONTINENT_CHART_LAYOUT,
+    )
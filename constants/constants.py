@@ -1,3 +1,5 @@
+import os
+
 CONTINENT_COLOR_MAP = {
     "Asia": "#1f77b4",
     "Africa": "#2ca02c",
@@ -16,3 +18,97 @@ CONTINENT_ORDER = [
     "Oceania",
     "South America",
 ]
+
+# Source dataset (overridable, e.g. to point the app at synthetic benchmark data)
+# and the directory holding its typed columnar sidecars
+DATA_PATH = os.environ.get("GAPMINDER_DATA_PATH", "data/gapminder_data_graphs.csv")
+DATA_CACHE_DIR = "data/.cache"
+
+# Compact schema applied when the CSV is parsed
+CATEGORICAL_COLUMNS = ["country", "continent"]
+METRIC_COLUMNS = ["life_exp", "hdi_index", "co2_consump", "gdp", "services"]
+DATA_DTYPES = {
+    **dict.fromkeys(CATEGORICAL_COLUMNS, "category"),
+    "year": "int16",
+    **dict.fromkeys(METRIC_COLUMNS, "float32"),
+}
+
+# Memory budget for serialized figures shared by all sessions
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Point counts above which the GDP vs. life expectancy scatter is drawn with WebGL
+# traces, and above which it is binned server-side into per-continent densities
+SCATTER_WEBGL_THRESHOLD = 5_000
+SCATTER_DENSITY_THRESHOLD = 200_000
+# Grid size per axis and number of hoverable representative points in density mode
+SCATTER_DENSITY_BINS = 80
+SCATTER_SAMPLE_SIZE = 1_000
+
+# Most points (over all years) the animated scatter is built for, and the time
+# each year is shown during playback
+SCATTER_ANIMATION_MAX_POINTS = 200_000
+SCATTER_ANIMATION_FRAME_MS = 600
+
+# Outliers drawn per continent in the server-side box plots
+BOX_MAX_OUTLIERS = 25
+
+# New extracts dropped next to the source CSV, ingested without a full reload once
+# they have not been modified for a few seconds (a pipeline still writing one
+# should write a temporary file and rename it into place)
+DATA_EXTRACTS_GLOB = DATA_PATH.removesuffix(".csv") + "_*.csv"
+DATA_EXTRACT_SETTLE_SECONDS = 5.0
+
+# Collect per-section timings (also enabled per session with the ?profile=1 query)
+PROFILING_ENABLED = os.environ.get("GAPMINDER_PROFILE", "") not in ("", "0")
+
+# Very high human development, as classified by the UNDP
+HIGH_HDI_THRESHOLD = 0.8
+
+# Metric names as used in generated text
+METRIC_LABELS = {
+    "life_exp": "life expectancy",
+    "hdi_index": "HDI",
+    "co2_consump": "CO2 consumption",
+    "gdp": "GDP",
+    "services": "services employment",
+}
+
+# Engine computing the continent x year aggregates: "numpy", "pandas" or "arrow"
+AGGREGATION_BACKEND = os.environ.get("GAPMINDER_AGGREGATION_BACKEND", "numpy")
+
+# Country drill-down: names offered per search, and the minimum trigram similarity
+# (Dice coefficient) of fuzzy matches
+COUNTRY_SEARCH_RESULTS = 20
+COUNTRY_SEARCH_MIN_SIMILARITY = 0.35
+
+# Build every figure of a new data version on the prefetch pool when it is first
+# served, and show the cache inspection panel in the sidebar (for operators)
+CACHE_WARM_UP = os.environ.get("GAPMINDER_WARM_UP", "1") not in ("", "0")
+CACHE_ADMIN_ENABLED = os.environ.get("GAPMINDER_CACHE_ADMIN", "") not in ("", "0")
+
+# Speculative building of the figures of the years next to the one being viewed:
+# threads, most figures queued at once, and years after and before the current one
+PREFETCH_WORKERS = 2
+PREFETCH_MAX_PENDING = 24
+PREFETCH_YEARS_AHEAD = 2
+PREFETCH_YEARS_BEHIND = 1
+
+# Round chart data to the precision its hover shows and send it as typed arrays
+# (binary), trimming the hover data; arrays shorter than the minimum stay JSON lists
+PAYLOAD_SHAPING = os.environ.get("GAPMINDER_PAYLOAD_SHAPING", "1") not in ("", "0")
+PAYLOAD_TYPED_ARRAY_MIN_LENGTH = 8
+
+# Trend scan: years of the rolling windows, absolute z-score of a shock, floor of
+# a country's spread of changes as a fraction of the metric's overall spread, the
+# probability that a chart marks any year by chance as one of widespread shocks,
+# and the number of strongest shocks listed
+TREND_WINDOW = 5
+TREND_Z_THRESHOLD = 3.0
+TREND_MIN_STD_FRACTION = 0.1
+TREND_SHOCK_FALSE_ALARM = 0.001
+TREND_SHOCK_RESULTS = 15
+# Absolute t statistic of a trend shift, i.e. a change of a country's mean yearly
+# change between the windows before and after a year; with two windows of 5 years
+# (8 degrees of freedom) a steady trend exceeds it with probability 0.004
+TREND_SHIFT_THRESHOLD = 4.0
+TREND_SHIFT_RESULTS = 10
@@ -0,0 +1,270 @@
+"""
+Export every chart of the dashboard for every year as static HTML and JSON.
+
+Charts are built by the same figure builders the app renders, without a Streamlit
+session, and the years are spread over a process pool. plotly.js is written once
+and shared by every HTML file. A manifest records the data version each year was
+exported from, so later runs only re-export the years whose data changed.
+
+Usage:
+    python -m reports.export [--data data/gapminder_data_graphs.csv]
+        [--output exports] [--workers 4] [--years 2007 2008] [--force]
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+from components import TIME_SERIES_CHARTS, YEAR_CHARTS
+from constants.constants import DATA_PATH
+from utils.data_loader import load_dataset
+from utils.dataset import Dataset
+from utils.ingestion import DataStore
+
+TIME_SERIES_DIR = "all_years"
+PLOTLYJS_FILE = "plotly.min.js"
+MANIFEST_FILE = "manifest.json"
+
+# Dataset of a worker process, loaded once by the pool initializer
+_worker_dataset: Dataset | None = None
+
+
+def load_export_dataset(path: str | os.PathLike) -> Dataset:
+    """
+    Load the dataset the app would serve, including ingested extracts.
+
+    Args:
+        path (str | os.PathLike): Path to the source CSV.
+
+    Returns:
+        Dataset: The current dataset.
+    """
+    extracts_glob = str(path).removesuffix(".csv") + "_*.csv"
+    return DataStore(load_dataset(path), extracts_glob).refresh()
+
+
+def _init_worker(path: str):
+    global _worker_dataset
+    _worker_dataset = load_export_dataset(path)
+
+
+def write_chart(fig: go.Figure, directory: Path, name: str) -> list[Path]:
+    """
+    Write a figure as HTML, referencing the shared plotly.js, and as JSON.
+
+    Args:
+        fig (go.Figure): The figure to write.
+        directory (Path): Directory to write into, one level below the export root.
+        name (str): File name of the chart, without extension.
+
+    Returns:
+        list[Path]: The written files.
+    """
+    html_path = directory / f"{name}.html"
+    json_path = directory / f"{name}.json"
+    fig.write_html(html_path, include_plotlyjs=f"../{PLOTLYJS_FILE}")
+    json_path.write_text(fig.to_json())
+    return [html_path, json_path]
+
+
+def export_charts(
+    dataset: Dataset,
+    charts: dict[str, Callable],
+    directory: Path,
+    *params,
+) -> list[Path]:
+    """
+    Build and write a group of charts into one directory.
+
+    Args:
+        dataset (Dataset): The data to chart.
+        charts (dict[str, Callable]): Figure builders by file name.
+        directory (Path): Directory to write into.
+        *params: Further builder arguments, e.g. the year.
+
+    Returns:
+        list[Path]: The written files.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    files = []
+    for name, build in charts.items():
+        files.extend(write_chart(build(dataset, *params), directory, name))
+    return files
+
+
+def _export_year(output: str, year: int, version: str) -> tuple[int, list[str]]:
+    if _worker_dataset.year_version(year) != version:
+        raise RuntimeError(f"Data of {year} changed while exporting")
+    files = export_charts(_worker_dataset, YEAR_CHARTS, Path(output) / str(year), year)
+    return year, [str(file) for file in files]
+
+
+def read_manifest(output: Path) -> dict:
+    """
+    Return the manifest of a previous export, or an empty one.
+
+    Args:
+        output (Path): The export directory.
+
+    Returns:
+        dict: 'years' maps each exported year to its data version, 'time_series'
+        holds the version of the time series charts, and 'charts' the chart names
+        of both groups.
+    """
+    try:
+        return json.loads((output / MANIFEST_FILE).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"years": {}, "time_series": None, "charts": {}}
+
+
+def write_manifest(output: Path, manifest: dict):
+    """
+    Atomically write the manifest of an export.
+
+    Args:
+        output (Path): The export directory.
+        manifest (dict): The manifest, as returned by ``read_manifest``.
+    """
+    tmp = output / f".{MANIFEST_FILE}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, output / MANIFEST_FILE)
+
+
+def stale_years(dataset: Dataset, manifest: dict, years: list[int]) -> list[int]:
+    """
+    Return the years whose exported charts are missing or out of date.
+
+    Args:
+        dataset (Dataset): The current data.
+        manifest (dict): The manifest of the previous export.
+        years (list[int]): The years to consider.
+
+    Returns:
+        list[int]: The years to export.
+    """
+    if manifest["charts"].get("year") != list(YEAR_CHARTS):
+        return years
+    exported = manifest["years"]
+    return [
+        year for year in years if exported.get(str(year)) != dataset.year_version(year)
+    ]
+
+
+def write_index(output: Path, years: list[int]):
+    """
+    Write an index page linking to every exported chart.
+
+    Args:
+        output (Path): The export directory.
+        years (list[int]): The exported years.
+    """
+    sections = [("All years", TIME_SERIES_DIR, TIME_SERIES_CHARTS)]
+    sections += [(str(year), str(year), YEAR_CHARTS) for year in years]
+    lines = ["<!DOCTYPE html>", "<title>Gapminder Dashboard charts</title>"]
+    for title, directory, charts in sections:
+        lines.append(f"<h2>{html.escape(title)}</h2><ul>")
+        lines.extend(
+            f'<li><a href="{directory}/{name}.html">{name}</a> '
+            f'(<a href="{directory}/{name}.json">json</a>)</li>'
+            for name in charts
+        )
+        lines.append("</ul>")
+    (output / "index.html").write_text("\n".join(lines))
+
+
+def export(
+    data_path: str | os.PathLike = DATA_PATH,
+    output: str | os.PathLike = "exports",
+    years: list[int] | None = None,
+    workers: int | None = None,
+    force: bool = False,
+) -> dict:
+    """
+    Export the charts of every requested year that changed since the last export.
+
+    Args:
+        data_path (str | os.PathLike): Path to the source CSV.
+        output (str | os.PathLike): Directory to export into.
+        years (list[int] | None): Years to export, or None for every year.
+        workers (int | None): Number of worker processes, or None for one per CPU.
+        force (bool): Re-export everything, ignoring the manifest.
+
+    Returns:
+        dict: The updated manifest.
+    """
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    dataset = load_export_dataset(data_path)
+    available = dataset.years.tolist()
+    years = available if years is None else [y for y in years if y in available]
+    manifest = {"years": {}, "time_series": None, "charts": {}}
+    if not force:
+        manifest = read_manifest(output)
+
+    plotlyjs = output / PLOTLYJS_FILE
+    if not plotlyjs.exists():
+        plotlyjs.write_text(get_plotlyjs())
+
+    if manifest["charts"].get("time_series") != list(TIME_SERIES_CHARTS) or (
+        manifest["time_series"] != dataset.version
+    ):
+        export_charts(dataset, TIME_SERIES_CHARTS, output / TIME_SERIES_DIR)
+        manifest["time_series"] = dataset.version
+        manifest["charts"]["time_series"] = list(TIME_SERIES_CHARTS)
+        print("Exported the time series charts", file=sys.stderr)
+
+    pending = stale_years(dataset, manifest, years)
+    if manifest["charts"].get("year") != list(YEAR_CHARTS):
+        manifest["years"] = {}
+        manifest["charts"]["year"] = list(YEAR_CHARTS)
+    write_manifest(output, manifest)
+
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=min(workers or os.cpu_count() or 1, len(pending)),
+            initializer=_init_worker,
+            initargs=(str(data_path),),
+        ) as pool:
+            futures = [
+                pool.submit(_export_year, str(output), year, dataset.year_version(year))
+                for year in pending
+            ]
+            for future in as_completed(futures):
+                year, _ = future.result()
+                manifest["years"][str(year)] = dataset.year_version(year)
+                # Saved after every year, so an interrupted export resumes
+                write_manifest(output, manifest)
+                print(f"Exported {year}", file=sys.stderr)
+
+    write_index(output, sorted(int(year) for year in manifest["years"]))
+    print(
+        f"{len(pending)} of {len(years)} years exported, "
+        f"{len(years) - len(pending)} up to date",
+        file=sys.stderr,
+    )
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--data", default=DATA_PATH, help="source CSV")
+    parser.add_argument("--output", default="exports")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--years", type=int, nargs="+", default=None)
+    parser.add_argument(
+        "--force", action="store_true", help="re-export years that are up to date"
+    )
+    args = parser.parse_args()
+    export(args.data, args.output, args.years, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from constants.constants import AGGREGATION_BACKEND, CONTINENT_ORDER, METRIC_COLUMNS
+from utils.aggregation_backends import AGGREGATION_BACKENDS, CUBE_STATISTICS
+
+
+class AggregateCube:
+    """
+    Continent × year summary statistics for every metric, held as one NumPy array.
+
+    The cube is indexed as ``values[statistic, metric, continent, year]`` following
+    ``CUBE_STATISTICS``, ``metrics``, ``continents`` and ``years``, so charts can read
+    their series with plain lookups instead of grouping the data again.
+
+    Args:
+        values (np.ndarray): The float64 statistics array.
+        metrics (list[str]): Metric names along the second axis.
+        continents (list[str]): Continent names along the third axis.
+        years (np.ndarray): Years along the fourth axis.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        metrics: list[str],
+        continents: list[str],
+        years: np.ndarray,
+    ):
+        self.values = values
+        self.metrics = list(metrics)
+        self.continents = list(continents)
+        self.years = np.asarray(years)
+        self._year_positions = {int(year): i for i, year in enumerate(self.years)}
+
+    def with_years(self, other: "AggregateCube") -> "AggregateCube":
+        """
+        Return a cube whose years are replaced or extended by those of ``other``.
+
+        Only the year columns are copied, so merging the statistics of a newly
+        ingested year costs time proportional to the cube, not to the data.
+
+        Args:
+            other (AggregateCube): Statistics of the new or updated years, over the
+                same metrics and continents.
+
+        Returns:
+            AggregateCube: The merged cube, with years in ascending order.
+        """
+        kept = ~np.isin(self.years, other.years)
+        years = np.concatenate((self.years[kept], other.years))
+        values = np.concatenate((self.values[..., kept], other.values), axis=3)
+        order = np.argsort(years, kind="stable")
+        return AggregateCube(
+            np.ascontiguousarray(values[..., order]),
+            self.metrics,
+            self.continents,
+            years[order],
+        )
+
+    def to_arrow(self) -> pa.Table:
+        """
+        Return the cube as a single-column Arrow table.
+
+        The statistics are stored flattened in one float64 column and the axes in the
+        schema metadata, so ``from_arrow`` can rebuild the cube as a view of a
+        memory-mapped file.
+
+        Returns:
+            pa.Table: The cube's values and axes.
+        """
+        axes = {
+            "statistics": list(CUBE_STATISTICS),
+            "metrics": self.metrics,
+            "continents": self.continents,
+            "years": self.years.tolist(),
+            "years_dtype": str(self.years.dtype),
+            "shape": list(self.values.shape),
+        }
+        values = np.ascontiguousarray(self.values, dtype=np.float64).ravel()
+        table = pa.table({"values": values})
+        return table.replace_schema_metadata({"axes": json.dumps(axes)})
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table) -> "AggregateCube":
+        """
+        Rebuild a cube written by ``to_arrow`` without copying its values.
+
+        Args:
+            table (pa.Table): The table returned by ``to_arrow``.
+
+        Returns:
+            AggregateCube: The cube, read-only when ``table`` is memory-mapped.
+
+        Raises:
+            ValueError: If the table holds different statistics than this version.
+        """
+        axes = json.loads(table.schema.metadata[b"axes"])
+        if axes["statistics"] != list(CUBE_STATISTICS):
+            raise ValueError("aggregate table holds different statistics")
+        values = table.column("values").combine_chunks()
+        return cls(
+            values.to_numpy(zero_copy_only=True).reshape(axes["shape"]),
+            axes["metrics"],
+            axes["continents"],
+            np.asarray(axes["years"], dtype=axes["years_dtype"]),
+        )
+
+    def get(self, metric: str, stat: str = "mean") -> np.ndarray:
+        """
+        Return one statistic of one metric as a continent × year array.
+
+        Args:
+            metric (str): Name of the metric, e.g. 'gdp'.
+            stat (str): One of ``CUBE_STATISTICS`` (default: 'mean').
+
+        Returns:
+            np.ndarray: Array of shape (continents, years).
+        """
+        return self.values[CUBE_STATISTICS.index(stat), self.metrics.index(metric)]
+
+    def year_frame(self, metric: str, year: int, stat: str = "mean") -> pd.DataFrame:
+        """
+        Return a statistic per continent for a single year.
+
+        Continents without any value for the metric in that year are left out,
+        matching a ``dropna`` followed by a groupby.
+
+        Args:
+            metric (str): Name of the metric, e.g. 'co2_consump'.
+            year (int): The year to read.
+            stat (str): One of ``CUBE_STATISTICS`` (default: 'mean').
+
+        Returns:
+            pd.DataFrame: Columns 'continent' and ``metric`` in continent order.
+        """
+        position = self._year_positions.get(int(year))
+        if position is None:
+            return pd.DataFrame({"continent": [], metric: []})
+
+        counts = self.get(metric, "count")[:, position]
+        present = counts > 0
+        return pd.DataFrame(
+            {
+                "continent": np.asarray(self.continents)[present],
+                metric: self.get(metric, stat)[present, position],
+            }
+        )
+
+    def time_series_frame(self, metric: str, stat: str = "mean") -> pd.DataFrame:
+        """
+        Return a statistic for every continent and year in long format.
+
+        Args:
+            metric (str): Name of the metric, e.g. 'gdp'.
+            stat (str): One of ``CUBE_STATISTICS`` (default: 'mean').
+
+        Returns:
+            pd.DataFrame: Columns 'year', 'continent' and ``metric``, grouped by
+            continent in continent order, ready for Plotly line charts.
+        """
+        n_continents, n_years = len(self.continents), len(self.years)
+        return pd.DataFrame(
+            {
+                "year": np.tile(self.years, n_continents),
+                "continent": np.repeat(self.continents, n_years),
+                metric: self.get(metric, stat).ravel(),
+            }
+        )
+
+
+def build_aggregate_cube(
+    df: pd.DataFrame,
+    metrics: list[str] = METRIC_COLUMNS,
+    years: np.ndarray | None = None,
+    backend: str = AGGREGATION_BACKEND,
+) -> AggregateCube:
+    """
+    Compute every cube statistic for every metric.
+
+    Args:
+        df (pd.DataFrame): Data with 'continent', 'year' and the metric columns.
+        metrics (list[str]): Metrics to aggregate (default: all metric columns).
+        years (np.ndarray | None): Years forming the cube's year axis; defaults to
+            the distinct years in ``df``.
+        backend (str): Name of the aggregation backend, one of
+            ``AGGREGATION_BACKENDS`` (default: the configured backend).
+
+    Returns:
+        AggregateCube: The aggregated statistics.
+
+    Raises:
+        ValueError: If ``backend`` is not a known backend.
+    """
+    if backend not in AGGREGATION_BACKENDS:
+        raise ValueError(
+            f"Unknown aggregation backend {backend!r}, "
+            f"expected one of {sorted(AGGREGATION_BACKENDS)}"
+        )
+    if years is None:
+        years = np.unique(df["year"].to_numpy())
+    years = np.asarray(years)
+    values = AGGREGATION_BACKENDS[backend](df, list(metrics), years)
+    return AggregateCube(values, metrics, CONTINENT_ORDER, years)
@@ -0,0 +1,236 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from constants.constants import CONTINENT_ORDER
+from utils.continent_utils import continent_codes
+
+# Statistics held by the cube, in the order of its first axis
+CUBE_STATISTICS = ("mean", "sum", "count", "min", "max", "q1", "median", "q3")
+_QUANTILES = {"q1": 0.25, "median": 0.5, "q3": 0.75}
+
+
+def grouped_quantiles(
+    sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float
+) -> np.ndarray:
+    """
+    Linearly interpolated quantiles of groups stored one after another.
+
+    Args:
+        sorted_values (np.ndarray): The values of every group, as laid out by
+            ``sort_groups``: grouped together and sorted within each group.
+        starts (np.ndarray): Position of each group's first value.
+        counts (np.ndarray): Number of values per group.
+        q (float): The quantile to compute, between 0 and 1.
+
+    Returns:
+        np.ndarray: The quantile per group, NaN where a group has no values.
+    """
+    present = counts > 0
+    last = counts[present] - 1
+    position = q * last
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, last)
+    low = sorted_values[starts[present] + lower]
+    high = sorted_values[starts[present] + upper]
+    result = np.full(counts.shape, np.nan)
+    result[present] = low + (high - low) * (position - lower)
+    return result
+
+
+def sort_groups(
+    group_codes: np.ndarray, values: np.ndarray, n_groups: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lay out values grouped together and sorted within each group.
+
+    Missing values (NaN) are left out. The layout takes no more memory than the
+    values themselves, whatever the sizes of the groups.
+
+    Args:
+        group_codes (np.ndarray): Group code per value, in [0, n_groups).
+        values (np.ndarray): The values.
+        n_groups (int): Total number of groups.
+
+    Returns:
+        tuple: ``(sorted_values, starts, counts)`` where ``starts`` gives the
+        position of each group's first value in ``sorted_values`` and ``counts``
+        the number of values per group.
+    """
+    valid = ~np.isnan(values)
+    group_codes, values = group_codes[valid], values[valid]
+    # Sorting by value, then stably by group, gives the same layout as a lexsort
+    # several times faster: the group codes fit small integers, which NumPy sorts
+    # stably with a radix sort
+    order = np.argsort(values)
+    narrow = group_codes[order].astype(np.min_scalar_type(max(n_groups - 1, 0)))
+    order = order[np.argsort(narrow, kind="stable")]
+    counts = np.bincount(group_codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    return values[order], starts, counts
+
+
+def _group_codes(df: pd.DataFrame, years: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Group of every row as continent * n_years + year position, and which rows
+    # belong to a known continent and one of the requested years
+    codes = continent_codes(df).astype(np.intp)
+    row_years = df["year"].to_numpy()
+    year_codes = np.searchsorted(years, row_years)
+    in_years = year_codes < len(years)
+    in_years[in_years] = years[year_codes[in_years]] == row_years[in_years]
+    return codes * len(years) + year_codes, (codes >= 0) & in_years
+
+
+def _to_cube_values(stats: dict[str, np.ndarray], n_years: int) -> np.ndarray:
+    # (group, metric) arrays per statistic -> values[statistic, metric, continent, year]
+    values = np.stack([stats[name] for name in CUBE_STATISTICS])
+    n_metrics = values.shape[-1]
+    values = values.reshape(
+        len(CUBE_STATISTICS), len(CONTINENT_ORDER), n_years, n_metrics
+    )
+    return np.ascontiguousarray(values.transpose(0, 3, 1, 2))
+
+
+def _empty_stats(n_groups: int, n_metrics: int) -> dict[str, np.ndarray]:
+    # Statistics of groups without values: no count and sum, undefined otherwise
+    return {
+        name: np.full(
+            (n_groups, n_metrics), 0.0 if name in ("sum", "count") else np.nan
+        )
+        for name in CUBE_STATISTICS
+    }
+
+
+def numpy_cube_values(
+    df: pd.DataFrame, metrics: list[str], years: np.ndarray
+) -> np.ndarray:
+    """
+    Compute every cube statistic with vectorized NumPy operations.
+
+    Each metric's values are sorted by (continent × year group, value) once, after
+    which counts, sums, extremes and quartiles of all groups are read at positions
+    computed from the group offsets. Nothing is padded to the largest group, so
+    memory stays proportional to the rows however unevenly they are spread.
+
+    Args:
+        df (pd.DataFrame): Data with 'continent', 'year' and the metric columns.
+        metrics (list[str]): Metrics to aggregate.
+        years (np.ndarray): Sorted years to aggregate; rows of other years are left
+            out.
+
+    Returns:
+        np.ndarray: The statistics, indexed as ``[statistic, metric, continent,
+        year]``.
+    """
+    n_groups = len(CONTINENT_ORDER) * len(years)
+    group_codes, known = _group_codes(df, years)
+    group_codes = group_codes[known]
+
+    stats = _empty_stats(n_groups, len(metrics))
+    for i, metric in enumerate(metrics):
+        values, starts, counts = sort_groups(
+            group_codes, df[metric].to_numpy(np.float64)[known], n_groups
+        )
+        present = counts > 0
+        first = starts[present]
+        stats["count"][:, i] = counts
+        if present.any():
+            stats["sum"][present, i] = np.add.reduceat(values, first)
+            stats["mean"][present, i] = stats["sum"][present, i] / counts[present]
+            stats["min"][present, i] = values[first]
+            stats["max"][present, i] = values[first + counts[present] - 1]
+        for name, q in _QUANTILES.items():
+            stats[name][:, i] = grouped_quantiles(values, starts, counts, q)
+
+    return _to_cube_values(stats, len(years))
+
+
+def pandas_cube_values(
+    df: pd.DataFrame, metrics: list[str], years: np.ndarray
+) -> np.ndarray:
+    """
+    Compute the cube statistics with a pandas groupby.
+
+    Args:
+        df (pd.DataFrame): Data with 'continent', 'year' and the metric columns.
+        metrics (list[str]): Metrics to aggregate.
+        years (np.ndarray): Sorted years to aggregate; rows of other years are left
+            out.
+
+    Returns:
+        np.ndarray: The statistics, indexed as ``[statistic, metric, continent,
+        year]``.
+    """
+    group_codes, known = _group_codes(df, years)
+    grouped = df.loc[known, metrics].groupby(group_codes[known])
+    aggregated = grouped.agg(["mean", "sum", "count", "min", "max"])
+    stats = _empty_stats(len(CONTINENT_ORDER) * len(years), len(metrics))
+    groups = aggregated.index.to_numpy()
+    for name in ("mean", "sum", "count", "min", "max"):
+        stats[name][groups] = aggregated.xs(name, axis=1, level=1)[metrics].to_numpy()
+    for name, q in _QUANTILES.items():
+        stats[name][groups] = grouped.quantile(q)[metrics].to_numpy()
+    return _to_cube_values(stats, len(years))
+
+
+def arrow_cube_values(
+    df: pd.DataFrame, metrics: list[str], years: np.ndarray
+) -> np.ndarray:
+    """
+    Compute the cube statistics with Arrow's multithreaded hash aggregation.
+
+    Arrow only offers approximate (t-digest) quantiles per group, so the quartiles
+    are read from each metric's values sorted by (group, value), as by the NumPy
+    backend, and match the other backends exactly.
+
+    Args:
+        df (pd.DataFrame): Data with 'continent', 'year' and the metric columns.
+        metrics (list[str]): Metrics to aggregate.
+        years (np.ndarray): Sorted years to aggregate; rows of other years are left
+            out.
+
+    Returns:
+        np.ndarray: The statistics, indexed as ``[statistic, metric, continent,
+        year]``.
+    """
+    n_groups = len(CONTINENT_ORDER) * len(years)
+    group_codes, known = _group_codes(df, years)
+    group_codes = group_codes[known]
+    # NaN becomes null, which Arrow's aggregations skip
+    table = pa.table(
+        {
+            "group": group_codes,
+            **{
+                metric: pa.array(df[metric].to_numpy()[known], from_pandas=True)
+                for metric in metrics
+            },
+        }
+    )
+    aggregations = [
+        (metric, function)
+        for metric in metrics
+        for function in ("mean", "sum", "count", "min", "max")
+    ]
+    result = table.group_by("group", use_threads=True).aggregate(aggregations)
+
+    stats = _empty_stats(n_groups, len(metrics))
+    groups = result["group"].to_numpy()
+    for i, metric in enumerate(metrics):
+        for name in ("mean", "sum", "count", "min", "max"):
+            column = result[f"{metric}_{name}"]
+            stats[name][groups, i] = column.to_numpy(zero_copy_only=False)
+        values, starts, counts = sort_groups(
+            group_codes, df[metric].to_numpy(np.float64)[known], n_groups
+        )
+        for name, q in _QUANTILES.items():
+            stats[name][:, i] = grouped_quantiles(values, starts, counts, q)
+    stats["sum"] = np.nan_to_num(stats["sum"])
+    return _to_cube_values(stats, len(years))
+
+
+# Interchangeable implementations of the cube aggregation, selected by name
+AGGREGATION_BACKENDS = {
+    "numpy": numpy_cube_values,
+    "pandas": pandas_cube_values,
+    "arrow": arrow_cube_values,
+}
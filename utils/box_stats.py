@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from constants.constants import BOX_MAX_OUTLIERS, CONTINENT_ORDER
+from utils.aggregation_backends import grouped_quantiles, sort_groups
+from utils.continent_utils import continent_codes
+
+
+def box_statistics(
+    df: pd.DataFrame, metric: str, max_outliers: int = BOX_MAX_OUTLIERS
+) -> pd.DataFrame:
+    """
+    Compute Tukey box-plot statistics of a metric per continent.
+
+    Values are sorted by (continent, value) once, from which quartiles, the
+    1.5 × IQR fences and the outliers of every continent are read at positions
+    computed from the continent offsets. Only these statistics and at most
+    ``max_outliers`` outliers per continent (the most extreme ones) are sent to the
+    browser, so the payload does not grow with the number of rows.
+
+    Args:
+        df (pd.DataFrame): Data with 'continent' and ``metric`` columns.
+        metric (str): The metric to summarise, e.g. 'life_exp'.
+        max_outliers (int): Maximum number of outliers kept per continent.
+
+    Returns:
+        pd.DataFrame: One row per continent with values, in continent order, with
+        columns 'continent', 'q1', 'median', 'q3', 'lowerfence', 'upperfence',
+        'count' and 'outliers' (a NumPy array per continent).
+    """
+    codes = continent_codes(df).astype(np.intp)
+    values = df[metric].to_numpy(np.float64)
+    known = codes >= 0
+
+    n_groups = len(CONTINENT_ORDER)
+    values, starts, counts = sort_groups(codes[known], values[known], n_groups)
+    q1 = grouped_quantiles(values, starts, counts, 0.25)
+    median = grouped_quantiles(values, starts, counts, 0.5)
+    q3 = grouped_quantiles(values, starts, counts, 0.75)
+    iqr = q3 - q1
+
+    # Fences are the most extreme values still within 1.5 × IQR of the box; the
+    # values outside it are the first `below` and last `above` of each continent
+    groups = np.repeat(np.arange(n_groups), counts)
+    below = np.bincount(
+        groups, weights=values < (q1 - 1.5 * iqr)[groups], minlength=n_groups
+    ).astype(np.intp)
+    above = np.bincount(
+        groups, weights=values > (q3 + 1.5 * iqr)[groups], minlength=n_groups
+    ).astype(np.intp)
+
+    present = counts > 0
+    lowerfence = values[(starts + below)[present]]
+    upperfence = values[(starts + counts - 1 - above)[present]]
+
+    outliers = []
+    for group in np.flatnonzero(present):
+        start, stop = starts[group], starts[group] + counts[group]
+        candidates = np.concatenate(
+            (values[start : start + below[group]], values[stop - above[group] : stop])
+        )
+        distance = np.abs(candidates - median[group])
+        extreme_first = np.argsort(-distance, kind="stable")[:max_outliers]
+        outliers.append(np.sort(candidates[extreme_first]))
+
+    return pd.DataFrame(
+        {
+            "continent": np.asarray(CONTINENT_ORDER)[present],
+            "q1": q1[present],
+            "median": median[present],
+            "q3": q3[present],
+            "lowerfence": lowerfence,
+            "upperfence": upperfence,
+            "count": counts[present],
+            "outliers": outliers,
+        }
+    )
@@ -0,0 +1,282 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from functools import partial
+
+import streamlit as st
+
+from utils.data_loader import evict_file_version
+from utils.dataset import Dataset
+from utils.figure_cache import FigureCache, figure_key, get_figure_cache
+from utils.prefetch import YearPrefetcher, get_prefetcher
+
+logger = logging.getLogger(__name__)
+
+# Invalidations kept for the admin panel
+CACHE_EVENT_LOG_SIZE = 50
+
+
+def dataset_versions(dataset: Dataset) -> set[str]:
+    """
+    Return every version the cached artifacts of a dataset are keyed on.
+
+    Args:
+        dataset (Dataset): The dataset.
+
+    Returns:
+        set[str]: Its version, the versions of its year partitions and the version
+        of its gap-filled variant if that was computed.
+    """
+    versions = {dataset.version, *dataset.year_versions.values()}
+    if "filled" in dataset.__dict__:
+        versions.add(dataset.filled.version)
+    return versions
+
+
+class CacheLifecycle:
+    """
+    The data versions this server process serves, and the eviction of stale ones.
+
+    Every cached artifact is keyed on a data version: loaded frames and datasets on
+    the content hash of their source file (re-hashed whenever its mtime or size
+    changes), figures on the version of the dataset or year partition they were
+    built from. When a source file or the dataset built from it changes, only the
+    entries of the versions it no longer serves are dropped; nothing is cleared
+    wholesale.
+
+    Args:
+        figure_cache (FigureCache): The figure cache shared by every session.
+    """
+
+    def __init__(self, figure_cache: FigureCache):
+        self.figure_cache = figure_cache
+        self._sources: dict[str, str] = {}
+        self._datasets: dict[tuple[str, str], Dataset] = {}
+        self._lock = threading.Lock()
+        self.events: deque[dict] = deque(maxlen=CACHE_EVENT_LOG_SIZE)
+
+    def _log(self, event: str, source: str, **details):
+        record = {"time": time.strftime("%H:%M:%S"), "event": event, "source": source}
+        record.update(details)
+        self.events.append(record)
+        logger.info("Cache %s of %s: %s", event, source, details)
+
+    def observe_source(self, path: str, fingerprint: str) -> str | None:
+        """
+        Record the version of a source file that is about to be served.
+
+        Args:
+            path (str): Path to the source file.
+            fingerprint (str): Its current version.
+
+        Returns:
+            str | None: The version it replaces if the file changed since the last
+            call, to be retired by exactly one caller; None otherwise.
+        """
+        with self._lock:
+            previous = self._sources.get(path)
+            if previous == fingerprint:
+                return None
+            self._sources[path] = fingerprint
+        return previous
+
+    def forget_source(self, path: str) -> str | None:
+        """
+        Stop tracking a source file, so its next load starts from scratch.
+
+        Args:
+            path (str): Path to the source file.
+
+        Returns:
+            str | None: The version that was served, if any.
+        """
+        with self._lock:
+            return self._sources.pop(path, None)
+
+    def retire_source(self, path: str, fingerprint: str):
+        """
+        Evict everything derived from one version of a source file.
+
+        Args:
+            path (str): Path to the source file.
+            fingerprint (str): The version to evict.
+        """
+        with self._lock:
+            dataset = self._datasets.pop((path, fingerprint), None)
+        evict_file_version(path, fingerprint)
+        figures = 0
+        if dataset is not None:
+            figures = self.figure_cache.discard_versions(dataset_versions(dataset))
+        self._log("retire", path, version=fingerprint, figures=figures)
+
+    def dataset_changed(
+        self, path: str, fingerprint: str, old: Dataset | None, new: Dataset
+    ):
+        """
+        Record the dataset now served for a source and evict what it superseded.
+
+        Figures of years an ingested extract did not touch keep their versions and
+        stay cached.
+
+        Args:
+            path (str): Path to the source file.
+            fingerprint (str): Version of the source file the dataset was loaded
+                from, before any extract was ingested.
+            old (Dataset | None): The dataset served until now, if any.
+            new (Dataset): The dataset served from now on.
+        """
+        with self._lock:
+            self._datasets[path, fingerprint] = new
+        if old is not None and old is not new:
+            stale = dataset_versions(old) - dataset_versions(new)
+            figures = self.figure_cache.discard_versions(stale)
+            self._log("update", path, version=new.version, figures=figures)
+
+    def live_versions(self) -> set[str]:
+        """set[str]: Every data version of the datasets currently served."""
+        with self._lock:
+            datasets = list(self._datasets.values())
+        return set().union(*map(dataset_versions, datasets))
+
+    def purge_stale_figures(self) -> int:
+        """
+        Drop the cached figures of data versions that are no longer served.
+
+        Returns:
+            int: The number of figures dropped.
+        """
+        live = self.live_versions()
+        stale = [
+            version for version in self.figure_cache.versions() if version not in live
+        ]
+        figures = self.figure_cache.discard_versions(stale)
+        self._log("purge", "figures", version=f"{len(stale)} stale", figures=figures)
+        return figures
+
+    def describe(self) -> dict:
+        """
+        Return the state of the caches, for inspection.
+
+        Returns:
+            dict: 'sources' maps each source file to its served version,
+            'figures' each cached data version to its figure count, size and
+            whether it is still served, and 'events' lists recent invalidations.
+        """
+        live = self.live_versions()
+        with self._lock:
+            sources = dict(self._sources)
+        return {
+            "sources": sources,
+            "figures": {
+                version: {**usage, "live": version in live}
+                for version, usage in self.figure_cache.versions().items()
+            },
+            "events": list(self.events),
+        }
+
+
+@st.cache_resource(show_spinner=False)
+def get_cache_lifecycle() -> CacheLifecycle:
+    """
+    Return the cache lifecycle shared by every session of this server process.
+
+    Returns:
+        CacheLifecycle: The process-wide cache lifecycle.
+    """
+    return CacheLifecycle(get_figure_cache())
+
+
+def warm_up(
+    dataset: Dataset,
+    prefetcher: YearPrefetcher,
+    charts: dict[str, Callable],
+    year_charts: dict[str, Callable],
+) -> int:
+    """
+    Compute a dataset's derived structures and figures before sessions ask for them.
+
+    The figures are built one at a time on the prefetcher's pool, so the warm-up
+    takes a single prefetch thread, leaving the others to the sessions' prefetches,
+    and skips the figures they have queued instead of building them a second time.
+
+    Args:
+        dataset (Dataset): The dataset to warm up.
+        prefetcher (YearPrefetcher): The prefetcher whose pool builds the figures.
+        charts (dict[str, Callable]): Builders of the charts spanning every year.
+        year_charts (dict[str, Callable]): Builders of the charts of a single year.
+
+    Returns:
+        int: The number of figures built.
+    """
+    began = time.perf_counter()
+    for structure in ("insights", "trends", "country_search"):
+        getattr(dataset, structure)
+    builds = [
+        (figure_key(build, dataset.version), partial(build, dataset))
+        for build in charts.values()
+    ]
+    builds += [
+        (
+            figure_key(build, dataset.year_version(year), year),
+            partial(build, dataset, year),
+        )
+        for year in dataset.years.tolist()
+        for build in year_charts.values()
+    ]
+    built = 0
+    for key, build in builds:
+        # Stored directly, so the warm-up does not count as cache misses
+        try:
+            future = prefetcher.submit(key, build)
+        except RuntimeError:
+            # The pool no longer takes work: the server is shutting down
+            break
+        if future is not None:
+            future.result()
+            built += 1
+    logger.info(
+        "Warmed up %s: %d figures in %.1f s",
+        dataset.version,
+        built,
+        time.perf_counter() - began,
+    )
+    return built
+
+
+@st.cache_resource(show_spinner=False)
+def _warm_up_thread(
+    version: str,
+    _dataset: Dataset,
+    _charts: dict[str, Callable],
+    _year_charts: dict[str, Callable],
+) -> threading.Thread:
+    thread = threading.Thread(
+        target=warm_up,
+        args=(_dataset, get_prefetcher(), _charts, _year_charts),
+        name=f"warm-up-{version}",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def start_warm_up(
+    dataset: Dataset, charts: dict[str, Callable], year_charts: dict[str, Callable]
+) -> threading.Thread:
+    """
+    Warm up a dataset in a background thread, once per data version.
+
+    Called on every rerun, it starts the thread the first time a version is served,
+    so a freshly started server builds every figure while its first session loads.
+
+    Args:
+        dataset (Dataset): The dataset being served.
+        charts (dict[str, Callable]): Builders of the charts spanning every year.
+        year_charts (dict[str, Callable]): Builders of the charts of a single year.
+
+    Returns:
+        threading.Thread: The warm-up thread of this version.
+    """
+    return _warm_up_thread(dataset.version, dataset, charts, year_charts)
@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from constants.constants import CONTINENT_COLOR_MAP, CONTINENT_ORDER
+from utils.continent_utils import continent_codes
+
+# Name of the registered Plotly template shared by every chart of the dashboard
+DASHBOARD_TEMPLATE = "gapminder"
+
+_AXIS_STYLE = dict(
+    color="black",
+    gridcolor="lightgray",
+    tickfont=dict(color="black"),
+    title=dict(font=dict(color="black")),
+    zeroline=False,
+    showline=False,
+)
+
+
+def _register_dashboard_template():
+    # White background and black text, so charts read the same under Streamlit's
+    # light and dark themes. Only layout defaults are set: a template carrying
+    # per-trace-type defaults, like the built-in ones, costs several times more
+    # to apply to every figure.
+    template = go.layout.Template(
+        layout=dict(
+            plot_bgcolor="white",
+            paper_bgcolor="white",
+            font=dict(color="black"),
+            title=dict(font=dict(color="black"), x=0.05),
+            hovermode="closest",
+            xaxis=_AXIS_STYLE,
+            yaxis=_AXIS_STYLE,
+            legend=dict(font=dict(color="black"), title=dict(font=dict(color="black"))),
+            colorway=[CONTINENT_COLOR_MAP[continent] for continent in CONTINENT_ORDER],
+        )
+    )
+    pio.templates[DASHBOARD_TEMPLATE] = template
+
+
+_register_dashboard_template()
+
+
+def dashboard_figure(
+    traces: list,
+    title: str,
+    x_title: str | None = None,
+    y_title: str | None = None,
+    **layout,
+) -> go.Figure:
+    """
+    Create a figure styled with the dashboard template.
+
+    Args:
+        traces (list): The figure's traces.
+        title (str): The chart title.
+        x_title (str | None): Title of the x axis, or None for no title.
+        y_title (str | None): Title of the y axis, or None for no title.
+        **layout: Further layout properties, e.g. ``showlegend=False``.
+
+    Returns:
+        go.Figure: The figure.
+    """
+    fig = go.Figure(traces)
+    fig.update_layout(
+        template=DASHBOARD_TEMPLATE,
+        title_text=title,
+        xaxis_title_text=x_title,
+        yaxis_title_text=y_title,
+        **layout,
+    )
+    return fig
+
+
+def continent_bar_traces(
+    continents: np.ndarray, values: np.ndarray, hovertemplate: str
+) -> list[go.Bar]:
+    """
+    Build one bar per continent from pre-aggregated values.
+
+    Args:
+        continents (np.ndarray): Continent names, in continent order.
+        values (np.ndarray): The value of each continent.
+        hovertemplate (str): Hover template of the bars.
+
+    Returns:
+        list[go.Bar]: One trace per continent.
+    """
+    return [
+        go.Bar(
+            name=continent,
+            x=[continent],
+            y=[value],
+            marker_color=CONTINENT_COLOR_MAP[continent],
+            hovertemplate=hovertemplate,
+        )
+        for continent, value in zip(continents, values, strict=True)
+    ]
+
+
+def continent_line_traces(
+    x: np.ndarray,
+    values: np.ndarray,
+    continents: list[str],
+    hovertemplate: str,
+) -> list[go.Scatter]:
+    """
+    Build one line per continent from a continent × x array.
+
+    Args:
+        x (np.ndarray): Positions along the x axis, e.g. years.
+        values (np.ndarray): Array of shape (continents, len(x)).
+        continents (list[str]): Continent names along the first axis of ``values``.
+        hovertemplate (str): Hover template of the lines.
+
+    Returns:
+        list[go.Scatter]: One trace per continent.
+    """
+    return [
+        go.Scatter(
+            x=x,
+            y=row,
+            mode="lines",
+            name=continent,
+            line_color=CONTINENT_COLOR_MAP[continent],
+            hovertemplate=hovertemplate,
+        )
+        for continent, row in zip(continents, values, strict=True)
+    ]
+
+
+def continent_scatter_traces(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    hover_columns: list[str],
+    hovertemplate: str,
+    webgl: bool = False,
+    opacity: float = 0.7,
+) -> list[go.Scatter | go.Scattergl]:
+    """
+    Build one marker trace per continent from the rows of a frame.
+
+    Rows are grouped by continent with one stable sort of the continent codes, which
+    keeps frames that are already in continent order (like year partitions) as is.
+
+    Args:
+        df (pd.DataFrame): Points with 'continent', ``x``, ``y`` and
+            ``hover_columns``.
+        x (str): Column plotted on the x axis.
+        y (str): Column plotted on the y axis.
+        hover_columns (list[str]): Columns passed as customdata.
+        hovertemplate (str): Hover template of the points.
+        webgl (bool): Whether to draw with WebGL (go.Scattergl) instead of SVG.
+        opacity (float): Marker opacity.
+
+    Returns:
+        list[go.Scatter | go.Scattergl]: One trace per continent present in ``df``.
+    """
+    codes = continent_codes(df)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(CONTINENT_ORDER) + 1))
+    x_values, y_values = df[x].to_numpy(), df[y].to_numpy()
+    # Column-wise conversion avoids materialising every category of
+    # high-cardinality categoricals, as interleaving the frame would
+    hover_values = [df[column].to_numpy(dtype=object) for column in hover_columns]
+    trace_type = go.Scattergl if webgl else go.Scatter
+
+    traces = []
+    for code, continent in enumerate(CONTINENT_ORDER):
+        rows = order[bounds[code] : bounds[code + 1]]
+        if not rows.size:
+            continue
+        traces.append(
+            trace_type(
+                x=x_values[rows],
+                y=y_values[rows],
+                mode="markers",
+                name=continent,
+                marker=dict(color=CONTINENT_COLOR_MAP[continent], opacity=opacity),
+                customdata=np.column_stack([values[rows] for values in hover_values]),
+                hovertemplate=hovertemplate,
+            )
+        )
+    return traces
+
+
+def year_animation_controls(years: list[int], frame_ms: int) -> dict:
+    """
+    Return the layout of a play/pause button and a year slider for animated figures.
+
+    Frames must be named after their year. Playback runs entirely in the browser.
+
+    Args:
+        years (list[int]): The years of the frames, in playback order.
+        frame_ms (int): Time each year is shown, in milliseconds.
+
+    Returns:
+        dict: 'updatemenus' and 'sliders' layout properties.
+    """
+    play = dict(
+        frame=dict(duration=frame_ms, redraw=False),
+        transition=dict(duration=frame_ms // 2, easing="linear"),
+        fromcurrent=True,
+    )
+    pause = dict(frame=dict(duration=0, redraw=False), mode="immediate")
+    return dict(
+        updatemenus=[
+            dict(
+                type="buttons",
+                direction="left",
+                x=0,
+                y=-0.12,
+                xanchor="left",
+                yanchor="top",
+                showactive=False,
+                buttons=[
+                    dict(label="▶ Play", method="animate", args=[None, play]),
+                    dict(label="❚❚ Pause", method="animate", args=[[None], pause]),
+                ],
+            )
+        ],
+        sliders=[
+            dict(
+                active=0,
+                x=0.15,
+                len=0.85,
+                y=-0.05,
+                currentvalue=dict(prefix="Year: "),
+                steps=[
+                    dict(
+                        label=str(year),
+                        method="animate",
+                        args=[[str(year)], {**pause, "transition": dict(duration=0)}],
+                    )
+                    for year in years
+                ],
+            )
+        ],
+    )
@@ -1,12 +1,37 @@
+import numpy as np
 import pandas as pd
 
 from constants.constants import CONTINENT_ORDER
 
 
+def has_continent_order(df, continent_column="continent"):
+    """
+    Check whether a DataFrame is already in consistent continent order.
+
+    Args:
+        df (pd.DataFrame): DataFrame containing continent data
+        continent_column (str): Name of the continent column (default: 'continent')
+
+    Returns:
+        bool: True if the column is an ordered categorical over CONTINENT_ORDER and
+        the rows are sorted by it
+    """
+    column = df[continent_column]
+    return (
+        isinstance(column.dtype, pd.CategoricalDtype)
+        and column.cat.ordered
+        and list(column.cat.categories) == CONTINENT_ORDER
+        and column.is_monotonic_increasing
+    )
+
+
 def apply_continent_order(df, continent_column="continent"):
     """
     Apply consistent continent ordering to a DataFrame.
 
+    Data loaded through utils.data_loader (and any year slice of it) is already in
+    continent order, in which case the DataFrame is returned as is without copying.
+
     Args:
         df (pd.DataFrame): DataFrame containing continent data
         continent_column (str): Name of the continent column (default: 'continent')
@@ -15,11 +40,37 @@ def apply_continent_order(df, continent_column="continent"):
         pd.DataFrame: DataFrame with continent column ordered according to
         CONTINENT_ORDER
     """
-    df_copy = df.copy()
-    df_copy[continent_column] = pd.Categorical(
-        df_copy[continent_column], categories=CONTINENT_ORDER, ordered=True
+    if has_continent_order(df, continent_column):
+        return df
+
+    codes = pd.Categorical(
+        df[continent_column], categories=CONTINENT_ORDER, ordered=True
+    ).codes
+    ordered_df = df.take(np.argsort(codes, kind="stable"))
+    ordered_df[continent_column] = pd.Categorical(
+        ordered_df[continent_column], categories=CONTINENT_ORDER, ordered=True
     )
-    return df_copy.sort_values(continent_column)
+    return ordered_df
+
+
+def continent_codes(df, continent_column="continent"):
+    """
+    Return the position of each row's continent in CONTINENT_ORDER.
+
+    Args:
+        df (pd.DataFrame): DataFrame containing continent data
+        continent_column (str): Name of the continent column (default: 'continent')
+
+    Returns:
+        np.ndarray: Continent codes, -1 for continents outside CONTINENT_ORDER
+    """
+    column = df[continent_column]
+    if (
+        isinstance(column.dtype, pd.CategoricalDtype)
+        and list(column.cat.categories) == CONTINENT_ORDER
+    ):
+        return column.cat.codes.to_numpy()
+    return pd.Categorical(column, categories=CONTINENT_ORDER).codes
 
 
 def create_continent_time_series_df(df: pd.DataFrame, col: str) -> pd.DataFrame:
@@ -0,0 +1,192 @@
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from constants.constants import COUNTRY_SEARCH_MIN_SIMILARITY
+
+
+class CountryIndex:
+    """
+    Row offsets of every country's history in a year-sorted DataFrame.
+
+    Rows are grouped by country with one stable sort of the country codes at load
+    time, which keeps each country's rows in year order. Fetching a country's history
+    is then a dictionary lookup and a slice of that permutation instead of a scan of
+    the country column.
+
+    Args:
+        countries (pd.Series): Country column of a DataFrame sorted by year.
+    """
+
+    def __init__(self, countries: pd.Series):
+        if isinstance(countries.dtype, pd.CategoricalDtype):
+            codes = countries.cat.codes.to_numpy()
+            names = countries.cat.categories
+        else:
+            codes, names = pd.factorize(countries)
+        self.rows = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[self.rows], np.arange(len(names) + 1))
+        self._offsets = {
+            str(name): (int(start), int(stop))
+            for name, start, stop in zip(names, bounds[:-1], bounds[1:], strict=True)
+            if stop > start
+        }
+
+    def __contains__(self, country) -> bool:
+        return str(country) in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def countries(self) -> list[str]:
+        """list[str]: Every country with at least one row."""
+        return list(self._offsets)
+
+    def positions(self, country: str) -> np.ndarray:
+        """
+        Return the row positions of a country's history, in year order.
+
+        Args:
+            country (str): The country to look up.
+
+        Returns:
+            np.ndarray: Positions into the indexed frame, empty if the country is
+            not present.
+        """
+        start, stop = self._offsets.get(str(country), (0, 0))
+        return self.rows[start:stop]
+
+    def history(self, df: pd.DataFrame, country: str) -> pd.DataFrame:
+        """
+        Return the rows of ``df`` for a single country.
+
+        Args:
+            df (pd.DataFrame): The frame this index was built from.
+            country (str): The country to select.
+
+        Returns:
+            pd.DataFrame: The country's rows in year order (empty if absent).
+        """
+        return df.take(self.positions(country))
+
+
+def normalize_name(name: str) -> str:
+    """
+    Return the search key of a name: lower case, without accents or punctuation.
+
+    Args:
+        name (str): A country name or search query.
+
+    Returns:
+        str: The words of ``name`` separated by single spaces, e.g. 'cote d ivoire'
+        for "Côte d'Ivoire".
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    letters = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.split(r"[\W_]+", letters.casefold())).strip()
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f" {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class CountrySearch:
+    """
+    Prefix and fuzzy search over country names, built once per dataset.
+
+    Prefix lookups bisect a sorted list holding every word start of every name, so
+    'kor' finds "South Korea"; names that start with the query rank first. When
+    fewer names than requested match, the remaining results are filled with the
+    names sharing the most character trigrams with the query, which tolerates typos.
+    Both structures are built up front, so a query costs a few bisections and one
+    vectorized count over the trigram postings, independent of the number of names
+    that do not match.
+
+    Args:
+        names (list[str]): The names to search.
+    """
+
+    def __init__(self, names: list[str]):
+        keys = [normalize_name(name) for name in names]
+        order = sorted(range(len(names)), key=keys.__getitem__)
+        self.names = [names[i] for i in order]
+        keys = [keys[i] for i in order]
+
+        # Every word start of every name, sorted for bisection
+        entries = sorted(
+            (key[start:], name_id)
+            for name_id, key in enumerate(keys)
+            for start in [0, *(m.end() for m in re.finditer(" ", key))]
+        )
+        self._prefixes = [prefix for prefix, _ in entries]
+        self._prefix_ids = np.asarray([name_id for _, name_id in entries], np.intp)
+        self._whole_name = np.asarray(
+            [prefix == keys[name_id] for prefix, name_id in entries], bool
+        )
+
+        # Names containing each trigram, and the trigram count of every name
+        postings: dict[str, list[int]] = {}
+        counts = np.empty(len(keys), dtype=np.intp)
+        for name_id, key in enumerate(keys):
+            grams = _trigrams(key)
+            counts[name_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(name_id)
+        self._postings = {
+            gram: np.asarray(ids, dtype=np.intp) for gram, ids in postings.items()
+        }
+        self._trigram_counts = counts
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _prefix_matches(self, key: str) -> np.ndarray:
+        start = bisect_left(self._prefixes, key)
+        stop = bisect_right(self._prefixes, key + "\U0010ffff", lo=start)
+        ids = self._prefix_ids[start:stop]
+        whole = self._whole_name[start:stop]
+        # Names starting with the query first, then names with a matching word
+        return pd.unique(np.concatenate((ids[whole], ids[~whole])))
+
+    def _fuzzy_matches(self, key: str, exclude: np.ndarray, limit: int) -> np.ndarray:
+        grams = _trigrams(key)
+        lists = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not lists:
+            return np.empty(0, dtype=np.intp)
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.names))
+        # Dice coefficient of the query's and each name's trigram sets
+        similarity = 2 * shared / (len(grams) + self._trigram_counts)
+        similarity[exclude] = 0
+        candidates = np.flatnonzero(similarity >= COUNTRY_SEARCH_MIN_SIMILARITY)
+        if candidates.size > limit:
+            top = np.argpartition(-similarity[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        return candidates[np.argsort(-similarity[candidates], kind="stable")]
+
+    def search(self, query: str, limit: int = 10) -> list[str]:
+        """
+        Return the names best matching a query.
+
+        Args:
+            query (str): Free text typed by the user; case, accents and punctuation
+                are ignored.
+            limit (int): Maximum number of names to return.
+
+        Returns:
+            list[str]: Names starting with the query, then names with a word
+            starting with it, then similar names; the first names in alphabetical
+            order if the query is empty.
+        """
+        key = normalize_name(query)
+        if not key:
+            return self.names[:limit]
+        matches = self._prefix_matches(key)[:limit]
+        if matches.size < limit:
+            fuzzy = self._fuzzy_matches(key, matches, limit - matches.size)
+            matches = np.concatenate((matches, fuzzy))
+        return [self.names[name_id] for name_id in matches]
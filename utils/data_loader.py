@@ -0,0 +1,241 @@
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from constants.constants import (
+    AGGREGATION_BACKEND,
+    CONTINENT_ORDER,
+    DATA_CACHE_DIR,
+    DATA_DTYPES,
+    DATA_PATH,
+)
+from utils.aggregates import AggregateCube
+from utils.dataset import Dataset
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout written to sidecars changes so stale ones are ignored
+SIDECAR_FORMAT = 4
+
+
+@lru_cache(maxsize=32)
+def _content_hash(path: str, mtime_ns: int, size: int) -> str:
+    # mtime_ns and size are only part of the cache key, so the file is re-hashed
+    # whenever it is touched but not on every rerun.
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def file_fingerprint(path: str | os.PathLike = DATA_PATH) -> str:
+    """
+    Return a short content hash identifying the current version of a data file.
+
+    Args:
+        path (str | os.PathLike): Path to the data file.
+
+    Returns:
+        str: The first 16 hex characters of the file's SHA-256 digest.
+    """
+    stat = os.stat(path)
+    return _content_hash(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def read_gapminder_csv(path: str | os.PathLike = DATA_PATH) -> pd.DataFrame:
+    """
+    Parse the Gapminder CSV straight into the compact schema.
+
+    Country and continent become categoricals, year becomes int16 and every metric
+    float32, so the frame is roughly a third of the size of the default dtypes.
+    Continent is an ordered categorical following ``CONTINENT_ORDER`` and rows are
+    sorted by year, then continent, so each year forms a contiguous partition that
+    is already in chart order.
+
+    Args:
+        path (str | os.PathLike): Path to the Gapminder CSV file.
+
+    Returns:
+        pd.DataFrame: The typed Gapminder data.
+    """
+    df = pd.read_csv(path, dtype=DATA_DTYPES)
+    df["continent"] = df["continent"].cat.set_categories(CONTINENT_ORDER, ordered=True)
+    return df.sort_values(["year", "continent"], kind="stable", ignore_index=True)
+
+
+def _sidecar_path(path: Path, fingerprint: str, kind: str = "data") -> Path:
+    return (
+        Path(DATA_CACHE_DIR)
+        / f"{path.stem}-{fingerprint}.v{SIDECAR_FORMAT}.{kind}.arrow"
+    )
+
+
+def frame_to_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert a typed frame to an Arrow table that can be read back without copies.
+
+    Missing metric values stay NaN instead of becoming Arrow nulls, which would
+    force a copy to fill them back in on conversion to pandas. Categoricals become
+    dictionary arrays keeping their categories and order.
+
+    Args:
+        df (pd.DataFrame): Data in the loader's schema.
+
+    Returns:
+        pa.Table: The same data as an Arrow table.
+    """
+    columns = {}
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            columns[name] = pa.DictionaryArray.from_arrays(
+                codes,
+                pa.array(column.cat.categories.to_numpy()),
+                mask=codes < 0 if (codes < 0).any() else None,
+                ordered=column.cat.ordered,
+            )
+        else:
+            columns[name] = pa.array(column.to_numpy())
+    return pa.table(columns)
+
+
+def read_arrow_file(path: Path) -> pa.Table:
+    """
+    Memory-map an Arrow IPC file read-only.
+
+    The returned table references the mapped pages directly, so every process that
+    reads the same file shares one physical copy through the OS page cache.
+
+    Args:
+        path (Path): The Arrow IPC file.
+
+    Returns:
+        pa.Table: The file's contents.
+    """
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def _write_sidecar(table: pa.Table, sidecar: Path) -> bool:
+    # Write to a temporary file first so concurrent readers never see a partial
+    # sidecar, then atomically move it into place. The file is left uncompressed
+    # so that readers can memory-map it.
+    tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, sidecar)
+        return True
+    except OSError as exc:
+        logger.warning("Could not write data sidecar %s: %s", sidecar, exc)
+        tmp.unlink(missing_ok=True)
+        return False
+
+
+def _read_frame_sidecar(sidecar: Path) -> pd.DataFrame:
+    # split_blocks keeps every column in its own block, so numeric columns stay
+    # read-only views of the mapped file instead of being consolidated into copies
+    return read_arrow_file(sidecar).to_pandas(split_blocks=True)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_gapminder_data(path: str, fingerprint: str) -> pd.DataFrame:
+    source = Path(path)
+    sidecar = _sidecar_path(source, fingerprint)
+
+    if sidecar.exists():
+        try:
+            return _read_frame_sidecar(sidecar)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable data sidecar %s: %s", sidecar, exc)
+
+    df = read_gapminder_csv(source)
+    if _write_sidecar(frame_to_arrow(df), sidecar):
+        # Serve the mapped copy even in the process that parsed the CSV, so it
+        # shares its pages with every other process
+        return _read_frame_sidecar(sidecar)
+    return df
+
+
+def load_gapminder_data(path: str | os.PathLike = DATA_PATH) -> pd.DataFrame:
+    """
+    Load the typed Gapminder data, parsing the CSV at most once per file version.
+
+    The first load of a given file version parses the CSV and writes an Arrow IPC
+    sidecar keyed on the file's content hash, which every process then memory-maps
+    read-only: server replicas on the same host share one physical copy of the data
+    through the OS page cache. Within a process the frame is held in Streamlit's
+    resource cache, so every session receives the same object, whose numeric
+    columns are read-only.
+
+    Args:
+        path (str | os.PathLike): Path to the Gapminder CSV file.
+
+    Returns:
+        pd.DataFrame: The shared, typed Gapminder data.
+    """
+    return _load_gapminder_data(str(path), file_fingerprint(path))
+
+
+def _read_aggregates_sidecar(sidecar: Path) -> AggregateCube | None:
+    if not sidecar.exists():
+        return None
+    try:
+        return AggregateCube.from_arrow(read_arrow_file(sidecar))
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("Ignoring unreadable aggregates sidecar %s: %s", sidecar, exc)
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def _load_dataset(path: str, fingerprint: str) -> Dataset:
+    df = _load_gapminder_data(path, fingerprint)
+    # Backends may differ in their quartiles, so each has its own sidecar
+    sidecar = _sidecar_path(
+        Path(path), fingerprint, f"aggregates-{AGGREGATION_BACKEND}"
+    )
+    cube = _read_aggregates_sidecar(sidecar)
+    if cube is None:
+        cube = Dataset(df, fingerprint).aggregates
+        if _write_sidecar(cube.to_arrow(), sidecar):
+            cube = _read_aggregates_sidecar(sidecar) or cube
+    return Dataset(df, fingerprint, cube)
+
+
+def load_dataset(path: str | os.PathLike = DATA_PATH) -> Dataset:
+    """
+    Load the shared Gapminder data together with its year-partition index.
+
+    The continent × year aggregates are memory-mapped from a sidecar next to the
+    data's, so they are computed once per file version across all processes.
+
+    Args:
+        path (str | os.PathLike): Path to the Gapminder CSV file.
+
+    Returns:
+        Dataset: The shared dataset for the current version of the file.
+    """
+    return _load_dataset(str(path), file_fingerprint(path))
+
+
+def evict_file_version(path: str | os.PathLike, fingerprint: str):
+    """
+    Drop the frame and dataset of one version of a file from the resource cache.
+
+    Entries of other files and versions are kept, and the sidecars stay on disk for
+    other processes still serving that version.
+
+    Args:
+        path (str | os.PathLike): Path to the Gapminder CSV file.
+        fingerprint (str): The version to drop, as returned by ``file_fingerprint``.
+    """
+    _load_dataset.clear(str(path), fingerprint)
+    _load_gapminder_data.clear(str(path), fingerprint)
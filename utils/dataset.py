@@ -0,0 +1,251 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import AggregateCube, build_aggregate_cube
+from utils.country_index import CountryIndex, CountrySearch
+from utils.gap_filling import GapFill
+from utils.insights import Insights
+from utils.trends import TrendScan
+from utils.year_index import YearIndex
+
+
+def partition_version(version: str, year: int) -> str:
+    """
+    Return the version of one year's partition of a dataset loaded as a whole.
+
+    Year versions get their own namespace, so that they never equal the version of
+    the dataset itself: figures keyed on the dataset version are evicted when an
+    extract changes it, even if the extract leaves the year untouched.
+
+    Args:
+        version (str): Fingerprint of the dataset.
+        year (int): The partition's year.
+
+    Returns:
+        str: The partition fingerprint.
+    """
+    return f"{version}:{int(year)}"
+
+
+class Dataset:
+    """
+    The loaded Gapminder data together with the indexes built over it.
+
+    The data is held as one partition per year. A dataset loaded from a file keeps
+    the year-sorted frame it was built from and its partitions are views of it; a
+    dataset produced by ingesting new partitions only concatenates them into a full
+    frame if something asks for ``df``.
+
+    A single instance is shared by every session, so neither the frame nor the
+    slices handed out by it may be modified in place.
+
+    Args:
+        df (pd.DataFrame): Typed Gapminder data sorted by year.
+        version (str): Fingerprint of the source data the frame was loaded from.
+        aggregates (AggregateCube | None): Precomputed statistics of ``df``, e.g.
+            read from disk; computed on first use if not given.
+    """
+
+    def __init__(
+        self, df: pd.DataFrame, version: str, aggregates: AggregateCube | None = None
+    ):
+        year_index = YearIndex(df["year"].to_numpy())
+        partitions = {
+            int(year): year_index.slice(df, year) for year in year_index.years
+        }
+        self._set_partitions(
+            partitions,
+            version,
+            {year: partition_version(version, year) for year in partitions},
+        )
+        self.__dict__["df"] = df
+        if aggregates is not None:
+            self.__dict__["aggregates"] = aggregates
+
+    @classmethod
+    def from_partitions(
+        cls,
+        partitions: dict[int, pd.DataFrame],
+        version: str,
+        year_versions: dict[int, str],
+    ) -> "Dataset":
+        """
+        Build a dataset from per-year frames without concatenating them.
+
+        Args:
+            partitions (dict[int, pd.DataFrame]): Rows of each year, sharing one
+                schema and each sorted by continent.
+            version (str): Fingerprint of the data as a whole.
+            year_versions (dict[int, str]): Fingerprint of each year's partition.
+
+        Returns:
+            Dataset: The new dataset.
+        """
+        dataset = cls.__new__(cls)
+        dataset._set_partitions(partitions, version, year_versions)
+        return dataset
+
+    def _set_partitions(
+        self,
+        partitions: dict[int, pd.DataFrame],
+        version: str,
+        year_versions: dict[int, str],
+    ):
+        years = sorted(partitions)
+        self._partitions = {year: partitions[year] for year in years}
+        self.version = version
+        self.year_versions = {year: year_versions[year] for year in years}
+        self.year_index = YearIndex.from_sizes(
+            np.asarray(years, dtype=np.int16),
+            np.asarray([len(partitions[year]) for year in years], dtype=np.intp),
+        )
+
+    def with_partitions(
+        self,
+        updates: dict[int, pd.DataFrame],
+        version: str,
+        year_versions: dict[int, str],
+        changed_years: list[int] | None = None,
+    ) -> "Dataset":
+        """
+        Return a new dataset with some years' partitions added or replaced.
+
+        Untouched partitions are shared with this dataset, and if its aggregates
+        have already been computed only the changed years are aggregated again.
+
+        Args:
+            updates (dict[int, pd.DataFrame]): New partitions of each updated year.
+            version (str): Fingerprint of the new dataset.
+            year_versions (dict[int, str]): Fingerprints of the updated years.
+            changed_years (list[int] | None): Years whose rows changed, as opposed
+                to partitions that were only re-typed; defaults to every updated
+                year.
+
+        Returns:
+            Dataset: The updated dataset.
+        """
+        updated = Dataset.from_partitions(
+            {**self._partitions, **updates},
+            version,
+            {**self.year_versions, **year_versions},
+        )
+        if changed_years is None:
+            changed_years = list(updates)
+        if "aggregates" in self.__dict__ and changed_years:
+            changed_years = sorted(changed_years)
+            changed = pd.concat(
+                [updates[year] for year in changed_years], ignore_index=True
+            )
+            updated.__dict__["aggregates"] = self.aggregates.with_years(
+                build_aggregate_cube(changed, years=np.asarray(changed_years))
+            )
+        return updated
+
+    @cached_property
+    def df(self) -> pd.DataFrame:
+        """pd.DataFrame: Every row, sorted by year then continent."""
+        return pd.concat(self._partitions.values(), ignore_index=True)
+
+    @property
+    def partitions(self) -> dict[int, pd.DataFrame]:
+        """dict[int, pd.DataFrame]: Rows of each year, in ascending year order."""
+        return self._partitions
+
+    @property
+    def years(self) -> np.ndarray:
+        """np.ndarray: The distinct years in the data, in ascending order."""
+        return self.year_index.years
+
+    @cached_property
+    def aggregates(self) -> AggregateCube:
+        """AggregateCube: Continent × year statistics, computed once per version."""
+        return build_aggregate_cube(self.df, years=self.years)
+
+    @cached_property
+    def insights(self) -> Insights:
+        """Insights: Statistics behind the key insights, computed once per version."""
+        return Insights(self._partitions, self.aggregates)
+
+    @cached_property
+    def gaps(self) -> GapFill:
+        """GapFill: Filled metrics and coverage masks, computed once per version."""
+        return GapFill(self.df)
+
+    @cached_property
+    def filled(self) -> "Dataset":
+        """
+        Dataset: The same rows with every metric's gaps filled.
+
+        Its aggregates, insights and cached figures are computed from the filled
+        values once, like those of the raw data. A filled value can depend on every
+        year of a country, so the filled dataset is versioned as a whole.
+        """
+        filled = Dataset(self.gaps.filled_frame(self.df), f"{self.version}-filled")
+        filled.__dict__["gaps"] = self.gaps
+        filled.__dict__["filled"] = filled
+        return filled
+
+    @cached_property
+    def trends(self) -> TrendScan:
+        """TrendScan: Rolling means, shocks and trend shifts, once per version."""
+        return TrendScan(self.df)
+
+    @property
+    def is_filled(self) -> bool:
+        """bool: Whether the metrics' gaps are filled."""
+        return self.__dict__.get("filled") is self
+
+    @cached_property
+    def country_index(self) -> CountryIndex:
+        """CountryIndex: Row offsets of every country's history in ``df``."""
+        return CountryIndex(self.df["country"])
+
+    @cached_property
+    def country_search(self) -> CountrySearch:
+        """CountrySearch: Search over the country names, built once per version."""
+        return CountrySearch(self.country_index.countries)
+
+    def country_history(self, country: str) -> pd.DataFrame:
+        """
+        Return every row of a single country without scanning the full frame.
+
+        Args:
+            country (str): The country to select.
+
+        Returns:
+            pd.DataFrame: The country's rows in year order (empty if absent).
+        """
+        return self.country_index.history(self.df, country)
+
+    def year_version(self, year: int) -> str:
+        """
+        Return the fingerprint of a single year's partition.
+
+        It only changes when that year's rows change, so anything derived from one
+        year can stay cached while other years are ingested.
+
+        Args:
+            year (int): The year to look up.
+
+        Returns:
+            str: The partition fingerprint, or the dataset version if the year is
+            not present.
+        """
+        return self.year_versions.get(int(year), self.version)
+
+    def year_slice(self, year: int) -> pd.DataFrame:
+        """
+        Return the rows for a single year without scanning the full frame.
+
+        Args:
+            year (int): The year to select.
+
+        Returns:
+            pd.DataFrame: A read-only view of the year's rows.
+        """
+        partition = self._partitions.get(int(year))
+        if partition is None:
+            return next(iter(self._partitions.values())).iloc[0:0]
+        return partition
@@ -0,0 +1,242 @@
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from constants.constants import FIGURE_CACHE_MAX_BYTES, PAYLOAD_SHAPING
+from utils.dataset import Dataset
+from utils.instrumentation import span
+from utils.payload import shape_figure
+
+
+class FigureCache:
+    """
+    Thread-safe LRU cache of serialized Plotly figures bounded by a memory budget.
+
+    Figures are stored as their JSON serialization, so the memory accounting is the
+    exact size of what is held. Hits hand out a fresh figure dict, ready to be sent
+    by ``render_chart`` without rebuilding a ``go.Figure``, which takes longer than
+    the rest of the hit; callers that modify a figure wrap it in ``go.Figure``
+    first.
+
+    Args:
+        max_bytes (int): Total size of serialized figures to keep before the least
+            recently used entries are evicted.
+    """
+
+    def __init__(self, max_bytes: int = FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> dict | None:
+        """
+        Return a copy of a cached figure, counting the lookup as a hit or miss.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            dict | None: The cached figure as a dict, or None if it is not cached.
+        """
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(payload)
+
+    def put(self, key: Hashable, fig: go.Figure) -> str:
+        """
+        Serialize and store a figure, evicting least recently used entries.
+
+        The figure is first shaped for sending, in place, so that cache hits come
+        out compact. Figures larger than the whole budget are not stored.
+
+        Args:
+            key (Hashable): The cache key.
+            fig (go.Figure): The figure to store.
+
+        Returns:
+            str: The figure's JSON serialization, whether it was stored or not.
+        """
+        if PAYLOAD_SHAPING:
+            shape_figure(fig)
+        payload = fig.to_json()
+        size = len(payload)
+        if size > self.max_bytes:
+            return payload
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return payload
+
+    def get_or_build(self, key: Hashable, build: Callable[[], go.Figure]) -> dict:
+        """
+        Return the cached figure for ``key``, building and storing it on a miss.
+
+        Args:
+            key (Hashable): The cache key.
+            build (Callable[[], go.Figure]): Builds the figure when it is not cached.
+
+        Returns:
+            dict: The requested figure as parsed from its JSON serialization.
+        """
+        with span("figure") as record:
+            fig = self.get(key)
+            hit = fig is not None
+            if not hit:
+                with span("figure.build"):
+                    built = build()
+                # Parsed from the JSON like a hit, so both hand out the same dict
+                fig = json.loads(self.put(key, built))
+            if record is not None:
+                record["chart"] = key[0] if isinstance(key, tuple) else str(key)
+                record["cache"] = "hit" if hit else "miss"
+        return fig
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: 'hits', 'misses', 'evictions', 'entries', 'bytes' and 'max_bytes'.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def versions(self) -> dict[str, dict]:
+        """
+        Return how many figures of each data version are cached.
+
+        Returns:
+            dict[str, dict]: 'entries' and 'bytes' of every data version, keyed as
+            by ``figure_key``.
+        """
+        usage: dict[str, dict] = {}
+        with self._lock:
+            for key, payload in self._entries.items():
+                if isinstance(key, tuple) and len(key) > 1:
+                    version = usage.setdefault(key[1], {"entries": 0, "bytes": 0})
+                    version["entries"] += 1
+                    version["bytes"] += len(payload)
+        return usage
+
+    def discard_versions(self, versions: Iterable[str]) -> int:
+        """
+        Drop the figures built from some data versions.
+
+        Args:
+            versions (Iterable[str]): Data versions, as passed to ``figure_key``.
+
+        Returns:
+            int: The number of figures dropped.
+        """
+        versions = set(versions)
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if isinstance(key, tuple) and len(key) > 1 and key[1] in versions
+            ]
+            for key in stale:
+                self._bytes -= len(self._entries.pop(key))
+        return len(stale)
+
+    def clear(self):
+        """Drop every cached figure, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache() -> FigureCache:
+    """
+    Return the figure cache shared by every session of this server process.
+
+    Returns:
+        FigureCache: The process-wide figure cache.
+    """
+    return FigureCache()
+
+
+def figure_key(build: Callable, version: str, *params: Hashable) -> tuple:
+    """
+    Return the cache key of a chart: its builder, a data version and parameters.
+
+    Args:
+        build (Callable): The chart's figure builder.
+        version (str): Version of the data the figure is built from.
+        *params (Hashable): Further builder arguments, e.g. the year.
+
+    Returns:
+        tuple: The cache key.
+    """
+    return (f"{build.__module__}.{build.__qualname__}", version, *params)
+
+
+def cached_figure(build: Callable, dataset: Dataset, *params: Hashable) -> dict:
+    """
+    Return ``build(dataset, *params)`` from the shared figure cache.
+
+    Args:
+        build (Callable): Builds the figure from the dataset and ``params``.
+        dataset (Dataset): The dataset the figure is built from.
+        *params (Hashable): Further builder arguments, e.g. the year.
+
+    Returns:
+        dict: The cached or freshly built figure, to be passed to ``render_chart``.
+    """
+    return get_figure_cache().get_or_build(
+        figure_key(build, dataset.version, *params), lambda: build(dataset, *params)
+    )
+
+
+def cached_year_figure(build: Callable, dataset: Dataset, year: int) -> dict:
+    """
+    Return ``build(dataset, year)`` from the shared figure cache.
+
+    The figure is keyed on the version of the year's partition instead of the whole
+    dataset, so it stays cached when other years are ingested.
+
+    Args:
+        build (Callable): Builds the figure of a single year from the dataset.
+        dataset (Dataset): The dataset the figure is built from.
+        year (int): The year to chart.
+
+    Returns:
+        dict: The cached or freshly built figure, to be passed to ``render_chart``.
+    """
+    return get_figure_cache().get_or_build(
+        figure_key(build, dataset.year_version(year), year),
+        lambda: build(dataset, year),
+    )
@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+
+from constants.constants import METRIC_COLUMNS
+
+
+def interpolate_gaps(values: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Fill the missing values of many series at once along their last axis.
+
+    Gaps between two observations are interpolated linearly, and values before the
+    first or after the last observation repeat that observation. Series without any
+    observation stay missing.
+
+    Args:
+        values (np.ndarray): Series along the last axis, NaN where missing.
+        x (np.ndarray): Ascending positions of the last axis, e.g. years.
+
+    Returns:
+        np.ndarray: The filled series, same shape and dtype as ``values``.
+    """
+    n = values.shape[-1]
+    positions = np.arange(n)
+    valid = ~np.isnan(values)
+    # Position of the closest observation at or before and at or after every value
+    previous = np.maximum.accumulate(np.where(valid, positions, -1), axis=-1)
+    following = np.minimum.accumulate(
+        np.where(valid, positions, n)[..., ::-1], axis=-1
+    )[..., ::-1]
+
+    previous_value = np.take_along_axis(values, np.maximum(previous, 0), axis=-1)
+    following_value = np.take_along_axis(values, np.minimum(following, n - 1), axis=-1)
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = (x - x[np.maximum(previous, 0)]) / (
+            x[np.minimum(following, n - 1)] - x[np.maximum(previous, 0)]
+        )
+    interpolated = previous_value + weight * (following_value - previous_value)
+
+    filled = np.where(
+        (previous >= 0) & (following < n),
+        interpolated,
+        np.where(previous >= 0, previous_value, following_value),
+    )
+    return np.where(valid, values, filled).astype(values.dtype, copy=False)
+
+
+class CountryYearGrid:
+    """
+    Positions of a frame's rows in a dense country × year grid.
+
+    Lets whole-history computations run over every country at once as NumPy
+    operations along the year axis, and their results be mapped back to the rows.
+
+    Args:
+        df (pd.DataFrame): Data with 'country' and 'year' columns.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        countries = df["country"]
+        if isinstance(countries.dtype, pd.CategoricalDtype):
+            self.codes = countries.cat.codes.to_numpy()
+            self.countries = countries.cat.categories
+        else:
+            self.codes, self.countries = pd.factorize(countries)
+        year_values = df["year"].to_numpy()
+        self.years = np.unique(year_values)
+        self.year_codes = np.searchsorted(self.years, year_values)
+        # Rows without a country are left out of the grid
+        self.known = self.codes >= 0
+        # Flat position of every row with a country, cheaper to index with than
+        # a pair of index arrays
+        self._cells = (
+            self.codes[self.known] * len(self.years) + self.year_codes[self.known]
+        )
+
+    def flat_positions(self) -> np.ndarray:
+        """
+        Return the flat grid position of every row with a country.
+
+        Returns:
+            np.ndarray: Positions as ``country * n_years + year``, in row order,
+            in the narrowest integer type that holds them.
+        """
+        return self._cells.astype(
+            np.min_scalar_type(self.shape[0] * self.shape[1]), copy=False
+        )
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """tuple[int, int]: Number of countries and of years."""
+        return len(self.countries), len(self.years)
+
+    def scatter(self, values: np.ndarray) -> np.ndarray:
+        """
+        Place per-row values into the grid.
+
+        Args:
+            values (np.ndarray): Values along the last axis, one per row.
+
+        Returns:
+            np.ndarray: The leading axes of ``values``, then country and year; NaN
+            where a country has no row for a year.
+        """
+        leading = values.shape[:-1]
+        grid = np.full(leading + (self.shape[0] * self.shape[1],), np.nan, values.dtype)
+        grid[..., self._cells] = values[..., self.known]
+        return grid.reshape(leading + self.shape)
+
+    def gather(self, grid: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Read the rows' values back from a grid.
+
+        Args:
+            grid (np.ndarray): Grid shaped like the result of ``scatter``.
+            values (np.ndarray): Per-row values kept for rows without a country.
+
+        Returns:
+            np.ndarray: A copy of ``values`` with the grid's value of every row.
+        """
+        gathered = values.copy()
+        cells = grid.reshape(grid.shape[:-2] + (-1,))
+        gathered[..., self.known] = cells[..., self._cells]
+        return gathered
+
+
+class GapFill:
+    """
+    Gap-filled metrics of every country, with a mask of the observed values.
+
+    The rows are scattered into a dense metric × country × year grid, every
+    country's series is filled by ``interpolate_gaps`` in one vectorized pass, and
+    the filled values are gathered back into the original row order. Which values
+    were observed and which imputed is kept as one byte per row each, bit ``i``
+    standing for the i-th metric.
+
+    Args:
+        df (pd.DataFrame): Data with 'country', 'year' and the ``metrics`` columns.
+        metrics (list[str]): The metrics to fill (default: every metric).
+    """
+
+    def __init__(self, df: pd.DataFrame, metrics: list[str] = METRIC_COLUMNS):
+        if len(metrics) > 8:
+            raise ValueError("GapFill masks at most 8 metrics")
+        self.metrics = list(metrics)
+
+        # Rows without a country are left as they are
+        positions = CountryYearGrid(df)
+        raw = df[self.metrics].to_numpy(dtype=np.float32).T
+        grid = interpolate_gaps(positions.scatter(raw), positions.years)
+
+        self.values = positions.gather(grid, raw)
+        # Shared by every session, like the frame it was computed from
+        self.values.flags.writeable = False
+        bits = (1 << np.arange(len(self.metrics))).astype(np.uint8)[:, None]
+        observed = ~np.isnan(raw)
+        imputed = ~np.isnan(self.values) & ~observed
+        self.observed_bits = np.bitwise_or.reduce(observed * bits, axis=0)
+        self.imputed_bits = np.bitwise_or.reduce(imputed * bits, axis=0)
+
+    def observed(self, metric: str) -> np.ndarray:
+        """
+        Return which rows have an observed value of a metric.
+
+        Args:
+            metric (str): The metric to look up.
+
+        Returns:
+            np.ndarray: One boolean per row.
+        """
+        bit = np.uint8(1 << self.metrics.index(metric))
+        return (self.observed_bits & bit).astype(bool)
+
+    def imputed(self, metric: str) -> np.ndarray:
+        """
+        Return which rows have an imputed value of a metric.
+
+        Args:
+            metric (str): The metric to look up.
+
+        Returns:
+            np.ndarray: One boolean per row; values that could not be filled are
+            neither observed nor imputed.
+        """
+        bit = np.uint8(1 << self.metrics.index(metric))
+        return (self.imputed_bits & bit).astype(bool)
+
+    def filled_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return ``df`` with its metric columns replaced by the filled values.
+
+        Args:
+            df (pd.DataFrame): The frame this gap fill was computed from.
+
+        Returns:
+            pd.DataFrame: A new frame sharing the other columns with ``df``.
+        """
+        filled = df.copy(deep=False)
+        for metric, values in zip(self.metrics, self.values, strict=True):
+            filled[metric] = values
+        return filled
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# Columns of the node table returned by aggregate_hierarchy
+NODE_COLUMNS = ["id", "parent", "label", "level", "depth", "root", "value", "share"]
+
+
+def _join_labels(frame: pd.DataFrame, keys: list[str]) -> pd.Series:
+    ids = frame[keys[0]].astype(str)
+    for key in keys[1:]:
+        ids = ids + "/" + frame[key].astype(str)
+    return ids
+
+
+def aggregate_hierarchy(df: pd.DataFrame, path: list[str], value: str) -> pd.DataFrame:
+    """
+    Aggregate a value over a hierarchy of columns into a table of tree nodes.
+
+    Every level of ``path`` (e.g. continent → country, or continent → region →
+    country → subdivision) is summed with one grouped reduction, so the cost grows
+    with the depth of the path and the number of nodes, never with Python-level work
+    per row. Rows whose value is missing or not positive are left out, as they cannot
+    be drawn in a sunburst.
+
+    Args:
+        df (pd.DataFrame): Data containing the ``path`` columns and ``value``.
+        path (list[str]): Columns from the outermost to the innermost level.
+        value (str): The column to sum, e.g. 'gdp'.
+
+    Returns:
+        pd.DataFrame: One row per node with its 'id', 'parent' id ('' for top-level
+        nodes), 'label', 'level' (column name), 'depth', 'root' (top-level label),
+        total 'value', 'share' of its parent's total in percent and 'rank' among
+        its siblings (1 = largest).
+    """
+    data = df.loc[df[value] > 0, [*path, value]]
+
+    levels = []
+    for depth, level in enumerate(path):
+        keys = path[: depth + 1]
+        nodes = (
+            data.groupby(keys, observed=True, sort=False)[value]
+            .sum()
+            .astype(np.float64)
+            .reset_index()
+        )
+        nodes["id"] = _join_labels(nodes, keys)
+        nodes["parent"] = _join_labels(nodes, keys[:-1]) if depth else ""
+        nodes["label"] = nodes[level].astype(str)
+        nodes["level"] = level
+        nodes["depth"] = depth
+        nodes["root"] = nodes[path[0]].astype(str)
+        levels.append(nodes.rename(columns={value: "value"})[NODE_COLUMNS[:-1]])
+
+    nodes = pd.concat(levels, ignore_index=True)
+    siblings = nodes.groupby("parent", sort=False)["value"]
+    nodes["share"] = nodes["value"] / siblings.transform("sum") * 100
+    nodes["rank"] = siblings.rank(method="first", ascending=False).astype(np.int64)
+    return nodes
+
+
+def top_nodes(nodes: pd.DataFrame, depth: int, n: int = 1) -> pd.DataFrame:
+    """
+    Return the ``n`` largest nodes under every parent at a given depth.
+
+    Args:
+        nodes (pd.DataFrame): Node table returned by ``aggregate_hierarchy``.
+        depth (int): Depth of the nodes to rank (0 = top level).
+        n (int): Number of nodes to keep per parent (default: 1).
+
+    Returns:
+        pd.DataFrame: The selected nodes, ordered by parent and rank.
+    """
+    selected = nodes[(nodes["depth"] == depth) & (nodes["rank"] <= n)]
+    return selected.sort_values(["parent", "rank"])
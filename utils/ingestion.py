@@ -0,0 +1,281 @@
+import glob
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+from constants.constants import (
+    DATA_DTYPES,
+    DATA_EXTRACT_SETTLE_SECONDS,
+    DATA_EXTRACTS_GLOB,
+    DATA_PATH,
+)
+from utils.cache_lifecycle import get_cache_lifecycle
+from utils.data_loader import file_fingerprint, load_dataset, read_gapminder_csv
+from utils.dataset import Dataset
+from utils.year_index import YearIndex
+
+logger = logging.getLogger(__name__)
+
+
+def combine_versions(*versions: str) -> str:
+    """
+    Derive a new version fingerprint from a previous one and what was added to it.
+
+    Args:
+        *versions (str): The fingerprints to combine, in order.
+
+    Returns:
+        str: A 16 hex character fingerprint.
+    """
+    return hashlib.sha256("|".join(versions).encode()).hexdigest()[:16]
+
+
+def read_extract(path: str | os.PathLike) -> pd.DataFrame:
+    """
+    Parse an extract file, checking that it has every column of the schema.
+
+    Args:
+        path (str | os.PathLike): Path to the extract CSV.
+
+    Returns:
+        pd.DataFrame: The typed rows, as returned by ``read_gapminder_csv``.
+
+    Raises:
+        ValueError: If columns are missing or values do not fit the schema.
+        pd.errors.ParserError: If the file is not valid CSV.
+    """
+    columns = pd.read_csv(path, nrows=0).columns
+    missing = [column for column in DATA_DTYPES if column not in columns]
+    if missing:
+        raise ValueError(f"missing columns {', '.join(missing)}")
+    return read_gapminder_csv(path)
+
+
+def _align_countries(
+    partitions: dict[int, pd.DataFrame], extract: pd.DataFrame
+) -> tuple[dict[int, pd.DataFrame], pd.DataFrame]:
+    # Countries of every partition must share one categorical dtype so that the
+    # partitions can be concatenated and compared. Existing partitions are only
+    # recoded when the extract brings countries that were not seen before.
+    known = next(iter(partitions.values()))["country"].cat.categories
+    new_countries = extract["country"].cat.categories.difference(known, sort=False)
+
+    if len(new_countries):
+        known = known.append(new_countries)
+        aligned = {}
+        for year, partition in partitions.items():
+            partition = partition.copy(deep=False)
+            partition["country"] = partition["country"].cat.set_categories(known)
+            aligned[year] = partition
+        partitions = aligned
+
+    extract = extract.copy(deep=False)
+    extract["country"] = extract["country"].cat.set_categories(known)
+    return partitions, extract
+
+
+def ingest_extract(
+    dataset: Dataset, extract: pd.DataFrame, fingerprint: str
+) -> Dataset:
+    """
+    Add the rows of a new extract to a dataset, touching only the years it covers.
+
+    Years that are new to the dataset are appended as partitions. For years that
+    already exist, the extract's rows replace those of the same countries and are
+    added otherwise, so both a new annual extract and a batch of extra countries are
+    supported. Partitions, aggregates and figure cache keys of other years are left
+    as they are.
+
+    Args:
+        dataset (Dataset): The current dataset.
+        extract (pd.DataFrame): New rows in the loader's schema, sorted by year (as
+            returned by ``read_gapminder_csv``).
+        fingerprint (str): Fingerprint of the extract's content.
+
+    Returns:
+        Dataset: A new dataset with a new version; ``dataset`` is left unchanged.
+    """
+    if extract.empty:
+        return dataset
+
+    partitions, extract = _align_countries(dataset.partitions, extract)
+    extract_index = YearIndex(extract["year"].to_numpy())
+
+    updates, year_versions = {}, {}
+    for year in extract_index.years:
+        year = int(year)
+        rows = extract_index.slice(extract, year)
+        existing = partitions.get(year)
+        if existing is not None:
+            kept = existing[~existing["country"].isin(rows["country"])]
+            rows = pd.concat([kept, rows])
+        updates[year] = rows.sort_values("continent", kind="stable", ignore_index=True)
+        year_versions[year] = combine_versions(dataset.year_version(year), fingerprint)
+
+    changed_years = list(updates)
+    if partitions is not dataset.partitions:
+        # New countries re-typed every partition; carry them over without treating
+        # their rows as changed
+        updates = {**partitions, **updates}
+
+    return dataset.with_partitions(
+        updates,
+        combine_versions(dataset.version, fingerprint),
+        year_versions,
+        changed_years=changed_years,
+    )
+
+
+class DataStore:
+    """
+    The current dataset of this server process and the extracts ingested into it.
+
+    Every rerun asks the store for the current dataset. When a new or changed
+    extract matching ``extracts_glob`` appears next to the source CSV it is ingested
+    and the store swaps in the new dataset version, which live sessions pick up on
+    their next rerun. Files modified in the last ``settle_seconds`` may still be
+    being written and are left for a later rerun. An extract that cannot be read
+    or lacks columns is logged and skipped until the file changes, and the current
+    dataset keeps being served.
+
+    Args:
+        dataset (Dataset): The dataset loaded from the source CSV.
+        extracts_glob (str): Glob pattern of the extract files to watch.
+        on_update (Callable[[Dataset, Dataset], None] | None): Called with the
+            previous and the new dataset whenever an extract is ingested.
+        settle_seconds (float): How long an extract must be left unmodified
+            before it is ingested.
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        extracts_glob: str = DATA_EXTRACTS_GLOB,
+        on_update: Callable[[Dataset, Dataset], None] | None = None,
+        settle_seconds: float = DATA_EXTRACT_SETTLE_SECONDS,
+    ):
+        self.extracts_glob = extracts_glob
+        self.settle_seconds = settle_seconds
+        self._dataset = dataset
+        self._ingested: dict[str, str] = {}
+        # Fingerprints of extract files that failed to ingest, so they are not
+        # read again on every rerun
+        self.rejected: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._on_update = on_update
+
+    def _swap(self, dataset: Dataset):
+        previous, self._dataset = self._dataset, dataset
+        if self._on_update is not None:
+            self._on_update(previous, dataset)
+
+    @property
+    def current(self) -> Dataset:
+        """Dataset: The latest version of the data."""
+        return self._dataset
+
+    def ingest(self, extract: pd.DataFrame, fingerprint: str) -> Dataset:
+        """
+        Ingest an extract that is already in memory.
+
+        Args:
+            extract (pd.DataFrame): New rows in the loader's schema.
+            fingerprint (str): Fingerprint of the extract's content.
+
+        Returns:
+            Dataset: The new current dataset.
+        """
+        with self._lock:
+            self._swap(ingest_extract(self._dataset, extract, fingerprint))
+            return self._dataset
+
+    def refresh(self) -> Dataset:
+        """
+        Ingest any new or changed extract files and return the current dataset.
+
+        Checking for extracts costs one ``stat`` per file as long as none changed.
+
+        Returns:
+            Dataset: The current dataset.
+        """
+        settled = time.time() - self.settle_seconds
+        for path in sorted(glob.glob(self.extracts_glob)):
+            try:
+                if os.stat(path).st_mtime > settled:
+                    continue
+                fingerprint = file_fingerprint(path)
+            except OSError:
+                # Removed since it was listed
+                continue
+            if fingerprint in (self._ingested.get(path), self.rejected.get(path)):
+                continue
+            with self._lock:
+                if fingerprint in (self._ingested.get(path), self.rejected.get(path)):
+                    continue
+                try:
+                    dataset = ingest_extract(
+                        self._dataset, read_extract(path), fingerprint
+                    )
+                except (pd.errors.ParserError, ValueError, KeyError) as exc:
+                    logger.error("Skipping unreadable extract %s: %s", path, exc)
+                    self.rejected[path] = fingerprint
+                    continue
+                self._swap(dataset)
+                self._ingested[path] = fingerprint
+        return self._dataset
+
+
+@st.cache_resource(show_spinner=False)
+def _get_data_store(path: str, fingerprint: str) -> DataStore:
+    lifecycle = get_cache_lifecycle()
+    store = DataStore(
+        load_dataset(path),
+        on_update=partial(lifecycle.dataset_changed, path, fingerprint),
+    )
+    lifecycle.dataset_changed(path, fingerprint, None, store.current)
+    return store
+
+
+def _retire_data_store(path: str, fingerprint: str):
+    # Drops the store of one version of the source file and everything cached
+    # from it, leaving other versions and sources alone
+    _get_data_store.clear(path, fingerprint)
+    get_cache_lifecycle().retire_source(path, fingerprint)
+
+
+def get_data_store(path: str | os.PathLike = DATA_PATH) -> DataStore:
+    """
+    Return the data store shared by every session for the current source file.
+
+    Args:
+        path (str | os.PathLike): Path to the Gapminder CSV file.
+
+    Returns:
+        DataStore: The process-wide store; replacing the source file starts a new
+        one, which re-ingests the extracts on its first refresh, and evicts the
+        cached data and figures of the previous version.
+    """
+    path, fingerprint = str(path), file_fingerprint(path)
+    previous = get_cache_lifecycle().observe_source(path, fingerprint)
+    if previous is not None:
+        _retire_data_store(path, previous)
+    return _get_data_store(path, fingerprint)
+
+
+def reload_data_source(path: str | os.PathLike = DATA_PATH):
+    """
+    Evict the current version of a source file, so the next rerun reloads it.
+
+    Args:
+        path (str | os.PathLike): Path to the Gapminder CSV file.
+    """
+    fingerprint = get_cache_lifecycle().forget_source(str(path))
+    if fingerprint is not None:
+        _retire_data_store(str(path), fingerprint)
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+from constants.constants import HIGH_HDI_THRESHOLD, METRIC_LABELS
+from utils.aggregates import AggregateCube
+from utils.continent_utils import continent_codes
+
+
+def _masked_correlation(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Pearson correlation of every column, over the rows where both are present
+    valid = ~(np.isnan(x) | np.isnan(y))
+    n = valid.sum(axis=0)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.where(valid, x - x.sum(axis=0) / n, 0.0)
+        dy = np.where(valid, y - y.sum(axis=0) / n, 0.0)
+        r = (dx * dy).sum(axis=0) / np.sqrt((dx**2).sum(axis=0) * (dy**2).sum(axis=0))
+    return np.where(n >= 3, r, np.nan)
+
+
+def _column_ranks(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    # Rank of every value within its column; missing values sort last and are
+    # masked again afterwards, so the valid values are ranked 0..n-1
+    ranks = np.argsort(np.argsort(np.where(valid, values, np.inf), axis=0), axis=0)
+    return np.where(valid, ranks, np.nan)
+
+
+def _strength(r: float) -> str:
+    size = abs(r)
+    strength = "strong" if size >= 0.7 else "moderate" if size >= 0.4 else "weak"
+    return f"{strength} {'positive' if r >= 0 else 'negative'}"
+
+
+def _join(names: list[str]) -> str:
+    return names[0] if len(names) == 1 else ", ".join(names[:-1]) + " and " + names[-1]
+
+
+class Insights:
+    """
+    Statistics behind the dashboard's key insights, for every year at once.
+
+    Everything is derived in a few vectorized passes over the aggregate cube and
+    the year partitions, so the insights of any year are plain lookups afterwards.
+    The partitions are read one by one, so a dataset built from ingested partitions
+    is never concatenated into a full frame for its insights.
+
+    Args:
+        partitions (dict[int, pd.DataFrame]): Rows of each year, with 'continent'
+            and 'hdi_index' columns.
+        cube (AggregateCube): Continent × year statistics of the partitions.
+    """
+
+    def __init__(self, partitions: dict[int, pd.DataFrame], cube: AggregateCube):
+        self.continents = np.asarray(cube.continents)
+        self.years = cube.years
+        self._year_positions = {int(year): i for i, year in enumerate(self.years)}
+        n_continents, n_years = len(self.continents), len(self.years)
+
+        # Countries with very high human development per continent and year
+        self.high_hdi_counts = np.zeros((n_continents, n_years), dtype=np.intp)
+        for year, partition in partitions.items():
+            position = self._year_positions.get(int(year))
+            if position is None:
+                continue
+            codes = continent_codes(partition)
+            high = (codes >= 0) & (
+                partition["hdi_index"].to_numpy() >= HIGH_HDI_THRESHOLD
+            )
+            self.high_hdi_counts[:, position] = np.bincount(
+                codes[high], minlength=n_continents
+            )
+
+        # Continent-level association of life expectancy and CO2 per year
+        life_exp = cube.get("life_exp")
+        co2 = cube.get("co2_consump")
+        valid = ~(np.isnan(life_exp) | np.isnan(co2))
+        self.life_exp_co2_pearson = _masked_correlation(life_exp, co2)
+        self.life_exp_co2_spearman = _masked_correlation(
+            _column_ranks(life_exp, valid), _column_ranks(co2, valid)
+        )
+
+        # Year-over-year change of every metric's continent means
+        self.means = {metric: cube.get(metric) for metric in cube.metrics}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.yoy_change = {
+                metric: means[:, 1:] / means[:, :-1] - 1
+                for metric, means in self.means.items()
+            }
+
+    def high_hdi(self, year: int) -> str | None:
+        """
+        Return which continent has the most countries with very high HDI.
+
+        Args:
+            year (int): The year to describe.
+
+        Returns:
+            str | None: The insight, or None if no country reaches the threshold.
+        """
+        position = self._year_positions.get(int(year))
+        if position is None:
+            return None
+        counts = self.high_hdi_counts[:, position]
+        if not counts.any():
+            return None
+        leader = int(counts.argmax())
+        return (
+            f"🔍 **Key Insight**: {self.continents[leader]} has the most countries "
+            f"with very high human development (HDI ≥ {HIGH_HDI_THRESHOLD}) with "
+            f"{counts[leader]} countries, indicating superior social and economic "
+            "development."
+        )
+
+    def life_exp_co2_correlation(self, year: int) -> str | None:
+        """
+        Describe how continent averages of life expectancy and CO2 move together.
+
+        Args:
+            year (int): The year to describe.
+
+        Returns:
+            str | None: The insight, or None if too few continents have both values.
+        """
+        position = self._year_positions.get(int(year))
+        if position is None or np.isnan(self.life_exp_co2_pearson[position]):
+            return None
+        pearson = float(self.life_exp_co2_pearson[position])
+        spearman = float(self.life_exp_co2_spearman[position])
+        ranking = "similarly" if spearman >= 0.7 else "differently"
+        return (
+            f"🔍 **Key Insight**: In {year} there is a {_strength(pearson)} "
+            f"correlation (r = {pearson:.2f}) between average life expectancy and "
+            "average CO2 consumption across continents, and the continents rank "
+            f"{ranking} on both (Spearman ρ = {spearman:.2f})."
+        )
+
+    def development_trend(self, metrics: list[str], shock_metric: str) -> str:
+        """
+        Summarize the long-run trend of some metrics and the sharpest drop of another.
+
+        The sharpest drop is the year in which ``shock_metric`` fell in the most
+        continents, ties broken by the largest average decline.
+
+        Args:
+            metrics (list[str]): Metrics whose overall trend to describe.
+            shock_metric (str): Metric in which to look for the sharpest drop.
+
+        Returns:
+            str: The insight.
+        """
+        first, last = int(self.years[0]), int(self.years[-1])
+        rising = [
+            int((self.means[metric][:, -1] > self.means[metric][:, 0]).sum())
+            for metric in metrics
+        ]
+        labels = [METRIC_LABELS[metric] for metric in metrics]
+        rose = (
+            f"{min(rising)} to {max(rising)}"
+            if min(rising) < max(rising)
+            else rising[0]
+        )
+        text = (
+            f"🔍 **Key Insight**: Between {first} and {last}, {_join(labels)} rose "
+            f"in {rose} of {len(self.continents)} continents."
+        )
+
+        change = self.yoy_change[shock_metric]
+        falling = change < 0
+        if not falling.any():
+            return text
+        declines = falling.sum(axis=0)
+        mean_change = np.where(falling, change, 0).sum(axis=0) / np.maximum(declines, 1)
+        candidates = np.flatnonzero(declines == declines.max())
+        shock = int(candidates[np.nanargmin(mean_change[candidates])])
+        spared = self.continents[~falling[:, shock]].tolist()
+        text += (
+            f" The broadest drop in {METRIC_LABELS[shock_metric]} came in "
+            f"{int(self.years[shock + 1])}, when it fell in {declines[shock]} of "
+            f"{len(self.continents)} continents by {-mean_change[shock]:.1%} on average"
+        )
+        return text + (f", except for {_join(spared)}." if spared else ".")
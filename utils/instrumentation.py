@@ -0,0 +1,210 @@
+import functools
+import json
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+import streamlit as st
+
+from constants.constants import PROFILING_ENABLED
+
+logger = logging.getLogger("gapminder.performance")
+
+_active_timer: ContextVar["RerunTimer | None"] = ContextVar(
+    "active_rerun_timer", default=None
+)
+_NULL_SPAN = nullcontext()
+
+
+class RerunTimer:
+    """
+    Timings of the spans recorded during one script or fragment rerun.
+
+    Args:
+        label (str): What is being rerun, e.g. 'app' or a fragment name.
+        fields (dict): Extra fields added to the structured log record.
+    """
+
+    def __init__(self, label: str, **fields):
+        self.label = label
+        self.fields = fields
+        self.spans: list[dict] = []
+        self.started = time.perf_counter()
+        self.total_ms: float | None = None
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name: str, **fields):
+        start = time.perf_counter()
+        record = {"name": name, "depth": self._depth, **fields}
+        self.spans.append(record)
+        self._depth += 1
+        try:
+            yield record
+        finally:
+            self._depth -= 1
+            record["start_ms"] = round((start - self.started) * 1000, 3)
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def finish(self) -> dict:
+        self.total_ms = round((time.perf_counter() - self.started) * 1000, 3)
+        return {
+            "event": "rerun",
+            "label": self.label,
+            "total_ms": self.total_ms,
+            **self.fields,
+            "spans": self.spans,
+        }
+
+
+def span(name: str, **fields):
+    """
+    Time a block of code as part of the current rerun.
+
+    Outside a profiled rerun this returns a shared no-op context manager, so the
+    only cost of leaving instrumentation in place is one context variable lookup.
+
+    Args:
+        name (str): Name of the span, e.g. 'figure.build'.
+        **fields: Extra fields stored with the span.
+
+    Returns:
+        ContextManager: Yields the span's record (a dict) when profiling, so fields
+        such as payload sizes can be added to it, or None otherwise.
+    """
+    timer = _active_timer.get()
+    if timer is None:
+        return _NULL_SPAN
+    return timer.span(name, **fields)
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorate a function so that each call is recorded as a span.
+
+    Args:
+        name (str): Name of the span.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_timer.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _ensure_log_handler():
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+def start_rerun(label: str, enabled: bool = PROFILING_ENABLED, **fields):
+    """
+    Start collecting spans for a rerun, unless one is already being profiled.
+
+    Args:
+        label (str): What is being rerun, e.g. 'app' or a fragment name.
+        enabled (bool): Whether to profile this rerun.
+        **fields: Extra fields for the structured log record (e.g. the page).
+
+    Returns:
+        RerunTimer | None: The new timer, or None if profiling is disabled or this
+        rerun is nested in one that is already profiled.
+    """
+    if not enabled or _active_timer.get() is not None:
+        return None
+    timer = RerunTimer(label, **fields)
+    timer.token = _active_timer.set(timer)
+    return timer
+
+
+def finish_rerun(timer: RerunTimer | None) -> dict | None:
+    """
+    Stop profiling a rerun and emit its timings as one JSON log line.
+
+    Args:
+        timer (RerunTimer | None): The timer returned by ``start_rerun``.
+
+    Returns:
+        dict | None: The logged record, or None if nothing was profiled.
+    """
+    if timer is None:
+        return None
+    _active_timer.reset(timer.token)
+    record = timer.finish()
+    _ensure_log_handler()
+    logger.info(json.dumps(record, default=str))
+    return record
+
+
+def profiling_enabled() -> bool:
+    """
+    Return whether the current session is profiled.
+
+    Profiling is enabled for every session with the GAPMINDER_PROFILE environment
+    variable, or for a single session by opening the app with ``?profile=1``.
+
+    Returns:
+        bool: True if reruns of this session should be timed.
+    """
+    return PROFILING_ENABLED or st.query_params.get("profile") == "1"
+
+
+def session_id() -> str:
+    """
+    Return a random identifier of the current session to tag its log records with.
+
+    Returns:
+        str: The session identifier.
+    """
+    if "profile_session_id" not in st.session_state:
+        st.session_state.profile_session_id = uuid.uuid4().hex[:12]
+    return st.session_state.profile_session_id
+
+
+def start_session_rerun(label: str) -> RerunTimer | None:
+    """
+    Start profiling a rerun of the current session if profiling is enabled.
+
+    Args:
+        label (str): What is being rerun, e.g. 'app' or a fragment name.
+
+    Returns:
+        RerunTimer | None: The timer to pass to ``finish_session_rerun``.
+    """
+    if not profiling_enabled():
+        return None
+    return start_rerun(
+        label,
+        enabled=True,
+        session=session_id(),
+        nav=st.session_state.get("nav", "Home"),
+    )
+
+
+def finish_session_rerun(timer: RerunTimer | None):
+    """
+    Finish profiling a rerun and keep its timings for the performance panel.
+
+    Args:
+        timer (RerunTimer | None): The timer returned by ``start_session_rerun``.
+    """
+    record = finish_rerun(timer)
+    if record is not None:
+        st.session_state.last_rerun_timings = record
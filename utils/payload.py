@@ -0,0 +1,224 @@
+import base64
+import re
+
+import numpy as np
+import plotly.graph_objects as go
+
+from constants.constants import PAYLOAD_TYPED_ARRAY_MIN_LENGTH
+
+# `%{variable}`, `%{variable[i]}` and `%{variable:format}` references of templates
+_TEMPLATE_REFERENCE = re.compile(r"%\{([A-Za-z.]+)(?:\[(\d+)\])?(:[^}]*)?\}")
+# Decimals of a d3 fixed-point or percentage format, e.g. ",.2f" or ".1%"
+_FIXED_FORMAT = re.compile(r"\.(\d+)([f%])$")
+
+# Attributes sent exactly: a sunburst's parents must add up to their children
+_EXACT_ATTRIBUTES = {"values"}
+# Attributes only shown on hover, which are rounded to the decimals shown there.
+# Plotted ones keep their full float32 precision, since a line rounded to its
+# hover's decimals turns into a staircase.
+_HOVER_ATTRIBUTES = {"customdata", "hovertext"}
+
+
+def _numeric_array(value) -> np.ndarray | None:
+    # Plotly's typed-array encoding, as found in figures read back from JSON
+    if isinstance(value, dict):
+        if "bdata" not in value:
+            return None
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        if "shape" in value:
+            array = array.reshape([int(n) for n in str(value["shape"]).split(",")])
+        return array
+    if isinstance(value, (list, tuple, np.ndarray)):
+        array = np.asarray(value)
+        if array.dtype.kind in "iuf":
+            return array
+    return None
+
+
+def template_precision(template: str) -> dict[tuple[str, int | None], int | None]:
+    """
+    Return the variables a hover template shows and the decimals it shows them with.
+
+    Args:
+        template (str): A Plotly hover template.
+
+    Returns:
+        dict[tuple[str, int | None], int | None]: Maps each referenced variable,
+        as its name and ``customdata`` column (None for other variables), to the
+        number of decimals displayed, or None if it is not shown as a fixed-point
+        number everywhere.
+    """
+    precision = {}
+    for name, column, number_format in _TEMPLATE_REFERENCE.findall(template):
+        key = (name, int(column) if column else None)
+        match = _FIXED_FORMAT.search(number_format)
+        decimals = None
+        if match is not None:
+            decimals = int(match[1]) + (2 if match[2] == "%" else 0)
+        if key not in precision:
+            precision[key] = decimals
+        elif precision[key] is not None and decimals is not None:
+            precision[key] = max(precision[key], decimals)
+        else:
+            precision[key] = None
+    return precision
+
+
+def _compact(array: np.ndarray, decimals: int | None) -> np.ndarray:
+    if array.dtype.kind != "f":
+        return array
+    if decimals is not None:
+        array = array.round(decimals)
+    return array.astype(np.float32, copy=False)
+
+
+def _shape_customdata(
+    spec: dict, template: str, precision: dict
+) -> tuple[np.ndarray | None, str] | None:
+    customdata = spec["customdata"]
+    numeric = _numeric_array(customdata)
+    columns = numeric if numeric is not None else np.asarray(customdata, dtype=object)
+    if columns.ndim != 2 or ("customdata", None) in precision:
+        return None
+
+    axes = {axis: _numeric_array(spec.get(axis)) for axis in ("x", "y")}
+    # Where each referenced column is shown from once the redundant ones are gone
+    sources, kept = {}, []
+    for column in sorted(i for name, i in precision if name == "customdata"):
+        if column >= columns.shape[1]:
+            return None
+        values = columns[:, column]
+        for axis, axis_values in axes.items():
+            if axis_values is not None and axis_values.shape == values.shape:
+                try:
+                    equal = np.allclose(values.astype(float), axis_values, rtol=1e-6)
+                except (TypeError, ValueError):
+                    equal = False
+                if equal:
+                    sources[column] = axis
+                    break
+        else:
+            if (
+                columns.dtype == object
+                and len(values)
+                and "name" in spec
+                and (values == spec["name"]).all()
+            ):
+                sources[column] = "fullData.name"
+            else:
+                sources[column] = f"customdata[{len(kept)}]"
+                kept.append(column)
+
+    def reference(match: re.Match) -> str:
+        if match[1] != "customdata":
+            return match[0]
+        return f"%{{{sources[int(match[2])]}{match[3] or ''}}}"
+
+    template = _TEMPLATE_REFERENCE.sub(reference, template)
+    if not kept:
+        return None, template
+
+    columns = columns[:, kept]
+    decimals = [precision["customdata", column] for column in kept]
+    if numeric is not None:
+        # One decimal count for the whole typed array
+        shared = None if None in decimals else max(decimals)
+        return _compact(columns, shared), template
+    columns = columns.copy()
+    for position, places in enumerate(decimals):
+        if places is None:
+            continue
+        try:
+            rounded = columns[:, position].astype(float).round(places)
+        except (TypeError, ValueError):
+            continue
+        columns[:, position] = rounded.astype(object)
+    return columns, template
+
+
+def shape_trace(spec: dict, hovertemplate: str | None = None) -> dict:
+    """
+    Return the updates that make a trace cheaper to send, without changing its look.
+
+    Numeric arrays are sent as float32 typed arrays, which Plotly encodes as base64
+    binary instead of JSON text; those only shown on hover, like ``customdata``,
+    are first rounded to the decimals their hover template displays. ``customdata``
+    columns the template does not show are dropped, and those repeating the
+    trace's x or y values or its name are shown from those instead.
+
+    Args:
+        spec (dict): The trace as a dict, e.g. from ``trace.to_plotly_json()``.
+        hovertemplate (str | None): Template to use if the trace has none, e.g. the
+            one of the trace an animation frame updates.
+
+    Returns:
+        dict: Properties to update the trace with; empty if it is already compact.
+    """
+    template = spec.get("hovertemplate", hovertemplate)
+    precision = template_precision(template) if isinstance(template, str) else {}
+    updates = {}
+
+    if isinstance(template, str) and spec.get("customdata") is not None:
+        shaped = _shape_customdata(spec, template, precision)
+        if shaped is not None:
+            updates["customdata"], new_template = shaped
+            if new_template != template and "hovertemplate" in spec:
+                updates["hovertemplate"] = new_template
+
+    def shape_arrays(props: dict, nested: bool) -> dict:
+        shaped = {}
+        for prop, value in props.items():
+            if prop in updates or prop in _EXACT_ATTRIBUTES:
+                continue
+            if isinstance(value, dict) and "bdata" not in value:
+                inner = shape_arrays(value, True)
+                if inner:
+                    shaped[prop] = inner
+                continue
+            # Typed arrays narrower than float64 were already shaped
+            if isinstance(value, dict) and value.get("dtype") != "f8":
+                continue
+            array = _numeric_array(value)
+            if array is None or array.size < PAYLOAD_TYPED_ARRAY_MIN_LENGTH:
+                continue
+            decimals = None
+            if not nested and prop in _HOVER_ATTRIBUTES:
+                decimals = precision.get((prop, None))
+            compact = _compact(array, decimals)
+            unchanged = compact.dtype == array.dtype and np.array_equal(
+                compact, array, equal_nan=compact.dtype.kind == "f"
+            )
+            # Lists are converted even so, to be sent as typed arrays
+            if not unchanged or not isinstance(value, (np.ndarray, dict)):
+                shaped[prop] = compact
+        return shaped
+
+    updates.update(shape_arrays(spec, False))
+    return updates
+
+
+def shape_figure(fig: go.Figure) -> go.Figure:
+    """
+    Shape the traces of a figure and of its animation frames for sending, in place.
+
+    Args:
+        fig (go.Figure): The figure, e.g. one about to be cached.
+
+    Returns:
+        go.Figure: The same figure.
+    """
+    templates = []
+    for trace in fig.data:
+        spec = trace.to_plotly_json()
+        templates.append(spec.get("hovertemplate"))
+        updates = shape_trace(spec)
+        if updates:
+            trace.update(updates)
+    for frame in fig.frames:
+        indices = frame.traces or range(len(frame.data))
+        for index, trace in zip(indices, frame.data, strict=False):
+            template = templates[index] if index < len(templates) else None
+            updates = shape_trace(trace.to_plotly_json(), template)
+            if updates:
+                trace.update(updates)
+    return fig
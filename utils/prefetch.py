@@ -0,0 +1,249 @@
+import itertools
+import logging
+import threading
+import uuid
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from constants.constants import (
+    PREFETCH_MAX_PENDING,
+    PREFETCH_WORKERS,
+    PREFETCH_YEARS_AHEAD,
+    PREFETCH_YEARS_BEHIND,
+)
+from utils.dataset import Dataset
+from utils.figure_cache import FigureCache, figure_key, get_figure_cache
+from utils.instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+# Waiter of figures queued on behalf of no session
+_SHARED = ""
+
+
+def adjacent_years(
+    years: np.ndarray,
+    year: int,
+    ahead: int = PREFETCH_YEARS_AHEAD,
+    behind: int = PREFETCH_YEARS_BEHIND,
+) -> list[int]:
+    """
+    Return the years a user is likely to select next, most likely first.
+
+    Args:
+        years (np.ndarray): The available years, in ascending order.
+        year (int): The year being viewed.
+        ahead (int): Number of following years.
+        behind (int): Number of preceding years.
+
+    Returns:
+        list[int]: The next year, the previous year, then alternately further
+        following and preceding ones.
+    """
+    position = int(np.searchsorted(years, year))
+    if position >= len(years) or years[position] != year:
+        return []
+    following = years[position + 1 : position + 1 + ahead].tolist()
+    preceding = years[max(position - behind, 0) : position][::-1].tolist()
+    interleaved = itertools.zip_longest(following, preceding)
+    return [y for pair in interleaved for y in pair if y is not None]
+
+
+class YearPrefetcher:
+    """
+    Speculatively builds the figures of the years next to the one a session views.
+
+    Builds run on a small thread pool and go into the shared figure cache, so the
+    next sequential year change is a cache hit. A figure is queued once however
+    many sessions ask for it, and at most ``max_pending`` figures are queued at a
+    time. Every queued figure records the sessions waiting for it; when a session
+    makes a new request it stops waiting for its previous figures, and those no
+    session waits for any more are cancelled, or skipped if they have not been
+    built yet, so jumping to a distant year does not leave a backlog of unwanted
+    work.
+
+    Args:
+        figure_cache (FigureCache): The cache to fill.
+        workers (int): Number of prefetch threads.
+        max_pending (int): Most figures queued or being built at once.
+    """
+
+    def __init__(
+        self,
+        figure_cache: FigureCache,
+        workers: int = PREFETCH_WORKERS,
+        max_pending: int = PREFETCH_MAX_PENDING,
+    ):
+        self.figure_cache = figure_cache
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="prefetch")
+        self._pending: dict[Hashable, Future] = {}
+        # Who waits for every pending figure: session identifiers, or _SHARED for
+        # work that belongs to no session and is never cancelled
+        self._waiting: dict[Hashable, set[str]] = {}
+        # Pending figures of every session's latest request
+        self._sessions: dict[str, list[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.built = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def prefetch(
+        self,
+        session: str,
+        dataset: Dataset,
+        year: int,
+        builders: list[Callable[[Dataset, int], go.Figure]],
+    ) -> int:
+        """
+        Queue the figures of the years around ``year`` that are not cached yet.
+
+        Figures already queued are not queued again, but the session is recorded as
+        waiting for them, so they are only cancelled once no session wants them.
+
+        Args:
+            session (str): Identifier of the requesting session.
+            dataset (Dataset): The dataset being viewed.
+            year (int): The year being viewed.
+            builders (list[Callable[[Dataset, int], go.Figure]]): Builders of the
+                figures of a single year that the session shows.
+
+        Returns:
+            int: The number of figures queued.
+        """
+        candidates = [
+            (figure_key(build, dataset.year_version(other), other), build, other)
+            for other in adjacent_years(dataset.years, year)
+            for build in builders
+        ]
+        with self._lock:
+            for key in self._sessions.pop(session, []):
+                self._stop_waiting(session, key)
+
+            wanted, queued = [], 0
+            for key, build, other in candidates:
+                if key in self._pending:
+                    self._waiting[key].add(session)
+                    wanted.append(key)
+                    continue
+                if len(self._pending) >= self.max_pending or key in self.figure_cache:
+                    continue
+                self._waiting[key] = {session}
+                self._pending[key] = self._pool.submit(
+                    self._build, key, partial(build, dataset, other)
+                )
+                wanted.append(key)
+                queued += 1
+            if wanted:
+                self._sessions[session] = wanted
+        return queued
+
+    def submit(self, key: Hashable, build: Callable[[], go.Figure]) -> Future | None:
+        """
+        Queue a figure that belongs to no session, unless it is cached or queued.
+
+        Such work, e.g. a warm-up, shares the pool with the sessions' prefetches
+        and is never cancelled, and no figure is built twice at the same time. A
+        figure already queued by sessions is no longer cancelled either.
+
+        Args:
+            key (Hashable): The figure's cache key.
+            build (Callable[[], go.Figure]): Builds the figure.
+
+        Returns:
+            Future | None: The queued build, or None if there was nothing to do.
+        """
+        with self._lock:
+            if key in self._pending:
+                self._waiting[key].add(_SHARED)
+                return None
+            if key in self.figure_cache:
+                return None
+            self._waiting[key] = {_SHARED}
+            future = self._pool.submit(self._build, key, build)
+            self._pending[key] = future
+        return future
+
+    def _stop_waiting(self, session: str, key: Hashable):
+        # Called with the lock held
+        waiting = self._waiting.get(key)
+        if waiting is None:
+            return
+        waiting.discard(session)
+        if not waiting and self._pending[key].cancel():
+            del self._pending[key]
+            del self._waiting[key]
+            self.cancelled += 1
+
+    def _build(self, key: Hashable, build: Callable[[], go.Figure]):
+        try:
+            with self._lock:
+                wanted = bool(self._waiting.get(key))
+            # Skipped if every session moved on before the build could be cancelled
+            if wanted and key not in self.figure_cache:
+                self.figure_cache.put(key, build())
+                self.built += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("Prefetching %s failed", key)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+                for session in self._waiting.pop(key, ()):
+                    keys = self._sessions.get(session)
+                    if keys is not None:
+                        keys.remove(key)
+                        if not keys:
+                            del self._sessions[session]
+
+    def stats(self) -> dict:
+        """
+        Return the prefetch counters.
+
+        Returns:
+            dict: 'built', 'cancelled', 'failed' and 'pending' figures.
+        """
+        with self._lock:
+            return {
+                "built": self.built,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "pending": len(self._pending),
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher() -> YearPrefetcher:
+    """
+    Return the prefetcher shared by every session of this server process.
+
+    Returns:
+        YearPrefetcher: The process-wide prefetcher.
+    """
+    return YearPrefetcher(get_figure_cache())
+
+
+def prefetch_adjacent_years(
+    dataset: Dataset,
+    year: int,
+    builders: list[Callable[[Dataset, int], go.Figure]],
+):
+    """
+    Prefetch the figures of the years around the one the current session views.
+
+    Args:
+        dataset (Dataset): The dataset being viewed.
+        year (int): The year being viewed.
+        builders (list[Callable[[Dataset, int], go.Figure]]): Builders of the
+            figures of a single year that the session shows.
+    """
+    session = st.session_state.setdefault("prefetch_session", uuid.uuid4().hex)
+    with span("prefetch") as record:
+        queued = get_prefetcher().prefetch(session, dataset, year, builders)
+        if record is not None:
+            record["queued"] = queued
@@ -0,0 +1,65 @@
+import logging
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.tools
+import streamlit as st
+
+from utils.instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+
+class _BuiltFigure(go.Figure):
+    # A figure dict that was validated when its go.Figure was built. st.plotly_chart
+    # validates dicts by building a go.Figure from them, which takes longer than the
+    # cache hit that produced the dict, while it takes figures as valid and only
+    # reads them through to_dict() (to_plotly_json() and pio.to_json() do the same)
+    def __init__(self, spec: dict):
+        super().__init__()
+        self._spec = spec
+
+    def to_dict(self) -> dict:
+        return self._spec
+
+    def to_plotly_json(self) -> dict:
+        return self._spec
+
+
+def _unvalidated(spec: dict) -> go.Figure:
+    # The figure st.plotly_chart sends as `spec` without validating it again, if
+    # Plotly still hands the figure's dict to Streamlit as is; otherwise a
+    # validated figure, which renders correctly at the usual cost
+    wrapped = _BuiltFigure(spec)
+    sent = plotly.tools.return_figure_from_figure_or_data(wrapped, validate_figure=True)
+    if sent is spec and spec.get("data"):
+        return wrapped
+    logger.warning("Sending a figure dict unvalidated failed; validating it instead")
+    return go.Figure(spec)
+
+
+def render_chart(fig: go.Figure | dict, **kwargs):
+    """
+    Send a figure to the browser with ``st.plotly_chart``.
+
+    Every chart of the app goes through here, so that the cost of serializing
+    figures and the bytes they take on the websocket are recorded when profiling is
+    enabled. Figures come from the figure cache, which shapes them into a compact
+    payload once, when they are built, and hands them out as dicts parsed from
+    their JSON. These were valid figures when they were built, so they are sent as
+    they are, without being validated again; each is checked to reach Streamlit
+    unchanged and non-empty, or else it is validated as usual.
+
+    Args:
+        fig (go.Figure | dict): The figure to render, e.g. from ``cached_figure``.
+        **kwargs: Further arguments for ``st.plotly_chart``.
+    """
+    with span("plotly_chart") as record:
+        if isinstance(fig, dict):
+            fig = _unvalidated(fig)
+        if record is not None:
+            title = fig.to_dict().get("layout", {}).get("title", {})
+            record["chart"] = title.get("text") if isinstance(title, dict) else title
+            # The JSON st.plotly_chart sends, serialized once more to be measured
+            record["bytes"] = len(pio.to_json(fig.to_dict(), validate=False))
+        st.plotly_chart(fig, **kwargs)
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from constants.constants import (
+    CONTINENT_COLOR_MAP,
+    CONTINENT_ORDER,
+    SCATTER_DENSITY_BINS,
+    SCATTER_DENSITY_THRESHOLD,
+    SCATTER_SAMPLE_SIZE,
+    SCATTER_WEBGL_THRESHOLD,
+)
+from utils.continent_utils import continent_codes
+
+
+def scatter_render_mode(
+    n_points: int,
+    webgl_threshold: int = SCATTER_WEBGL_THRESHOLD,
+    density_threshold: int = SCATTER_DENSITY_THRESHOLD,
+) -> str:
+    """
+    Choose how a scatter plot with a given number of points should be drawn.
+
+    Args:
+        n_points (int): Number of points to plot.
+        webgl_threshold (int): Point count above which WebGL traces are used.
+        density_threshold (int): Point count above which points are binned.
+
+    Returns:
+        str: 'svg', 'webgl' or 'density'.
+    """
+    if n_points > density_threshold:
+        return "density"
+    if n_points > webgl_threshold:
+        return "webgl"
+    return "svg"
+
+
+def _bin_positions(values: np.ndarray, bins: int) -> tuple[np.ndarray, np.ndarray]:
+    edges = np.linspace(values.min(), values.max(), bins + 1)
+    if edges[0] == edges[-1]:
+        edges = edges + np.arange(bins + 1)
+    positions = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, bins - 1)
+    return positions, (edges[:-1] + edges[1:]) / 2
+
+
+def density_scatter_traces(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    hover_columns: list[str],
+    hovertemplate: str,
+    bins: int = SCATTER_DENSITY_BINS,
+    sample_size: int = SCATTER_SAMPLE_SIZE,
+) -> list[go.Scattergl]:
+    """
+    Bin scatter points per continent on a shared grid and pick hoverable samples.
+
+    All points are assigned to a (continent, y bin, x bin) cell in one vectorized
+    pass. Each continent gets a bubble trace with one marker per occupied cell, sized
+    by its point count, plus a trace of representative points (the first point of
+    the most populated cells) that keeps the full hover details.
+
+    Args:
+        df (pd.DataFrame): Points with 'continent', ``x``, ``y`` and
+            ``hover_columns``.
+        x (str): Column plotted on the x axis.
+        y (str): Column plotted on the y axis.
+        hover_columns (list[str]): Columns passed as customdata of the
+            representative points.
+        hovertemplate (str): Hover template of the representative points.
+        bins (int): Number of bins per axis.
+        sample_size (int): Maximum number of representative points.
+
+    Returns:
+        list[go.Scattergl]: Two traces per continent present in the data.
+    """
+    points = df[df[x].notna() & df[y].notna()]
+    codes = continent_codes(points).astype(np.intp)
+    known = codes >= 0
+    points, codes = points[known], codes[known]
+    if points.empty:
+        return []
+
+    ix, x_centers = _bin_positions(points[x].to_numpy(np.float64), bins)
+    iy, y_centers = _bin_positions(points[y].to_numpy(np.float64), bins)
+    cells = (codes * bins + iy) * bins + ix
+    counts = np.bincount(cells, minlength=len(CONTINENT_ORDER) * bins * bins)
+
+    occupied = np.flatnonzero(counts)
+    occupied_continents, rest = np.divmod(occupied, bins * bins)
+    occupied_y, occupied_x = np.divmod(rest, bins)
+    sizes = 6 + 24 * np.sqrt(counts[occupied] / counts[occupied].max())
+
+    # The first point of each cell represents it; keep those of the busiest cells
+    cell_ids, first_rows = np.unique(cells, return_index=True)
+    busiest = np.argsort(-counts[cell_ids], kind="stable")[:sample_size]
+    samples = points.iloc[np.sort(first_rows[busiest])]
+    sample_codes = continent_codes(samples)
+
+    traces = []
+    for code, continent in enumerate(CONTINENT_ORDER):
+        in_continent = occupied_continents == code
+        if not in_continent.any():
+            continue
+        color = CONTINENT_COLOR_MAP[continent]
+        traces.append(
+            go.Scattergl(
+                x=x_centers[occupied_x[in_continent]],
+                y=y_centers[occupied_y[in_continent]],
+                mode="markers",
+                name=continent,
+                legendgroup=continent,
+                marker=dict(color=color, size=sizes[in_continent], opacity=0.35),
+                customdata=counts[occupied[in_continent]],
+                hovertemplate=f"<b>{continent}</b><br>"
+                + "%{customdata:,} points near here<extra></extra>",
+            )
+        )
+        sample = samples[sample_codes == code]
+        traces.append(
+            go.Scattergl(
+                x=sample[x],
+                y=sample[y],
+                mode="markers",
+                name=continent,
+                legendgroup=continent,
+                showlegend=False,
+                marker=dict(color=color, size=4, opacity=0.9),
+                # Column-wise conversion avoids materialising every category of
+                # high-cardinality categoricals, as interleaving the frame would
+                customdata=np.column_stack(
+                    [sample[col].to_numpy(dtype=object) for col in hover_columns]
+                ),
+                hovertemplate=hovertemplate,
+            )
+        )
+    return traces
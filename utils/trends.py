@@ -0,0 +1,319 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from constants.constants import (
+    CONTINENT_ORDER,
+    METRIC_COLUMNS,
+    TREND_MIN_STD_FRACTION,
+    TREND_SHIFT_THRESHOLD,
+    TREND_SHOCK_FALSE_ALARM,
+    TREND_WINDOW,
+    TREND_Z_THRESHOLD,
+)
+from utils.continent_utils import continent_codes
+from utils.gap_filling import CountryYearGrid
+
+
+def _binomial_tail(count: int, trials: int, p: float) -> float:
+    # P(X >= count) for X ~ Binomial(trials, p), summing the probabilities of the
+    # outcomes from their logarithms, which stay finite for thousands of trials
+    k = np.arange(1, trials + 1)
+    log_pmf = np.empty(trials + 1)
+    log_pmf[0] = trials * np.log1p(-p)
+    log_pmf[1:] = log_pmf[0] + np.cumsum(
+        np.log((trials - k + 1) / k) + np.log(p / (1 - p))
+    )
+    return float(np.exp(log_pmf[count:]).sum())
+
+
+def _window_moments(values: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    # Mean and standard deviation of every window along the last axis. The windows
+    # are strided views; accumulating their `size` offsets in place is several times
+    # faster than reducing over the window axis, and measuring them from the
+    # window's first value keeps the float32 variance accurate
+    windows = sliding_window_view(values, size, axis=-1)
+    shift = windows[..., 0]
+    total = np.zeros_like(shift)
+    squares = np.zeros_like(shift)
+    part = np.empty_like(shift)
+    for offset in range(1, size):
+        np.subtract(windows[..., offset], shift, out=part)
+        total += part
+        np.multiply(part, part, out=part)
+        squares += part
+    mean = total / size
+    variance = squares / size - mean * mean
+    np.maximum(variance, 0, out=variance)
+    mean += shift
+    return mean, np.sqrt(variance, out=variance)
+
+
+def _trailing(windowed: np.ndarray, size: int) -> np.ndarray:
+    # Align per-window results with the last year of their window
+    aligned = np.full(
+        windowed.shape[:-1] + (windowed.shape[-1] + size - 1,),
+        np.nan,
+        dtype=windowed.dtype,
+    )
+    aligned[..., size - 1 :] = windowed
+    return aligned
+
+
+def _ranked(scores: np.ndarray, flags: np.ndarray) -> np.ndarray:
+    # Flat positions of the flagged cells, by decreasing absolute score
+    cells = np.flatnonzero(flags)
+    return cells[np.argsort(-np.abs(scores.ravel()[cells]), kind="stable")]
+
+
+class TrendScan:
+    """
+    Rolling means, shocks and trend shifts of every country and metric.
+
+    The rows are scattered into a dense metric × country × year grid and every
+    statistic is computed over strided views of its year axis, so the whole panel
+    is scanned in a few array operations. Windows with a missing year give no
+    statistic. Two kinds of breaks with a country's trend are flagged:
+
+    - A shock is a one-off year-over-year change that lies ``threshold`` standard
+      deviations or more from the country's changes of the previous ``window``
+      years.
+    - A trend shift is a change point of the country's growth: its mean change
+      over the ``window`` years after a year differs from the mean over the
+      ``window`` years up to it by ``shift_threshold`` or more, as a two-sample t
+      statistic. Only the year where the statistic peaks is flagged, and a
+      steady trend, however steep, is not a shift.
+
+    Only the statistics are kept; values are read back from ``df`` for the few
+    flags that are listed, so the scan holds no copy of the data.
+
+    Args:
+        df (pd.DataFrame): Data with 'continent', 'country', 'year' and the
+            ``metrics`` columns.
+        metrics (list[str]): The metrics to scan (default: every metric).
+        window (int): Number of years of the rolling windows.
+        threshold (float): Smallest absolute z-score of a shock.
+        shift_threshold (float): Smallest absolute t statistic of a trend shift.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        metrics: list[str] = METRIC_COLUMNS,
+        window: int = TREND_WINDOW,
+        threshold: float = TREND_Z_THRESHOLD,
+        shift_threshold: float = TREND_SHIFT_THRESHOLD,
+    ):
+        self.metrics = list(metrics)
+        self.window = window
+        self._df = df
+        positions = CountryYearGrid(df)
+        self.countries = positions.countries
+        self.years = positions.years
+        grid = positions.scatter(df[self.metrics].to_numpy(dtype=np.float32).T)
+        # Grid position of every row, to read the rows of flagged cells back
+        self._rows = np.flatnonzero(positions.known).astype(
+            np.min_scalar_type(len(df)), copy=False
+        )
+        self._cells = positions.flat_positions()
+
+        country_continents = np.full(len(self.countries), -1)
+        country_continents[positions.codes[positions.known]] = continent_codes(df)[
+            positions.known
+        ]
+        self.continents = np.append(np.asarray(CONTINENT_ORDER, dtype=object), None)[
+            country_continents
+        ]
+
+        # Mean of the last `window` years, ending at each year
+        self.rolling_means = _trailing(_window_moments(grid, window)[0], window)
+
+        # Change from the previous year, and its z-score against the changes of
+        # the `window` years before it
+        deltas = np.full_like(grid, np.nan)
+        deltas[..., 1:] = np.diff(grid, axis=-1)
+        del grid
+        change_mean, change_std = _window_moments(deltas, window)
+        # A floor on the spread, so a flat history does not make every change a shock
+        floor = TREND_MIN_STD_FRACTION * np.nanstd(deltas, axis=(1, 2))
+        np.maximum(
+            change_std, floor[:, None, None].astype(deltas.dtype), out=change_std
+        )
+        self.z_scores = np.full_like(deltas, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.z_scores[..., window:] = (
+                deltas[..., window:] - change_mean[..., :-1]
+            ) / change_std[..., :-1]
+        self.shocks = np.abs(self.z_scores) >= threshold
+        self._ranked_shocks = _ranked(self.z_scores, self.shocks)
+
+        # Difference of the mean change over the `window` years after each year
+        # and the `window` years up to it, i.e. of windows starting `window` apart,
+        # the earlier one starting `window - 1` years before the year
+        scores = np.full_like(deltas, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores[..., window - 1 : change_mean.shape[-1] - 1] = (
+                change_mean[..., window:] - change_mean[..., :-window]
+            ) / np.sqrt(
+                (change_std[..., window:] ** 2 + change_std[..., :-window] ** 2)
+                / window
+            )
+        strength = np.nan_to_num(np.abs(scores))
+        peaks = np.zeros_like(self.shocks)
+        peaks[..., 1:-1] = (strength[..., 1:-1] >= strength[..., :-2]) & (
+            strength[..., 1:-1] > strength[..., 2:]
+        )
+        self.shifts = peaks & (strength >= shift_threshold)
+        # Only the scores of the shifts are kept, as they are only listed
+        self._ranked_shifts = _ranked(scores, self.shifts)
+        self._shift_scores = scores.ravel()[self._ranked_shifts]
+
+    def _values(self, metric: np.ndarray, country: np.ndarray, year: np.ndarray):
+        # Values of cells read back from the rows; NaN where there is no row
+        flat = country * len(self.years) + year
+        order = self._cell_order
+        found = np.searchsorted(self._cells, flat, sorter=order)
+        found = np.minimum(found, len(order) - 1)
+        present = self._cells[order[found]] == flat
+        rows = self._rows[order[found]]
+        values = np.full(len(flat), np.nan)
+        for position, name in enumerate(self.metrics):
+            selected = present & (metric == position)
+            values[selected] = self._df[name].to_numpy()[rows[selected]]
+        return values
+
+    @cached_property
+    def _cell_order(self) -> np.ndarray:
+        return np.argsort(self._cells, kind="stable")
+
+    def shock_years(
+        self, metric: str, false_alarm: float = TREND_SHOCK_FALSE_ALARM
+    ) -> list[dict]:
+        """
+        Return the years in which unusually many countries had a shock in the same
+        direction.
+
+        Countries have shocks every year by chance, at a rate estimated as the
+        median over the years of the share of countries with a shock in that
+        year's dominant direction. A year is returned when its count would occur by
+        chance with a probability below ``false_alarm`` divided by the number of
+        years (a binomial test with a Bonferroni correction), so ``false_alarm``
+        bounds the probability of returning any year of the metric by chance.
+
+        Args:
+            metric (str): The metric to look at.
+            false_alarm (float): Largest probability of returning a year by chance.
+
+        Returns:
+            list[dict]: One dict per year, in year order, with the 'year', the
+            'direction' of the shocks (-1 for drops, 1 for rises), the number of
+            'countries' that had one, their 'share' of the countries with a z-score
+            that year and the 'p_value' of that many shocks by chance.
+        """
+        z_scores = self.z_scores[self.metrics.index(metric)]
+        shocks = self.shocks[self.metrics.index(metric)]
+        scanned = np.count_nonzero(~np.isnan(z_scores), axis=0)
+        drops = np.count_nonzero(shocks & (z_scores < 0), axis=0)
+        rises = np.count_nonzero(shocks & (z_scores > 0), axis=0)
+        counts = np.maximum(drops, rises)
+        years = np.flatnonzero(scanned)
+        if len(years) == 0:
+            return []
+        shares = counts[years] / scanned[years]
+        # At least one country a year, so a metric without shocks still needs
+        # several countries to mark a year
+        rate = np.clip(np.median(shares), 1 / scanned.max(), 0.5)
+        results = []
+        for position, share in zip(years, shares, strict=True):
+            p_value = _binomial_tail(counts[position], scanned[position], rate)
+            if p_value < false_alarm / len(years):
+                results.append(
+                    {
+                        "year": int(self.years[position]),
+                        "direction": -1 if drops[position] >= rises[position] else 1,
+                        "countries": int(counts[position]),
+                        "share": float(share),
+                        "p_value": p_value,
+                    }
+                )
+        return results
+
+    def strongest_shocks(
+        self, limit: int, metrics: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Return the strongest shocks of the panel.
+
+        Args:
+            limit (int): Most shocks to return.
+            metrics (list[str] | None): Metrics to consider (default: all scanned).
+
+        Returns:
+            pd.DataFrame: 'country', 'continent', 'metric', 'year', 'value',
+            'change', 'rolling_mean' of the previous ``window`` years and
+            'z_score' of each shock, by decreasing absolute z-score.
+        """
+        ranks = self._top(self._ranked_shocks, limit, metrics)
+        metric, country, year = np.unravel_index(
+            self._ranked_shocks[ranks], self.shocks.shape
+        )
+        value = self._values(metric, country, year)
+        frame = self._flag_frame(metric, country, year)
+        frame["value"] = value
+        frame["change"] = value - self._values(metric, country, year - 1)
+        frame["rolling_mean"] = self.rolling_means[metric, country, year - 1]
+        frame["z_score"] = self.z_scores[metric, country, year]
+        return frame
+
+    def strongest_shifts(
+        self, limit: int, metrics: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Return the strongest trend shifts of the panel.
+
+        Args:
+            limit (int): Most trend shifts to return.
+            metrics (list[str] | None): Metrics to consider (default: all scanned).
+
+        Returns:
+            pd.DataFrame: 'country', 'continent', 'metric', 'year', the mean
+            yearly change over the ``window`` years up to the year
+            ('change_before') and after it ('change_after') and the 't_score' of
+            each shift, by decreasing absolute t statistic.
+        """
+        ranks = self._top(self._ranked_shifts, limit, metrics)
+        metric, country, year = np.unravel_index(
+            self._ranked_shifts[ranks], self.shifts.shape
+        )
+        before = self._values(metric, country, year - self.window)
+        value = self._values(metric, country, year)
+        after = self._values(metric, country, year + self.window)
+        frame = self._flag_frame(metric, country, year)
+        frame["change_before"] = (value - before) / self.window
+        frame["change_after"] = (after - value) / self.window
+        frame["t_score"] = self._shift_scores[ranks]
+        return frame
+
+    def _top(
+        self, ranked: np.ndarray, limit: int, metrics: list[str] | None
+    ) -> np.ndarray:
+        # Ranks of the first `limit` flags of `ranked` in the given metrics
+        ranks = np.arange(len(ranked))
+        if metrics is not None:
+            rows = [self.metrics.index(metric) for metric in metrics]
+            ranks = ranks[np.isin(ranked // self.shocks[0].size, rows)]
+        return ranks[:limit]
+
+    def _flag_frame(
+        self, metric: np.ndarray, country: np.ndarray, year: np.ndarray
+    ) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "country": np.asarray(self.countries, dtype=object)[country],
+                "continent": self.continents[country],
+                "metric": np.asarray(self.metrics, dtype=object)[metric],
+                "year": self.years[year],
+            }
+        )
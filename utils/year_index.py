@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+
+class YearIndex:
+    """
+    Offsets of the contiguous per-year partitions of a year-sorted DataFrame.
+
+    Built once at load time so that selecting a year is a dictionary lookup plus a
+    positional slice, which returns a view of the shared frame instead of the copy
+    produced by a boolean mask.
+
+    Args:
+        years (np.ndarray): Year column of a DataFrame sorted by year.
+    """
+
+    def __init__(self, years: np.ndarray):
+        years = np.asarray(years)
+        if years.size and np.any(years[1:] < years[:-1]):
+            raise ValueError("YearIndex requires data sorted by year")
+
+        boundaries = np.flatnonzero(years[1:] != years[:-1]) + 1
+        starts = np.concatenate(([0], boundaries)) if years.size else boundaries
+        stops = np.concatenate((boundaries, [years.size])) if years.size else starts
+        self._set_offsets(years[starts], starts, stops)
+
+    @classmethod
+    def from_sizes(cls, years: np.ndarray, sizes: np.ndarray) -> "YearIndex":
+        """
+        Build the index from the row count of each year's partition.
+
+        Args:
+            years (np.ndarray): Distinct years in ascending order.
+            sizes (np.ndarray): Number of rows of each year.
+
+        Returns:
+            YearIndex: The index of the partitions laid out one after the other.
+        """
+        index = cls.__new__(cls)
+        stops = np.cumsum(sizes)
+        index._set_offsets(np.asarray(years), stops - sizes, stops)
+        return index
+
+    def _set_offsets(self, years: np.ndarray, starts: np.ndarray, stops: np.ndarray):
+        self.years = years
+        self.starts = starts
+        self.stops = stops
+        self._offsets = {
+            int(year): (int(start), int(stop))
+            for year, start, stop in zip(years, starts, stops, strict=True)
+        }
+
+    def __contains__(self, year) -> bool:
+        return int(year) in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def offsets(self, year: int) -> tuple[int, int]:
+        """
+        Return the [start, stop) row offsets of a year's partition.
+
+        Args:
+            year (int): The year to look up.
+
+        Returns:
+            tuple[int, int]: Start and stop row positions, or (0, 0) when the year
+            is not present.
+        """
+        return self._offsets.get(int(year), (0, 0))
+
+    def slice(self, df: pd.DataFrame, year: int) -> pd.DataFrame:
+        """
+        Return the rows of ``df`` for a single year as a positional slice.
+
+        Args:
+            df (pd.DataFrame): The year-sorted DataFrame this index was built from.
+            year (int): The year to select.
+
+        Returns:
+            pd.DataFrame: A view of the year's rows (empty if the year is absent).
+        """
+        start, stop = self.offsets(year)
+        return df.iloc[start:stop]